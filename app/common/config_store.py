@@ -0,0 +1,513 @@
+# config_store.py (設定ファイルの読み書き: アトミックな置き換え + バージョン + 内容ハッシュ)
+# -*- coding: utf-8 -*-
+"""
+config/shortcut_config.json の形式:
+  {"version": 12, "hash": "<shortcuts の sha256>", "shortcuts": [...]}
+  version / hash が無い旧形式も読める（version 0 扱い。hash はその場で計算する）。
+
+書き込み（write_config）:
+  - 同じディレクトリの一時ファイルに書いて fsync してから os.replace() で置き換える。
+    読む側は置き換え前か後のどちらかの完全なファイルしか見ない（書きかけを読まない）。
+  - 書き込み同士は隣の .lock ファイルのロック（fcntl / msvcrt）で1つずつにする（別プロセスでも）。
+  - version はロックの中で「今のファイルの version + 1」にするので単調に増える。
+  - shortcuts の内容（hash）が今のファイルと同じなら書かない（version も mtime も変わらない）。
+  - shortcuts 以外の最上位の項目はそのまま残す。
+  - expect_version を渡すと、今のファイルの version がそれと違うとき書かずに VersionConflict を送出する
+    （楽観的排他。読んだ後に他の誰かが保存していたら、merge_shortcuts() で取り込んでからやり直す）。
+読み込み（ConfigSetReader。分割は下記）:
+  - 前回とバイト列が同じなら解析しない。解析しても hash が前回と同じなら「変化なし」を返す
+    （空白だけの書き換え / 保存し直しで全部を登録し直さない）。
+  - ConfigCache はプロセス内で共有する解析結果。(version, hash) が変わったときだけ解析し直す
+    （WebUI のセッションが開く度にファイルを読み直さない）。
+分割（include）:
+  {"include": ["shortcuts.d/*.json", "team.json"], "shortcuts": [...]}
+  - パスはメインの設定ファイルのディレクトリからの相対。ワイルドカードはファイル名の部分だけ（ファイル名順に読む）。
+  - 分割したファイル（shard）もメインと同じ形式（{"shortcuts": [...]}。WebUI と同じく write_config で書ける）。
+    shard の中の include は読まない（入れ子にしない）。
+  - ConfigSetReader は shard ごとに (mtime, サイズ, inode) と hash を覚え、変わった shard だけ読み直して解析する。
+  - まとめる順序（優先順）はメイン → include に書いた順（ワイルドカードはファイル名順）。
+    同じ id が複数あれば先のものを採り、後のものは duplicates として報告する。
+
+リスナー（shortcut_key_listener.py）と WebUI（shortcut_key_setting_webui.py）で共用する。
+"""
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Sequence
+
+VERSION_KEY = "version"
+HASH_KEY = "hash"
+SHORTCUTS_KEY = "shortcuts"
+INCLUDE_KEY = "include"
+WILDCARDS = "*?["
+
+REPLACE_RETRIES = 50       # Windows: 読み手が開いている間は置き換えに失敗するのでやり直す
+REPLACE_RETRY_SEC = 0.02
+
+
+class ConfigFile(NamedTuple):
+    version: int
+    hash: str
+    data: dict          # ファイルの中身全体
+
+    @property
+    def shortcuts(self) -> list:
+        return self.data[SHORTCUTS_KEY]
+
+
+def content_hash(shortcuts: list) -> str:
+    """shortcuts の内容のハッシュ（キーの順序 / 空白 / インデントに依らない）"""
+    canon = json.dumps(shortcuts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def parse_config(raw: bytes | str) -> ConfigFile:
+    """ファイルの中身を解析する。JSON として壊れている / shortcuts が配列でなければ ValueError"""
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("config must be a JSON object")
+    shortcuts = data.setdefault(SHORTCUTS_KEY, [])
+    if not isinstance(shortcuts, list):
+        raise ValueError("shortcuts must be a list")
+    version = data.get(VERSION_KEY, 0)
+    if not isinstance(version, int) or version < 0:
+        raise ValueError(f"version must be a non-negative integer: {version!r}")
+    return ConfigFile(version, content_hash(shortcuts), data)
+
+
+def read_config(path: str | os.PathLike) -> ConfigFile:
+    return parse_config(Path(path).read_bytes())
+
+
+class VersionConflict(Exception):
+    """write_config(expect_version=...) の時点でファイルが他から更新されていた"""
+    def __init__(self, expected: int, current: Optional[ConfigFile]) -> None:
+        self.expected = expected
+        self.current = current
+        super().__init__(f"config version is {current.version if current else 0}, expected {expected}")
+
+
+# ---- 書き込み ----
+_thread_lock = threading.Lock()   # 同じプロセス内の書き込み同士（ファイルロックはプロセス単位のため）
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_fd(fd: int) -> None:
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)   # 約10秒で諦めるので取れるまで繰り返す
+                return
+            except OSError:
+                continue
+
+    def _unlock_fd(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def write_lock(path: str | os.PathLike) -> Iterator[None]:
+    """path の書き込みロック（隣の <name>.lock。プロセス間 / スレッド間の両方）"""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with _thread_lock:
+        fd = os.open(p.with_name(p.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock_fd(fd)
+            try:
+                yield
+            finally:
+                _unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+
+def _replace(src: str, dst: Path) -> None:
+    for i in range(REPLACE_RETRIES):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if i == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_SEC)
+
+
+def _fsync_dir(path: Path) -> None:
+    if sys.platform == "win32":
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """一時ファイル + fsync + os.replace。途中で失敗したら一時ファイルを消す"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    _fsync_dir(path.parent)
+
+
+def _current(path: Path) -> Optional[ConfigFile]:
+    try:
+        return read_config(path)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        print(f"[CONFIG] overwriting unreadable config {path}: {e}")
+        return None
+
+
+def write_config(path: str | os.PathLike, shortcuts: list, expect_version: Optional[int] = None) -> ConfigFile:
+    """
+    shortcuts を書き込み、書いた（内容が同じなら今の）ConfigFile を返す。
+    expect_version があり、今の version と違えば VersionConflict（内容が同じなら衝突にしない）。
+    """
+    p = Path(path)
+    new_hash = content_hash(shortcuts)
+    with write_lock(p):
+        cur = _current(p)
+        if cur is not None and cur.hash == new_hash:
+            return cur
+        if expect_version is not None and (cur.version if cur else 0) != expect_version:
+            raise VersionConflict(expect_version, cur)
+        data: dict[str, Any] = {VERSION_KEY: (cur.version if cur else 0) + 1, HASH_KEY: new_hash}
+        if cur is not None:
+            for k, v in cur.data.items():
+                if k not in (VERSION_KEY, HASH_KEY, SHORTCUTS_KEY):
+                    data[k] = v
+        data[SHORTCUTS_KEY] = shortcuts
+        atomic_write_bytes(p, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+        return ConfigFile(data[VERSION_KEY], new_hash, data)
+
+
+# ---- 3-way マージ ----
+def merge_shortcuts(
+    base: Sequence[dict], mine: Sequence[dict], theirs: Sequence[dict], ours_wins: bool = False,
+) -> tuple[list, list]:
+    """
+    base（読み込んだ時点）から自分（mine）と他（theirs）がそれぞれ変えた内容を id ごとに合わせる。
+    (マージ結果, 衝突した id のリスト) を返す。
+      - 片方だけが変えた（追加 / 変更 / 削除）項目はその変更を採る
+      - 両方が同じ内容に変えた項目はそのまま
+      - 両方が違う内容に変えた（片方の削除を含む）項目は衝突。結果には他の内容を入れる（ours_wins なら自分）
+    並びは theirs の順で、自分だけが追加した項目を末尾に足す。
+    """
+    b = {d["id"]: d for d in base}
+    m = {d["id"]: d for d in mine}
+    t = {d["id"]: d for d in theirs}
+    ids = list(t) + [i for i in m if i not in t]
+    merged: list = []
+    conflicts: list = []
+    for i in ids:
+        bi, mi, ti = b.get(i), m.get(i), t.get(i)
+        if mi == ti or ti == bi:
+            out = mi
+        elif mi == bi:
+            out = ti
+        else:
+            conflicts.append(i)
+            out = mi if ours_wins else ti
+        if out is not None:
+            merged.append(out)
+    return merged, conflicts
+
+
+# ---- 読み込み ----
+class ConfigCache:
+    """
+    プロセス内で共有する設定の解析結果。get() は (ConfigFile, parse(ConfigFile) の結果) を返す。
+    ファイルの (mtime, サイズ, inode) が前回と同じなら読まない。読んでも (version, hash) が同じなら解析しない。
+    返す値は共有なので書き換えないこと。複数スレッドから呼べる。
+    """
+    def __init__(self, path: str | os.PathLike, parse: Callable[[ConfigFile], Any]) -> None:
+        self.path = Path(path)
+        self._parse = parse
+        self._lock = threading.Lock()
+        self._sig: Optional[tuple] = None
+        self._entry: Optional[tuple[ConfigFile, Any]] = None
+
+        # メトリクス
+        self.hits = 0       # 読まずに返した
+        self.reads = 0      # 読んだが (version, hash) が同じだった
+        self.parses = 0     # 解析した
+
+    def _signature(self) -> Optional[tuple]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def get(self) -> tuple[ConfigFile, Any]:
+        """読めなければ OSError / ValueError（前回の結果は返さない）"""
+        with self._lock:
+            sig = self._signature()     # 読む前に取る（読んでいる間に置き換わったら次で読み直す）
+            if sig is not None and sig == self._sig and self._entry is not None:
+                self.hits += 1
+                return self._entry
+            cfg = read_config(self.path)
+            self._sig = sig
+            if self._entry is not None and (self._entry[0].version, self._entry[0].hash) == (cfg.version, cfg.hash):
+                self.reads += 1
+                return self._entry
+            self._entry = (cfg, self._parse(cfg))
+            self.parses += 1
+            return self._entry
+
+    def stats(self) -> dict:
+        version = self._entry[0].version if self._entry else None
+        return {"version": version, "hits": self.hits, "reads": self.reads, "parses": self.parses}
+
+
+# ---- 分割（include） ----
+def include_targets(path: str | os.PathLike, data: dict) -> list[tuple[Path, Optional[str]]]:
+    """
+    メインの設定の include を (パス, None)（ファイル）/ (ディレクトリ, ファイル名のパターン)（ワイルドカード）で返す。
+    書き方が正しくなければ ValueError。
+    """
+    entries = data.get(INCLUDE_KEY) or []
+    if isinstance(entries, str):
+        entries = [entries]
+    if not isinstance(entries, list) or not all(isinstance(e, str) and e.strip() for e in entries):
+        raise ValueError("include must be a path or a list of paths")
+    base = Path(path).parent
+    out: list[tuple[Path, Optional[str]]] = []
+    for entry in entries:
+        p = base / entry.strip()
+        if any(c in str(p.parent) for c in WILDCARDS):
+            raise ValueError(f"include: wildcards are only allowed in the file name: {entry!r}")
+        if any(c in p.name for c in WILDCARDS):
+            out.append((p.parent, p.name))
+        else:
+            out.append((p, None))
+    return out
+
+
+def expand_targets(targets: Sequence[tuple[Path, Optional[str]]], exclude: Path) -> list[Path]:
+    """include_targets() の結果を読む順のファイルの並びにする（同じファイルは最初の1回だけ。exclude は除く）"""
+    seen = {exclude.resolve()}
+    out: list[Path] = []
+    for p, pattern in targets:
+        if pattern is None:
+            files = [p]
+        else:
+            try:
+                files = sorted(f for f in p.iterdir() if f.is_file() and fnmatch.fnmatch(f.name, pattern))
+            except FileNotFoundError:
+                files = []
+        for f in files:
+            r = f.resolve()
+            if r not in seen:
+                seen.add(r)
+                out.append(f)
+    return out
+
+
+class Shard(NamedTuple):
+    path: Path
+    config: ConfigFile
+
+    @property
+    def hash(self) -> str:
+        return self.config.hash
+
+    @property
+    def shortcuts(self) -> list:
+        return self.config.shortcuts
+
+
+class Duplicate(NamedTuple):
+    id: str
+    kept: Path       # 採った方の shard
+    dropped: Path    # 捨てた方の shard
+
+
+class ConfigSet(NamedTuple):
+    version: int                 # メインの設定の version
+    hash: str                    # 全 shard の (パス, hash) をまとめたもの
+    shards: tuple                # Shard の並び（優先順。先頭がメイン）
+    shortcuts: list              # まとめた結果（id の重複は先の shard の方）
+    origins: list                # shortcuts と同じ並びの、それぞれが書かれていた shard のパス
+    positions: list              # shortcuts と同じ並びの、書かれていた shard の shortcuts 内での位置
+    duplicates: list             # Duplicate の並び
+    missing: tuple               # include に書いてあるが無いファイル
+    targets: tuple               # include_targets() の結果（ウォッチャー用）
+    reparsed: tuple              # 前回から解析し直した shard のパス
+
+
+def merge_shards(shards: Sequence[Shard]) -> tuple[list, list, list, list]:
+    """(shortcuts, origins, positions, duplicates)。id の重複は先の shard を採る（id が無いものはそのまま全部）"""
+    shortcuts: list = []
+    origins: list = []
+    positions: list = []
+    duplicates: list = []
+    seen: dict[str, Path] = {}
+    for shard in shards:
+        for i, item in enumerate(shard.shortcuts):
+            sid = item.get("id") if isinstance(item, dict) else None
+            if sid:
+                if sid in seen:
+                    duplicates.append(Duplicate(sid, seen[sid], shard.path))
+                    continue
+                seen[sid] = shard.path
+            shortcuts.append(item)
+            origins.append(shard.path)
+            positions.append(i)
+    return shortcuts, origins, positions, duplicates
+
+
+class _ShardState(NamedTuple):
+    sig: tuple
+    digest: bytes
+    shard: Shard
+
+
+class ConfigSetReader:
+    """
+    メインの設定と include した shard をまとめて読む。
+    shard ごとに (mtime, サイズ, inode) が同じなら読まない / バイト列が同じなら解析しない。
+    load() は毎回まとめた ConfigSet を返し、read() は前回の read() から内容が変わったときだけ返す。
+    複数スレッドから呼べる。返す値は共有なので書き換えないこと。
+    """
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._shards: dict[Path, _ShardState] = {}
+        self._current: Optional[ConfigSet] = None
+        self.version: Optional[int] = None
+        self.hash: Optional[str] = None
+
+        # メトリクス
+        self.reads = 0          # read() の回数
+        self.changed = 0
+        self.skipped = 0
+        self.file_reads = 0     # shard を読んだ回数
+        self.parses = 0         # shard を解析した回数
+
+    def _shard(self, path: Path) -> tuple[Shard, bool]:
+        """(Shard, 解析し直したか)。無ければ FileNotFoundError、壊れていれば ValueError"""
+        st = path.stat()
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        state = self._shards.get(path)
+        if state is not None and state.sig == sig:
+            return state.shard, False
+        raw = path.read_bytes()
+        self.file_reads += 1
+        digest = hashlib.sha256(raw).digest()
+        if state is not None and state.digest == digest:
+            self._shards[path] = state._replace(sig=sig)
+            return state.shard, False
+        try:
+            cfg = parse_config(raw)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+        self.parses += 1
+        reparsed = state is None or state.shard.hash != cfg.hash
+        if not reparsed:
+            # shortcuts が同じなら前回の dict をそのまま使う（version / include だけ変わった場合）
+            cfg = cfg._replace(data={**cfg.data, SHORTCUTS_KEY: state.shard.shortcuts})
+        shard = Shard(path, cfg)
+        self._shards[path] = _ShardState(sig, digest, shard)
+        return shard, reparsed
+
+    def load(self) -> ConfigSet:
+        """まとめた ConfigSet（変わっていない shard は前回の解析結果を使う）。読めなければ OSError / ValueError"""
+        with self._lock:
+            main, main_reparsed = self._shard(self.path)
+            targets = include_targets(self.path, main.config.data)
+            shards = [main]
+            reparsed = [main.path] if main_reparsed else []
+            missing = []
+            for p in expand_targets(targets, self.path):
+                try:
+                    shard, changed = self._shard(p)
+                except FileNotFoundError:
+                    missing.append(p)
+                    continue
+                shards.append(shard)
+                if changed:
+                    reparsed.append(p)
+            for p in [p for p in self._shards if p not in {s.path for s in shards}]:
+                del self._shards[p]
+
+            h = hashlib.sha256()
+            for shard in shards:
+                h.update(f"{shard.path}\0{shard.hash}\n".encode("utf-8"))
+            combined = h.hexdigest()
+            cur = self._current
+            if cur is not None and cur.hash == combined:
+                cur = cur._replace(
+                    version=main.config.version, shards=tuple(shards), missing=tuple(missing),
+                    targets=tuple(targets), reparsed=tuple(reparsed),
+                )
+            else:
+                shortcuts, origins, positions, duplicates = merge_shards(shards)
+                cur = ConfigSet(
+                    main.config.version, combined, tuple(shards), shortcuts, origins, positions, duplicates,
+                    tuple(missing), tuple(targets), tuple(reparsed),
+                )
+            self._current = cur
+            return cur
+
+    @property
+    def current(self) -> Optional[ConfigSet]:
+        """最後に load() / read() した結果"""
+        return self._current
+
+    def read(self) -> Optional[ConfigSet]:
+        """前回の read() から内容が変わっていれば ConfigSet、同じなら None"""
+        cs = self.load()
+        self.reads += 1
+        self.version = cs.version
+        if cs.hash == self.hash:
+            self.skipped += 1
+            return None
+        self.hash = cs.hash
+        self.changed += 1
+        return cs
+
+    def reset(self) -> None:
+        """次の read() で必ず ConfigSet を返す（読んだ内容の反映に失敗したとき）"""
+        self.hash = None
+
+    def stats(self) -> dict:
+        shards = len(self._current.shards) if self._current else 0
+        return {
+            "version": self.version, "shards": shards, "reads": self.reads, "changed": self.changed,
+            "skipped": self.skipped, "file_reads": self.file_reads, "parses": self.parses,
+        }
@@ -0,0 +1,340 @@
+# device_config.py (ESP32 のメニューへショートカット一覧を送る: バイナリ + 差分)
+# -*- coding: utf-8 -*-
+"""
+config/shortcut_config.json のショートカット（id / title）を ESP32-S3 のメニューへ送る。
+
+デバイスの表示枠（スロット 0..MAX_SLOTS-1）毎に「何を表示するか」の操作列をバイナリにする:
+  OP_CLEAR                                 全スロットを空にする（全体同期の先頭）
+  OP_SET  slot u8, len u8, id, len u8, title   スロットの内容を設定
+  OP_DEL  slot u8                          スロットを空にする
+同じ id は前回と同じスロットに置くので、設定を1件変えたときは OP_SET 1個だけの差分になる。
+
+操作列（blob）は serial_frame のフレームで3段階に分けて送る:
+  FT_CFG_BEGIN  新バージョン u16, 基準バージョン u16（全体同期は 0xFFFF）, blob 長 u16, blob の CRC16
+  FT_CFG_CHUNK  オフセット u16 + データ（1フレームに収まるよう CHUNK_DATA バイトずつ）
+  FT_CFG_COMMIT 新バージョン u16
+デバイスは基準バージョンが自分の持っているものと一致したときだけ差分を適用し、FT_CFG_ACK を返す。
+失敗の ack が来たら（または ack が来ないまま次の送信になったら）全体同期からやり直す。
+
+ConfigReceiver はデバイス（main.ino）と同じ処理の Python 版（往復の確認用）。
+"""
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from serial_frame import (
+    FT_CFG_ACK, FT_CFG_BEGIN, FT_CFG_CHUNK, FT_CFG_COMMIT, MAX_PAYLOAD, Frame, crc16, encode_frame,
+)
+
+MAX_SLOTS = 32
+ID_MAX = 16          # バイト（UTF-8）
+TITLE_MAX = 21       # バイト（OLED 1行 = 21文字）
+BLOB_MAX = 2048      # デバイス側の受信バッファ
+
+FULL_BASE = 0xFFFF   # 基準バージョン: 全体同期
+ACK_TIMEOUT_SEC = 2.0  # これより長く ack が来なければ、次の送信は全体同期にする
+CHUNK_DATA = MAX_PAYLOAD - 2
+
+OP_CLEAR = 0
+OP_SET = 1
+OP_DEL = 2
+
+ACK_OK = 0
+ACK_BASE_MISMATCH = 1
+ACK_CRC = 2
+ACK_TOO_LARGE = 3
+ACK_SEQUENCE = 4
+ACK_BAD_OP = 5
+ACK_NAMES = {
+    ACK_OK: "ok", ACK_BASE_MISMATCH: "base_mismatch", ACK_CRC: "crc",
+    ACK_TOO_LARGE: "too_large", ACK_SEQUENCE: "sequence", ACK_BAD_OP: "bad_op",
+}
+
+BEGIN = struct.Struct("<HHHH")
+OFFSET = struct.Struct("<H")
+VERSION = struct.Struct("<H")
+ACK = struct.Struct("<HB")
+
+Slots = dict[int, tuple[str, str]]   # スロット -> (id, title)
+
+
+def clip_utf8(s: str, limit: int) -> bytes:
+    """UTF-8 で limit バイトに収まるよう文字の途中で切らずに詰める"""
+    b = s.encode("utf-8")
+    if len(b) <= limit:
+        return b
+    return b[:limit].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+# ---- スロット割り当てと差分 ----
+def assign_slots(items: Iterable[tuple[str, str]], previous: Slots, max_slots: int = MAX_SLOTS) -> Slots:
+    """
+    (id, title) の並びをスロットに割り当てる。
+    前回と同じ id は同じスロットへ、新しい id は空いている一番小さいスロットへ。
+    id の無いもの・重複した id・max_slots を超えた分は送らない。
+    """
+    prev_slot = {sid: slot for slot, (sid, _) in previous.items()}
+    wanted: dict[str, str] = {}
+    for sid, title in items:
+        if sid and sid not in wanted:
+            wanted[sid] = title
+
+    out: Slots = {}
+    rest: list[str] = []
+    for sid, title in wanted.items():
+        slot = prev_slot.get(sid)
+        if slot is not None and slot < max_slots:
+            out[slot] = (sid, title)
+        else:
+            rest.append(sid)
+    free = (s for s in range(max_slots) if s not in out)
+    for sid in rest:
+        slot = next(free, None)
+        if slot is None:
+            break
+        out[slot] = (sid, wanted[sid])
+    return out
+
+
+def diff_ops(old: Slots, new: Slots) -> list[tuple]:
+    ops: list[tuple] = [(OP_DEL, slot) for slot in sorted(old) if slot not in new]
+    ops += [(OP_SET, slot, *new[slot]) for slot in sorted(new) if old.get(slot) != new[slot]]
+    return ops
+
+
+# ---- 操作列 <-> バイト列 ----
+def encode_ops(ops: Iterable[tuple]) -> bytes:
+    out = bytearray()
+    for op in ops:
+        kind = op[0]
+        if kind == OP_CLEAR:
+            out.append(OP_CLEAR)
+        elif kind == OP_DEL:
+            out += bytes((OP_DEL, op[1]))
+        elif kind == OP_SET:
+            _, slot, sid, title = op
+            b_id = clip_utf8(sid, ID_MAX)
+            b_title = clip_utf8(title, TITLE_MAX)
+            out += bytes((OP_SET, slot, len(b_id))) + b_id + bytes((len(b_title),)) + b_title
+        else:
+            raise ValueError(f"unknown op: {op!r}")
+    return bytes(out)
+
+
+def decode_ops(blob: bytes) -> list[tuple]:
+    ops: list[tuple] = []
+    i = 0
+    try:
+        while i < len(blob):
+            kind = blob[i]
+            if kind == OP_CLEAR:
+                ops.append((OP_CLEAR,))
+                i += 1
+            elif kind == OP_DEL:
+                ops.append((OP_DEL, blob[i + 1]))
+                i += 2
+            elif kind == OP_SET:
+                slot, n_id = blob[i + 1], blob[i + 2]
+                sid = blob[i + 3:i + 3 + n_id]
+                j = i + 3 + n_id
+                n_title = blob[j]
+                title = blob[j + 1:j + 1 + n_title]
+                if len(sid) != n_id or len(title) != n_title:
+                    raise ValueError("truncated OP_SET")
+                ops.append((OP_SET, slot, sid.decode("utf-8"), title.decode("utf-8")))
+                i = j + 1 + n_title
+            else:
+                raise ValueError(f"unknown op byte 0x{kind:02x} at {i}")
+    except IndexError:
+        raise ValueError("truncated op list") from None
+    return ops
+
+
+def apply_ops(slots: Slots, ops: Iterable[tuple], max_slots: int = MAX_SLOTS) -> Slots:
+    out = dict(slots)
+    for op in ops:
+        if op[0] == OP_CLEAR:
+            out.clear()
+        elif op[0] == OP_DEL:
+            out.pop(op[1], None)
+        else:
+            _, slot, sid, title = op
+            if slot >= max_slots:
+                raise ValueError(f"slot out of range: {slot}")
+            out[slot] = (sid, title)
+    return out
+
+
+def build_frames(blob: bytes, version: int, base: int, seq: int = 0) -> list[bytes]:
+    """blob を BEGIN / CHUNK... / COMMIT のフレーム列にする"""
+    if len(blob) > BLOB_MAX:
+        raise ValueError(f"config too large for the device: {len(blob)} > {BLOB_MAX} bytes")
+    frames = [encode_frame(FT_CFG_BEGIN, BEGIN.pack(version, base, len(blob), crc16(blob)), seq)]
+    for off in range(0, len(blob), CHUNK_DATA):
+        seq += 1
+        frames.append(encode_frame(FT_CFG_CHUNK, OFFSET.pack(off) + blob[off:off + CHUNK_DATA], seq))
+    frames.append(encode_frame(FT_CFG_COMMIT, VERSION.pack(version), seq + 1))
+    return frames
+
+
+# ---- ホスト側 ----
+class ConfigPusher:
+    """
+    設定が変わる度に push() を呼ぶと、デバイスへの送信（初回・不明時は全体、以降は差分）を行う。
+    writer はバイト列をデバイスへ書く関数（繋がっていなければ False を返す）。
+    デバイスからの FT_CFG_ACK は handle_ack()、接続 / デバイス起動時は resync() を呼ぶ。
+    """
+    def __init__(self, writer: Callable[[bytes], bool], max_slots: int = MAX_SLOTS) -> None:
+        self._writer = writer
+        self._max_slots = max_slots
+        self._lock = threading.Lock()
+        self._desired: Optional[Slots] = None
+        # 最後に送った (バージョン, 内容)。デバイスがそれを持っているかは ack で分かる（None は不明）
+        self._sent: Optional[tuple[int, Slots]] = None
+        self._unacked_since: Optional[float] = None   # 最後の送信の ack 待ち（monotonic）
+        self._version = 0
+        self._seq = 0
+
+        # メトリクス
+        self.full_syncs = 0
+        self.deltas = 0
+        self.bytes_sent = 0
+        self.acks_ok = 0
+        self.acks_failed = 0
+
+    def push(self, items: Iterable[tuple[str, str]]) -> int:
+        """(id, title) の一覧を送る。送ったバイト数を返す（変化なし / 未接続なら 0）"""
+        with self._lock:
+            previous = self._desired if self._desired is not None else {}
+            self._desired = assign_slots(items, previous, self._max_slots)
+            return self._send_locked()
+
+    def resync(self) -> int:
+        """デバイスの状態が分からなくなった（再接続 / 再起動）: 全体同期し直す"""
+        with self._lock:
+            self._sent = None
+            return self._send_locked()
+
+    def handle_ack(self, frame: Frame) -> None:
+        version, status = ACK.unpack_from(frame.payload)
+        if status == ACK_OK:
+            self.acks_ok += 1
+            with self._lock:
+                if self._sent is not None and self._sent[0] == version:
+                    self._unacked_since = None
+            return
+        self.acks_failed += 1
+        print(f"[DEVICE_CONFIG] device rejected v{version}: {ACK_NAMES.get(status, status)}")
+        with self._lock:
+            # 最新の送信が失敗したときだけやり直す（古い版の失敗は後続の差分も失敗するのでそちらで拾う）
+            if self._sent is not None and self._sent[0] == version and status != ACK_TOO_LARGE:
+                self._sent = None
+                self._send_locked()
+
+    def id_for_slot(self, slot: int) -> Optional[str]:
+        desired = self._desired or {}
+        entry = desired.get(slot)
+        return entry[0] if entry else None
+
+    def _send_locked(self) -> int:
+        desired = self._desired
+        if desired is None:
+            return 0
+        if self._unacked_since is not None and time.monotonic() - self._unacked_since > ACK_TIMEOUT_SEC:
+            self._sent = None   # 前回の送信が届いたか分からない
+        if self._sent is None:
+            ops = [(OP_CLEAR,)] + diff_ops({}, desired)
+            base = FULL_BASE
+        else:
+            ops = diff_ops(self._sent[1], desired)
+            if not ops:
+                return 0
+            base = self._sent[0]
+
+        version = self._version % 0xFFFF + 1   # 1..0xFFFF-1（0xFFFF は全体同期の印）
+        frames = build_frames(encode_ops(ops), version, base, self._seq)
+        data = b"".join(frames)
+        if not self._writer(data):
+            return 0
+        self._version = version
+        self._seq = (self._seq + len(frames)) & 0xFF
+        self._sent = (version, desired)
+        self._unacked_since = time.monotonic()
+        self.bytes_sent += len(data)
+        if base == FULL_BASE:
+            self.full_syncs += 1
+        else:
+            self.deltas += 1
+        return len(data)
+
+    def stats(self) -> dict:
+        return {
+            "version": self._sent[0] if self._sent else None,
+            "slots": len(self._desired or {}),
+            "full_syncs": self.full_syncs,
+            "deltas": self.deltas,
+            "bytes_sent": self.bytes_sent,
+            "acks_ok": self.acks_ok,
+            "acks_failed": self.acks_failed,
+        }
+
+
+# ---- デバイス側（main.ino と同じ処理） ----
+class ConfigReceiver:
+    """handle_frame() に受信フレームを渡すと、COMMIT 時に FT_CFG_ACK のフレームを返す"""
+    def __init__(self, max_slots: int = MAX_SLOTS) -> None:
+        self.max_slots = max_slots
+        self.slots: Slots = {}
+        self.version = 0
+        self._begin: Optional[tuple[int, int, int, int]] = None
+        self._blob = bytearray()
+        self._seq = 0
+        self._rejected: Optional[int] = None   # BEGIN / CHUNK で失敗を返したバージョン（COMMIT では黙る）
+
+    def _ack(self, version: int, status: int) -> bytes:
+        self._seq = (self._seq + 1) & 0xFF
+        self._rejected = version if status != ACK_OK else None
+        return encode_frame(FT_CFG_ACK, ACK.pack(version, status), self._seq)
+
+    def handle_frame(self, frame: Frame) -> Optional[bytes]:
+        if frame.type == FT_CFG_BEGIN:
+            new_version, base, total, blob_crc = BEGIN.unpack_from(frame.payload)
+            self._begin = None
+            if base != FULL_BASE and base != self.version:
+                return self._ack(new_version, ACK_BASE_MISMATCH)
+            if total > BLOB_MAX:
+                return self._ack(new_version, ACK_TOO_LARGE)
+            self._begin = (new_version, base, total, blob_crc)
+            self._blob = bytearray()
+            return None
+        if frame.type == FT_CFG_CHUNK:
+            if self._begin is None:
+                return None
+            (off,) = OFFSET.unpack_from(frame.payload)
+            data = frame.payload[OFFSET.size:]
+            if off != len(self._blob) or off + len(data) > self._begin[2]:
+                version = self._begin[0]
+                self._begin = None
+                return self._ack(version, ACK_SEQUENCE)
+            self._blob += data
+            return None
+        if frame.type == FT_CFG_COMMIT:
+            (version,) = VERSION.unpack_from(frame.payload)
+            begin, self._begin = self._begin, None
+            if begin is None and version == self._rejected:
+                return None
+            if begin is None or begin[0] != version:
+                return self._ack(version, ACK_SEQUENCE)
+            _, _, total, blob_crc = begin
+            if len(self._blob) != total or crc16(bytes(self._blob)) != blob_crc:
+                return self._ack(version, ACK_CRC)
+            try:
+                self.slots = apply_ops(self.slots, decode_ops(bytes(self._blob)), self.max_slots)
+            except (ValueError, UnicodeDecodeError):
+                return self._ack(version, ACK_BAD_OP)
+            self.version = version
+            return self._ack(version, ACK_OK)
+        return None
@@ -0,0 +1,191 @@
+# hotkeys.py (ホットキー文字列の解析・正規化・衝突検出)
+# -*- coding: utf-8 -*-
+"""
+リスナーと WebUI で共用するホットキーの解析。
+
+  - parse_hotkey("ctrl+alt+f1")     -> (mods, vk)（RegisterHotKey にそのまま渡せる値）
+  - parse_sequence("ctrl+k, ctrl+c") -> ((mods, vk), (mods, vk))
+  - canonical_hotkey("Alt+Ctrl+F1")  -> "ctrl+alt+f1"（修飾キーは ctrl, alt, shift, win の順）
+  - find_conflicts([...])            -> 設定全体の重複 / 先頭一致を1回の走査で見つける
+  - find_sequence_conflicts([...])   -> 同じ判定を解析済みの列で行う
+  - keyboard_hotkey("num0")          -> keyboard ライブラリの表記（WebUI の監視 / KeyboardBackend 用）
+
+キー名の表は keymap.py。
+
+"ctrl+alt+f1" と "alt+ctrl+f1" のように書き方が違っても、(mods, vk) が同じなら同じキーとして扱う。
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional
+
+import keymap
+
+# Windows constants（RegisterHotKey の修飾キー。他のバックエンドでも同じ値を使う）
+MOD_ALT      = 0x0001
+MOD_CONTROL  = 0x0002
+MOD_SHIFT    = 0x0004
+MOD_WIN      = 0x0008
+MOD_NOREPEAT = 0x4000  # 押しっぱなし時の繰り返し抑止
+
+SEQ_SEP = ","   # 複数ストロークの区切り: "ctrl+k, ctrl+c"
+
+Stroke = tuple[int, int]   # (mods, vk)
+
+
+# ---- Hotkey parsing (e.g. "ctrl+alt+f13") ----
+def vk_from_key_name(key: str) -> int:
+    """
+    キー名 -> vk（表は keymap.py。別名も可）
+    """
+    return keymap.vk_from_name(key)
+
+
+def key_name_from_vk(vk: int) -> str:
+    """vk_from_key_name の逆（正規化した名前）"""
+    return keymap.name_from_vk(vk)
+
+
+def parse_hotkey(hotkey: str) -> tuple[int, int]:
+    """
+    examples:
+      - "ctrl+f1"
+      - "ctrl+f2"
+      - "ctrl+alt+f3"
+      - "win+shift+f4"
+    """
+    parts = [p.strip().lower() for p in hotkey.split("+") if p.strip()]
+    if not parts:
+        raise ValueError("empty hotkey")
+
+    mods = 0
+    key_part = None
+
+    for p in parts:
+        if p in ("ctrl", "control"):
+            mods |= MOD_CONTROL
+        elif p == "alt":
+            mods |= MOD_ALT
+        elif p == "shift":
+            mods |= MOD_SHIFT
+        elif p in ("win", "windows", "meta"):
+            mods |= MOD_WIN
+        else:
+            # 最後に残ったものをキーとみなす（複数あるならエラー）
+            if key_part is not None:
+                raise ValueError(f"hotkey has multiple keys: {hotkey!r}")
+            key_part = p
+
+    if key_part is None:
+        raise ValueError(f"no key specified in hotkey: {hotkey!r}")
+
+    vk = vk_from_key_name(key_part)
+
+    # 押しっぱなしによる連続発火抑止
+    mods |= MOD_NOREPEAT
+
+    return mods, vk
+
+
+def split_sequence(hotkey: str) -> list[str]:
+    """"ctrl+k, ctrl+c" -> ["ctrl+k", "ctrl+c"]"""
+    return [p.strip() for p in hotkey.split(SEQ_SEP)]
+
+
+@lru_cache(maxsize=65536)
+def parse_sequence(hotkey: str) -> tuple[Stroke, ...]:
+    """解析結果は文字列ごとにキャッシュする（再読込の度に変わっていないホットキーを解析し直さない）"""
+    return tuple(parse_hotkey(p) for p in split_sequence(hotkey))
+
+
+# ---- 正規化 ----
+_MOD_ORDER = ((MOD_CONTROL, "ctrl"), (MOD_ALT, "alt"), (MOD_SHIFT, "shift"), (MOD_WIN, "win"))
+
+
+def format_stroke(mods: int, vk: int) -> str:
+    parts = [name for bit, name in _MOD_ORDER if mods & bit]
+    parts.append(key_name_from_vk(vk))
+    return "+".join(parts)
+
+
+def canonical_hotkey(hotkey: str) -> str:
+    """書き方の違い（順番 / 大文字 / 別名 / 空白）を揃えた文字列。解析できなければ ValueError"""
+    return ", ".join(format_stroke(m, v) for m, v in parse_sequence(hotkey))
+
+
+# ---- keyboard ライブラリの表記 ----
+_KEYBOARD_MODS = ((MOD_CONTROL, "ctrl"), (MOD_ALT, "alt"), (MOD_SHIFT, "shift"), (MOD_WIN, "windows"))
+
+
+def keyboard_hotkey_name(mods: int, vk: int) -> str:
+    """(mods, vk) を keyboard.add_hotkey / send が受け付ける表記にする"""
+    parts = [name for bit, name in _KEYBOARD_MODS if mods & bit]
+    parts.append(keymap.keyboard_name(vk))
+    return "+".join(parts)
+
+
+def keyboard_hotkey(hotkey: str) -> str:
+    """設定のホットキー（列も可）を keyboard ライブラリの表記にする。"ctrl+k, ctrl+c" の形は keyboard でも列になる"""
+    return ", ".join(keyboard_hotkey_name(m, v) for m, v in parse_sequence(hotkey))
+
+
+# ---- 衝突検出 ----
+DUPLICATE = "duplicate"     # 同じキー（列）が前にある
+HAS_PREFIX = "has_prefix"   # 前にある短い列が、この列の先頭と一致する（この列は押せない）
+IS_PREFIX = "is_prefix"     # この列が、前にある長い列の先頭と一致する（前の列が押せなくなる）
+INVALID = "invalid"         # 解析できない
+
+
+class HotkeyConflict(NamedTuple):
+    index: int              # 入力の何番目か（後に書いた方。先に書いた方が有効）
+    other: Optional[int]    # 相手の番号（INVALID なら None）
+    reason: str
+    detail: str             # 正規化したホットキー / 解析エラーの内容
+
+
+def find_conflicts(hotkeys: Iterable[str]) -> list[HotkeyConflict]:
+    """
+    設定全体を1回走査して衝突を返す（ストローク数の合計に比例。ペアの総当たりはしない）。
+    空のホットキーは無視する。
+    """
+    invalid: list[HotkeyConflict] = []
+    sequences: list[Optional[tuple[Stroke, ...]]] = []
+    for i, hotkey in enumerate(hotkeys):
+        strokes = None
+        if (hotkey or "").strip():
+            try:
+                strokes = parse_sequence(hotkey)
+            except ValueError as e:
+                invalid.append(HotkeyConflict(i, None, INVALID, str(e)))
+        sequences.append(strokes)
+    if not invalid:
+        return find_sequence_conflicts(sequences)
+    return sorted(invalid + find_sequence_conflicts(sequences), key=lambda c: c.index)
+
+
+def find_sequence_conflicts(sequences: Iterable[Optional[tuple[Stroke, ...]]]) -> list[HotkeyConflict]:
+    """find_conflicts の解析済み版（事前コンパイル済みの列をそのまま渡す。None は無視する）"""
+    full: dict[tuple[Stroke, ...], int] = {}      # 有効な列 -> 番号
+    prefixes: dict[tuple[Stroke, ...], int] = {}  # 有効な列の真の先頭部分 -> 最初の持ち主
+    out: list[HotkeyConflict] = []
+    for i, strokes in enumerate(sequences):
+        if strokes is None:
+            continue
+
+        reason = DUPLICATE
+        other = full.get(strokes)
+        if other is None:
+            reason = IS_PREFIX
+            other = prefixes.get(strokes)
+        if other is None:
+            reason = HAS_PREFIX
+            other = next((full[strokes[:n]] for n in range(1, len(strokes)) if strokes[:n] in full), None)
+        if other is not None:
+            # 正規化した表記は衝突したものだけ作る
+            out.append(HotkeyConflict(i, other, reason, ", ".join(format_stroke(m, v) for m, v in strokes)))
+            continue
+
+        full[strokes] = i
+        for n in range(1, len(strokes)):
+            prefixes.setdefault(strokes[:n], i)
+    return out
@@ -0,0 +1,335 @@
+# injector.py (キー入力の合成: 文字列 / キー操作の列をまとめて送る)
+# -*- coding: utf-8 -*-
+"""
+action_type "type_text" / "macro" と、キー送信GUIが使うキー入力の合成。
+
+  - compile_text("thank you!")        -> 文字毎の down / up（Unicode 入力。配列に依らない）
+  - compile_macro("ctrl+a, ctrl+c")   -> 修飾キー down -> キー down / up -> 修飾キー up を打鍵順に
+  - compile_stroke(mods, vk)          -> 1打分
+どれも KeyEvent のタプルを返す（設定の読み込み時に1回だけ作る）。
+
+送るのはインジェクタの send(events, pace_sec, chunk) 1回:
+  - pace_sec == 0 なら全イベントを1回の呼び出しで送る（Win32 は SendInput 1回）
+  - pace_sec > 0 なら chunk 打鍵（down + up）毎に区切って、その間 pace_sec 待つ
+    （速すぎると取りこぼすアプリ向け）
+
+インジェクタ:
+  - Win32Injector:    SendInput（Windows のみ）
+  - KeyboardInjector: keyboard ライブラリ（press / release / write）
+  - FakeInjector:     送ったイベントを覚えるだけ（Linux でもテスト・ベンチマークができる）
+"""
+from __future__ import annotations
+
+import ctypes
+import sys
+import threading
+import time
+from typing import Any, NamedTuple, Sequence
+
+import keymap
+from hotkeys import MOD_ALT, MOD_CONTROL, MOD_SHIFT, MOD_WIN, parse_sequence
+
+VK_SHIFT = 0x10
+VK_CONTROL = 0x11
+VK_MENU = 0x12
+VK_LWIN = 0x5B
+VK_RETURN = 0x0D
+VK_TAB = 0x09
+
+# 修飾キー -> vk（押す順。離すときは逆順）
+_MOD_VKS = ((MOD_CONTROL, VK_CONTROL), (MOD_ALT, VK_MENU), (MOD_SHIFT, VK_SHIFT), (MOD_WIN, VK_LWIN))
+_EXTENDED = keymap.EXTENDED_VKS | {VK_LWIN}
+_MOD_NAMES = {VK_CONTROL: "ctrl", VK_MENU: "alt", VK_SHIFT: "shift", VK_LWIN: "windows"}   # keyboard ライブラリの名前
+
+# 改行 / タブは文字ではなくキーとして送る（Unicode 入力だと無視するアプリがある）
+_CHAR_VKS = {"\n": VK_RETURN, "\t": VK_TAB}
+_VK_CHARS = {v: k for k, v in _CHAR_VKS.items()}
+
+
+class KeyEvent(NamedTuple):
+    vk: int        # 0 なら Unicode 入力
+    char: int      # Unicode 入力の UTF-16 コード単位（vk の場合は 0）
+    up: bool
+
+
+def _tap(vk: int) -> tuple[KeyEvent, KeyEvent]:
+    return KeyEvent(vk, 0, False), KeyEvent(vk, 0, True)
+
+
+def compile_stroke(mods: int, vk: int) -> tuple[KeyEvent, ...]:
+    held = [v for bit, v in _MOD_VKS if mods & bit]
+    return (
+        tuple(KeyEvent(v, 0, False) for v in held)
+        + _tap(vk)
+        + tuple(KeyEvent(v, 0, True) for v in reversed(held))
+    )
+
+
+def compile_macro(spec: str) -> tuple[KeyEvent, ...]:
+    """"ctrl+a, ctrl+c, tab" のようなキー操作の列（書式はホットキーと同じ）。解析できなければ ValueError"""
+    out: list[KeyEvent] = []
+    for mods, vk in parse_sequence(spec):
+        out.extend(compile_stroke(mods, vk))
+    return tuple(out)
+
+
+def compile_text(text: str) -> tuple[KeyEvent, ...]:
+    """文字列 -> 文字毎の down / up。"\\r\\n" は改行1回。BMP 外の文字はサロゲートペアで送る"""
+    out: list[KeyEvent] = []
+    append = out.append
+    for ch in text.replace("\r\n", "\n"):
+        vk = _CHAR_VKS.get(ch)
+        if vk is not None:
+            append(KeyEvent(vk, 0, False))
+            append(KeyEvent(vk, 0, True))
+            continue
+        code = ord(ch)
+        if code < 0x10000:
+            append(KeyEvent(0, code, False))
+            append(KeyEvent(0, code, True))
+            continue
+        code -= 0x10000
+        for unit in (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF)):
+            append(KeyEvent(0, unit, False))
+            append(KeyEvent(0, unit, True))
+    return tuple(out)
+
+
+def chunks(events: Sequence[KeyEvent], chunk: int) -> list[Sequence[KeyEvent]]:
+    """chunk 打鍵毎（up が chunk 回来たところ）で区切る。修飾キーを押したまま区切らないよう、何も押していない所でだけ切る"""
+    out = []
+    start = 0
+    taps = 0
+    down = 0
+    for i, ev in enumerate(events):
+        down += -1 if ev.up else 1
+        if ev.up:
+            taps += 1
+        if down == 0 and taps >= chunk and not 0xD800 <= ev.char < 0xDC00:   # サロゲートペアの間では切らない
+            out.append(events[start:i + 1])
+            start = i + 1
+            taps = 0
+    if start < len(events):
+        out.append(events[start:])
+    return out
+
+
+TYPE_TEXT = "type_text"
+MACRO = "macro"
+ACTION_TYPES = (TYPE_TEXT, MACRO)
+
+
+class Macro(NamedTuple):
+    """action_type "type_text" / "macro" の事前コンパイル結果（CompiledShortcut.target）"""
+    events: tuple[KeyEvent, ...]
+    pace_sec: float
+    chunk: int
+    action_type: str = TYPE_TEXT
+
+
+def compile_action(action_type: str, value: str, pace_ms: float | None = None, chunk: int | None = None) -> Macro:
+    """type_text: value をそのまま打つ / macro: value をキー操作の列として打つ"""
+    if action_type == TYPE_TEXT:
+        events = compile_text(value)
+    elif action_type == MACRO:
+        events = compile_macro(value)
+    else:
+        raise ValueError(f"not an injector action: {action_type!r}")
+    if not events:
+        raise ValueError(f"{action_type}: nothing to type")
+    return Macro(events, max(0.0, (pace_ms or 0) / 1000.0), max(1, chunk or 1), action_type)
+
+
+class Injector:
+    name = "base"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()   # 2つのアクションの打鍵が混ざらないよう1つずつ送る
+        # メトリクス
+        self.sends = 0
+        self.calls = 0      # OS / ライブラリを呼んだ回数
+        self.events = 0
+
+    def send(self, events: Sequence[KeyEvent], pace_sec: float = 0.0, chunk: int = 1) -> None:
+        with self._lock:
+            self._before_send()
+            self.sends += 1
+            if pace_sec <= 0:
+                self._emit(events)
+                self.calls += 1
+                self.events += len(events)
+                return
+            for i, part in enumerate(chunks(events, max(1, chunk))):
+                if i:
+                    time.sleep(pace_sec)
+                self._emit(part)
+                self.calls += 1
+                self.events += len(part)
+
+    def run(self, macro: Macro) -> None:
+        self.send(macro.events, macro.pace_sec, macro.chunk)
+
+    def _before_send(self) -> None:
+        pass
+
+    def _emit(self, events: Sequence[KeyEvent]) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "sends": self.sends, "calls": self.calls, "events": self.events}
+
+
+# ---- Win32: SendInput ----
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+
+
+class Win32Injector(Injector):
+    """
+    SendInput。ホットキーで発火したときは、押されたままの修飾キー（ctrl+f1 の ctrl など）が
+    打鍵に混ざらないよう、離されるまで最大 MODIFIER_WAIT_SEC 待ってから送る。
+    """
+    name = "win32"
+    MODIFIER_WAIT_SEC = 1.0
+    _HELD_VKS = (VK_SHIFT, VK_CONTROL, VK_MENU, VK_LWIN, 0x5C)   # 0x5C = 右 Win
+
+    def __init__(self) -> None:
+        super().__init__()
+        from ctypes import wintypes
+
+        ULONG_PTR = ctypes.c_size_t
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD), ("dwFlags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ULONG_PTR)]
+
+        class MOUSEINPUT(ctypes.Structure):   # union の大きさを合わせるため
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD), ("dwExtraInfo", ULONG_PTR)]
+
+        class _U(ctypes.Union):
+            _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [("type", wintypes.DWORD), ("u", _U)]
+
+        self._INPUT = INPUT
+        self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._user32.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+        self._user32.SendInput.restype = wintypes.UINT
+
+    def _before_send(self) -> None:
+        get = self._user32.GetAsyncKeyState
+        end = time.monotonic() + self.MODIFIER_WAIT_SEC
+        while any(get(vk) & 0x8000 for vk in self._HELD_VKS) and time.monotonic() < end:
+            time.sleep(0.01)
+
+    def _emit(self, events: Sequence[KeyEvent]) -> None:
+        n = len(events)
+        arr = (self._INPUT * n)()
+        for i, ev in enumerate(events):
+            ki = arr[i].u.ki
+            arr[i].type = INPUT_KEYBOARD
+            if ev.vk:
+                ki.wVk = ev.vk
+                flags = KEYEVENTF_EXTENDEDKEY if ev.vk in _EXTENDED else 0
+            else:
+                ki.wScan = ev.char
+                flags = KEYEVENTF_UNICODE
+            ki.dwFlags = flags | (KEYEVENTF_KEYUP if ev.up else 0)
+        sent = self._user32.SendInput(n, arr, ctypes.sizeof(self._INPUT))
+        if sent != n:
+            raise OSError(f"SendInput sent {sent}/{n} events (err={ctypes.get_last_error()})")
+
+
+# ---- keyboard ライブラリ ----
+class KeyboardInjector(Injector):
+    name = "keyboard"
+
+    def __init__(self) -> None:
+        super().__init__()
+        import keyboard  # 任意依存（このインジェクタを選んだときだけ必要）
+
+        self._kb = keyboard
+
+    def _emit(self, events: Sequence[KeyEvent]) -> None:
+        kb = self._kb
+        text: list[str] = []
+        high = 0
+        for ev in events:
+            if not ev.vk:
+                # 文字は down の時にまとめて write する（サロゲートペアは1文字に戻す）
+                if ev.up:
+                    continue
+                if 0xD800 <= ev.char < 0xDC00:
+                    high = ev.char
+                    continue
+                if high:
+                    text.append(chr(0x10000 + ((high - 0xD800) << 10) + (ev.char - 0xDC00)))
+                    high = 0
+                else:
+                    text.append(chr(ev.char))
+                continue
+            if text:
+                kb.write("".join(text))
+                text.clear()
+            name = _MOD_NAMES.get(ev.vk) or keymap.keyboard_name(ev.vk)
+            (kb.release if ev.up else kb.press)(name)
+        if text:
+            kb.write("".join(text))
+
+
+# ---- テスト / ベンチマーク用 ----
+class FakeInjector(Injector):
+    """送ったイベントを sent に貯めるだけ（keep=False なら数えるだけ）"""
+    name = "fake"
+
+    def __init__(self, keep: bool = True) -> None:
+        super().__init__()
+        self.keep = keep
+        self.sent: list[KeyEvent] = []
+        self.batches: list[int] = []   # 1回の呼び出しで送ったイベント数
+
+    def _emit(self, events: Sequence[KeyEvent]) -> None:
+        if self.keep:
+            self.sent.extend(events)
+            self.batches.append(len(events))
+
+    def typed_text(self) -> str:
+        """sent を文字列に戻す（確認用。Enter / Tab は \\n / \\t、それ以外のキーは <名前>）"""
+        out: list[str] = []
+        units: list[int] = []
+        for ev in self.sent:
+            if ev.up:
+                continue
+            if not ev.vk:
+                units.append(ev.char)
+                continue
+            if units:
+                out.append(b"".join(u.to_bytes(2, "little") for u in units).decode("utf-16-le"))
+                units.clear()
+            name = _MOD_NAMES.get(ev.vk) or keymap.VK_TO_NAME.get(ev.vk, hex(ev.vk))
+            out.append(_VK_CHARS.get(ev.vk) or f"<{name}>")
+        if units:
+            out.append(b"".join(u.to_bytes(2, "little") for u in units).decode("utf-16-le"))
+        return "".join(out)
+
+
+INJECTORS = {
+    "win32": Win32Injector,
+    "keyboard": KeyboardInjector,
+    "fake": FakeInjector,
+}
+
+
+def create_injector(name: str = "auto") -> Injector:
+    """name: "auto"（Windows は win32、それ以外は keyboard）/ "win32" / "keyboard" / "fake" """
+    if name == "auto":
+        name = "win32" if sys.platform == "win32" else "keyboard"
+    try:
+        cls: Any = INJECTORS[name]
+    except KeyError:
+        raise ValueError(f"unknown injector: {name!r} (choose from auto, {', '.join(INJECTORS)})") from None
+    return cls()
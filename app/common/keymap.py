@@ -0,0 +1,157 @@
+# keymap.py (キー名 <-> 仮想キーコードの表)
+# -*- coding: utf-8 -*-
+"""
+送信GUI / リスナー / WebUI で共用するキーの表。
+
+行は (グループ, vk, 正規名, 別名, keyboard ライブラリでの名前) の並び。
+連番のキー（A-Z / 0-9 / F1-F24 / テンキー 0-9）は生成し、それ以外は下に1行ずつ書く。
+import 時に次の dict を作るので、どの方向の引き当ても dict 1回（O(1)）:
+
+  NAME_TO_VK    正規名 + 別名（小文字）-> vk
+  VK_TO_NAME    vk -> 正規名（canonical_hotkey() の表記）
+  VK_TO_KEYBOARD vk -> keyboard ライブラリの名前（無いキーは入れない）
+  GROUPS        グループ -> vk の並び（GUI / WebUI の一覧表示用）
+
+名前に "+" / "," / 空白は使えない（ホットキーの区切りと重なるため）。
+表を足すときは python bench/check_keymap.py で往復を確認すること。
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+# 修飾キーの名前（hotkeys.parse_hotkey が解釈する。キーの表には入れない）
+MODIFIER_NAMES = ("ctrl", "control", "alt", "shift", "win", "windows", "meta")
+
+# (グループ, vk, 正規名, 別名, keyboard ライブラリでの名前)
+_ROWS: list[tuple[str, int, str, tuple[str, ...], Optional[str]]] = []
+
+_ROWS += [("letter", ord(c), c.lower(), (), c.lower()) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+_ROWS += [("digit", ord(c), c, (), c) for c in "0123456789"]
+_ROWS += [("function", 0x70 + i, f"f{i + 1}", (), f"f{i + 1}") for i in range(24)]   # F1=0x70 ... F24=0x87
+# テンキーの数字は keyboard ライブラリでは通常の数字と区別できないので名前を持たない
+_ROWS += [("numpad", 0x60 + i, f"num{i}", (f"numpad{i}",), None) for i in range(10)]
+
+_ROWS += [
+    # 編集 / 移動
+    ("edit", 0x08, "backspace", ("bs",), "backspace"),
+    ("edit", 0x09, "tab", (), "tab"),
+    ("edit", 0x0D, "enter", ("return",), "enter"),
+    ("edit", 0x1B, "esc", ("escape",), "esc"),
+    ("edit", 0x20, "space", ("spacebar",), "space"),
+    ("edit", 0x2D, "ins", ("insert",), "insert"),
+    ("edit", 0x2E, "delete", ("del",), "delete"),
+    ("nav", 0x21, "pgup", ("pageup", "prior"), "page up"),
+    ("nav", 0x22, "pgdn", ("pagedown", "next"), "page down"),
+    ("nav", 0x23, "end", (), "end"),
+    ("nav", 0x24, "home", (), "home"),
+    ("nav", 0x25, "left", (), "left"),
+    ("nav", 0x26, "up", (), "up"),
+    ("nav", 0x27, "right", (), "right"),
+    ("nav", 0x28, "down", (), "down"),
+    # ロック / システム
+    ("system", 0x13, "pause", ("break",), "pause"),
+    ("system", 0x14, "capslock", ("caps",), "caps lock"),
+    ("system", 0x2C, "printscreen", ("prtsc", "snapshot"), "print screen"),
+    ("system", 0x5D, "apps", ("menu", "contextmenu"), "menu"),
+    ("system", 0x5F, "sleep", (), "sleep"),
+    ("system", 0x90, "numlock", (), "num lock"),
+    ("system", 0x91, "scrolllock", ("scroll",), "scroll lock"),
+    # テンキーの記号
+    ("numpad", 0x6A, "nummul", ("multiply", "numpad*"), None),
+    ("numpad", 0x6B, "numadd", ("add",), None),
+    ("numpad", 0x6D, "numsub", ("subtract", "numpad-"), None),
+    ("numpad", 0x6E, "numdec", ("decimal", "numpad."), None),
+    ("numpad", 0x6F, "numdiv", ("divide", "numpad/"), None),
+    # 記号（US 配列の刻印。"+" と "," は区切りと重なるので名前だけ）
+    ("oem", 0xBA, "semicolon", (";",), ";"),
+    ("oem", 0xBB, "equal", ("=", "plus"), "="),
+    ("oem", 0xBC, "comma", (), ","),
+    ("oem", 0xBD, "minus", ("-",), "-"),
+    ("oem", 0xBE, "period", (".",), "."),
+    ("oem", 0xBF, "slash", ("/",), "/"),
+    ("oem", 0xC0, "backquote", ("`", "grave"), "`"),
+    ("oem", 0xDB, "bracketleft", ("[",), "["),
+    ("oem", 0xDC, "backslash", ("\\",), "\\"),
+    ("oem", 0xDD, "bracketright", ("]",), "]"),
+    ("oem", 0xDE, "quote", ("'",), "'"),
+    # メディア / ブラウザ
+    ("media", 0xAD, "volume_mute", ("mute",), "volume mute"),
+    ("media", 0xAE, "volume_down", ("voldown",), "volume down"),
+    ("media", 0xAF, "volume_up", ("volup",), "volume up"),
+    ("media", 0xB0, "media_next", ("nexttrack",), "next track"),
+    ("media", 0xB1, "media_prev", ("prevtrack",), "previous track"),
+    ("media", 0xB2, "media_stop", (), "stop media"),
+    ("media", 0xB3, "media_play_pause", ("playpause",), "play/pause media"),
+    ("media", 0xB5, "media_select", (), "select media"),
+    ("browser", 0xA6, "browser_back", (), "browser back"),
+    ("browser", 0xA7, "browser_forward", (), "browser forward"),
+    ("browser", 0xA8, "browser_refresh", (), "browser refresh"),
+    ("browser", 0xA9, "browser_stop", (), "browser stop"),
+    ("browser", 0xAA, "browser_search", (), "browser search key"),
+    ("browser", 0xAB, "browser_favorites", (), "browser favorites key"),
+    ("browser", 0xAC, "browser_home", (), "browser start and home"),
+    ("browser", 0xB4, "launch_mail", ("mail",), "start mail"),
+    ("browser", 0xB6, "launch_app1", (), "start application 1"),
+    ("browser", 0xB7, "launch_app2", (), "start application 2"),
+]
+
+# 拡張キー（SendInput / keybd_event で KEYEVENTF_EXTENDEDKEY が要るもの）
+EXTENDED_VKS = frozenset(
+    [0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2C, 0x2D, 0x2E, 0x5D, 0x6F, 0x90]
+    + list(range(0xA6, 0xB8))
+)
+
+NAME_TO_VK: dict[str, int] = {}
+VK_TO_NAME: dict[int, str] = {}
+VK_TO_KEYBOARD: dict[int, str] = {}
+GROUPS: dict[str, list[int]] = {}
+
+
+def _build() -> None:
+    for group, vk, name, aliases, kb_name in _ROWS:
+        if vk in VK_TO_NAME:
+            raise ValueError(f"duplicate vk in keymap: 0x{vk:02x}")
+        VK_TO_NAME[vk] = name
+        if kb_name is not None:
+            VK_TO_KEYBOARD[vk] = kb_name
+        GROUPS.setdefault(group, []).append(vk)
+        for n in (name, *aliases):
+            if n != n.lower() or n in MODIFIER_NAMES or any(ch in n for ch in "+, \t"):
+                raise ValueError(f"bad key name in keymap: {n!r}")
+            if NAME_TO_VK.setdefault(n, vk) != vk:
+                raise ValueError(f"duplicate key name in keymap: {n!r}")
+
+
+_build()
+
+
+def vk_from_name(name: str) -> int:
+    """キー名（大文字小文字 / 前後の空白は無視）-> vk。無ければ ValueError"""
+    try:
+        return NAME_TO_VK[name.strip().lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported key: {name!r} "
+            f"(try a-z, 0-9, f1-f24, num0-num9, tab/enter/esc/space, volume_up etc.)"
+        ) from None
+
+
+def name_from_vk(vk: int) -> str:
+    """vk -> 正規名。無ければ ValueError"""
+    try:
+        return VK_TO_NAME[vk]
+    except KeyError:
+        raise ValueError(f"unknown vk: 0x{vk:02x}") from None
+
+
+def keyboard_name(vk: int) -> str:
+    """vk -> keyboard ライブラリ（add_hotkey / send）の名前。無ければ ValueError"""
+    try:
+        return VK_TO_KEYBOARD[vk]
+    except KeyError:
+        raise ValueError(f"no keyboard name for vk=0x{vk:02x} ({VK_TO_NAME.get(vk, '?')})") from None
+
+
+def aliases_of(vk: int) -> list[str]:
+    """vk の別名（正規名を除く。一覧表示用）"""
+    return [n for n, v in NAME_TO_VK.items() if v == vk and n != VK_TO_NAME[vk]]
@@ -0,0 +1,129 @@
+# launcher.py (シェルを介さないプロセス起動)
+# -*- coding: utf-8 -*-
+"""
+run_cmd / open_url のコマンドを設定読み込み時に一度だけ解析し、
+発火時はシェル（cmd.exe / sh）を挟まずに直接起動する。
+
+- "exec":  実行ファイルを直接起動（実行ファイルのパスは読み込み時に解決済み）
+- "open":  URL / 関連付けで開く（Windows: ShellExecute、その他: xdg-open / open）
+- "shell": シェル経由。パイプ・リダイレクト・start などのシェル組み込みを使うコマンド用で、
+           設定で "shell": true と明示したショートカットだけがこれになる。
+
+リスナー（shortcut_key_listener.py）と WebUI（shortcut_key_setting_webui.py）で共用する。
+"""
+from __future__ import annotations
+
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+IS_WINDOWS = sys.platform == "win32"
+
+KIND_EXEC = "exec"
+KIND_OPEN = "open"
+KIND_SHELL = "shell"
+
+# cmd.exe の組み込みコマンド（実行ファイルが存在しないので直接起動できない）
+_CMD_BUILTINS = {
+    "assoc", "call", "cd", "chdir", "cls", "copy", "date", "del", "dir", "echo", "erase",
+    "exit", "for", "ftype", "goto", "if", "md", "mkdir", "mklink", "move", "path", "popd",
+    "pushd", "rd", "ren", "rename", "rmdir", "set", "start", "time", "title", "type", "ver", "vol",
+}
+_WIN_SHELL_CHARS = re.compile(r"[&|<>^]|%[^%\s]+%")
+_POSIX_SHELL_CHARS = re.compile(r"[|&;<>()$`*?~\n]")
+_WIN_LEX_CHARS = re.compile(r"[\"']")       # shlex（posix=False）が特別扱いする文字
+_POSIX_LEX_CHARS = re.compile(r"[\"'\\]")  # POSIX ではバックスラッシュも
+_TOKEN = re.compile(r"[^ \t\r\n]+")         # shlex の区切り文字以外の並び
+
+
+class LaunchSpec(NamedTuple):
+    kind: str
+    argv: tuple[str, ...]       # exec: 分割済み引数 / open: (対象, 引数...) / shell: (コマンド,)
+    command: str                # 元のコマンド文字列（ログ用。Windows の exec ではそのままコマンドラインに使う）
+    executable: Optional[str]   # exec: 解決済みの実行ファイルパス（見つからなければ None）
+
+
+def split_command(command: str) -> list[str]:
+    # 引用符もエスケープも無ければ空白で切るだけで shlex と同じ（shlex は遅く、読み込み時間の大半になる）
+    if not (_WIN_LEX_CHARS if IS_WINDOWS else _POSIX_LEX_CHARS).search(command):
+        return _TOKEN.findall(command)
+    if IS_WINDOWS:
+        # 引用符付きのパス（"C:\\Program Files\\..."）を1トークンとして扱う
+        return [t[1:-1] if len(t) >= 2 and t[0] == t[-1] == '"' else t
+                for t in shlex.split(command, posix=False)]
+    return shlex.split(command)
+
+
+def needs_shell(command: str) -> bool:
+    """シェルが無いと動かなそうなコマンドか（"shell": true の付け忘れ警告用）"""
+    try:
+        argv = split_command(command)
+    except ValueError:
+        return True
+    if not argv:
+        return False
+    if IS_WINDOWS:
+        return argv[0].lower() in _CMD_BUILTINS or bool(_WIN_SHELL_CHARS.search(command))
+    return bool(_POSIX_SHELL_CHARS.search(command))
+
+
+@lru_cache(maxsize=1024)
+def resolve_executable(name: str) -> Optional[str]:
+    """PATH 検索の結果をキャッシュする（設定の再読み込み前に cache_clear() すること）"""
+    return shutil.which(name)
+
+
+def parse_command(command: str, shell: bool = False) -> LaunchSpec:
+    """
+    コマンド文字列を起動仕様にする（読み込み時に1回だけ呼ぶ）。
+    shell=False で分割できない / 空のコマンドは ValueError。
+    """
+    command = (command or "").strip()
+    if shell:
+        return LaunchSpec(KIND_SHELL, (command,), command, None)
+
+    argv = split_command(command)
+    if not argv:
+        raise ValueError("empty command")
+    executable = resolve_executable(argv[0])
+    return LaunchSpec(KIND_EXEC, tuple(argv), command, executable)
+
+
+def url_spec(url: str, app: Optional[str] = None) -> LaunchSpec:
+    """URL を既定ブラウザ（app 指定時はそのアプリ）で開く"""
+    argv = (app, url) if app else (url,)
+    return LaunchSpec(KIND_OPEN, argv, " ".join(argv), None)
+
+
+def spawn(spec: LaunchSpec, new_console: bool = False) -> Optional[subprocess.Popen]:
+    """
+    起動仕様どおりにプロセスを作る。
+    "open" を Windows で実行した場合は ShellExecute なので Popen は返らない（None）。
+    """
+    flags = subprocess.CREATE_NEW_CONSOLE if (new_console and IS_WINDOWS) else 0
+
+    if spec.kind == KIND_EXEC:
+        if IS_WINDOWS:
+            # コマンドラインの解釈は CreateProcess に任せる（元の引用符をそのまま活かす）
+            return subprocess.Popen(spec.command, executable=spec.executable, creationflags=flags)
+        return subprocess.Popen(list(spec.argv), executable=spec.executable, start_new_session=True)
+
+    if spec.kind == KIND_OPEN:
+        if IS_WINDOWS:
+            target, *args = spec.argv
+            os.startfile(target, "open", subprocess.list2cmdline(args) if args else "")
+            return None
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        if len(spec.argv) > 1:
+            return subprocess.Popen(list(spec.argv), start_new_session=True)
+        return subprocess.Popen([opener, spec.argv[0]], start_new_session=True)
+
+    if IS_WINDOWS:
+        return subprocess.Popen(spec.command, shell=True, creationflags=flags)
+    # 新しいセッション（プロセスグループ）にして、タイムアウト時にシェルの子ごと止められるようにする
+    return subprocess.Popen(spec.command, shell=True, start_new_session=True)
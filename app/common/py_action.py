@@ -0,0 +1,206 @@
+# py_action.py (action_type "python": プロセスを起動せずに Python の関数を呼ぶ)
+# -*- coding: utf-8 -*-
+"""
+設定の書き方:
+  {"action_type": "python", "value": "my_actions.clock:write_timestamp", "args": {"path": "stamp.txt"}}
+
+  value  "パッケージ.モジュール:関数"（関数はクラス内の "Class.method" でも可）
+  args   省略可。JSON の配列なら位置引数、オブジェクトならキーワード引数、それ以外は引数1つ
+
+- 設定の読み込み時に import して関数まで引いておく（発火時は呼ぶだけ）。
+  import できない / 関数が無い設定は読み込み時にエラーになる。
+- モジュールは再読込をまたいでキャッシュする。ファイルの更新時刻 / サイズが変わったものだけ
+  importlib.reload() し直す（確認は再読込1回につきモジュール毎に stat 1回）。
+- call() は呼び出したスレッド（リスナーの実行プールのワーカー）でそのまま関数を呼び、
+  timeout_sec を過ぎたらそのスレッドに ActionTimeout を投げ込んで止める
+  （PyThreadState_SetAsyncExc。Python のコードの途中なら止まるが、
+  time.sleep / ソケット待ちなど C の中で寝ている間は戻ってくるまで届かない）。
+  期限の監視は1本のスレッドでまとめて行う（呼ぶ度にスレッドを作らない）。
+
+リスナー（shortcut_key_listener.py）と WebUI（shortcut_key_setting_webui.py）で共用する。
+"""
+from __future__ import annotations
+
+import ctypes
+import heapq
+import importlib
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+ACTION_TYPE = "python"
+DEFAULT_TIMEOUT_SEC = 5.0
+
+
+class ActionTimeout(BaseException):
+    """期限切れの関数に投げ込む（except Exception で握りつぶされないよう BaseException）"""
+
+
+class PyTarget(NamedTuple):
+    spec: str                  # "module:function"（表示・比較用）
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+
+
+def split_spec(spec: str) -> tuple[str, str]:
+    """"pkg.mod:func" -> ("pkg.mod", "func")"""
+    module, sep, attr = (spec or "").strip().partition(":")
+    module, attr = module.strip(), attr.strip()
+    if not sep or not module or not attr:
+        raise ValueError(f"python action must be 'package.module:function': {spec!r}")
+    return module, attr
+
+
+def split_args(args: Any) -> tuple[tuple, dict]:
+    if args is None or args == "":
+        return (), {}
+    if isinstance(args, list):
+        return tuple(args), {}
+    if isinstance(args, dict):
+        return (), dict(args)
+    return (args,), {}
+
+
+def _stamp(module: Any) -> Optional[tuple[int, int]]:
+    path = getattr(module, "__file__", None)
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class PyActionResolver:
+    """"module:function" -> 関数。モジュールは変更されるまで使い回す"""
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._modules: dict[str, tuple[Any, Optional[tuple[int, int]], int]] = {}  # 名前 -> (モジュール, stamp, 確認した世代)
+        self._generation = 0
+
+        # メトリクス
+        self.imports = 0
+        self.reloads = 0
+
+    def begin_reload(self) -> None:
+        """設定の読み込み1回の始めに呼ぶ（この後の resolve() でモジュール毎に1回だけ更新を確認する）"""
+        with self._lock:
+            self._generation += 1
+
+    def _module(self, name: str) -> Any:
+        entry = self._modules.get(name)
+        if entry is None:
+            module = importlib.import_module(name)
+            self.imports += 1
+        else:
+            module, stamp, gen = entry
+            if gen == self._generation:
+                return module
+            if _stamp(module) == stamp:
+                self._modules[name] = (module, stamp, self._generation)
+                return module
+            module = importlib.reload(module)
+            self.reloads += 1
+            print(f"[PY_ACTION] reloaded module: {name}")
+        self._modules[name] = (module, _stamp(module), self._generation)
+        return module
+
+    def resolve(self, spec: str, args: Any = None) -> PyTarget:
+        """読み込み時に呼ぶ。import / 属性が無ければ ValueError"""
+        module_name, attr = split_spec(spec)
+        with self._lock:
+            try:
+                obj: Any = self._module(module_name)
+            except Exception as e:
+                raise ValueError(f"cannot import {module_name!r}: {e}") from None
+        for part in attr.split("."):
+            try:
+                obj = getattr(obj, part)
+            except AttributeError:
+                raise ValueError(f"{module_name!r} has no attribute {attr!r}") from None
+        if not callable(obj):
+            raise ValueError(f"{spec!r} is not callable")
+        pos, kw = split_args(args)
+        return PyTarget(f"{module_name}:{attr}", obj, pos, kw)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"modules": len(self._modules), "imports": self.imports, "reloads": self.reloads}
+
+
+class _Watchdog:
+    """実行中の呼び出しの期限を1本のスレッドで見張り、過ぎたら ActionTimeout を投げ込む"""
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int]] = []     # (期限, token)
+        self._active: dict[int, int] = {}            # token -> スレッド ID
+        self._seq = 0
+        self._th: Optional[threading.Thread] = None
+
+    def arm(self, timeout_sec: float) -> int:
+        with self._cond:
+            self._seq += 1
+            token = self._seq
+            self._active[token] = threading.get_ident()
+            heapq.heappush(self._heap, (time.monotonic() + timeout_sec, token))
+            if self._th is None:
+                self._th = threading.Thread(target=self._run, name="py-action-watchdog", daemon=True)
+                self._th.start()
+            if self._heap[0][1] == token:
+                self._cond.notify()
+            return token
+
+    def disarm(self, token: int) -> None:
+        with self._cond:
+            self._active.pop(token, None)   # 期限の方は見張り側で読み捨てる
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][1] not in self._active:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, token = self._heap[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                ident = self._active.pop(token)
+                # ロックを持ったまま投げ込む: 呼び出し側はまだ disarm() を終えていない（= try の中にいる）
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(ident), ctypes.py_object(ActionTimeout))
+
+
+_watchdog = _Watchdog()
+
+
+def call(target: PyTarget, timeout_sec: Optional[float] = None) -> Any:
+    """
+    関数を呼ぶ。timeout_sec（None なら DEFAULT_TIMEOUT_SEC、0 以下なら無期限）を過ぎたら TimeoutError。
+    """
+    if timeout_sec is None:
+        timeout_sec = DEFAULT_TIMEOUT_SEC
+    if timeout_sec <= 0:
+        return target.func(*target.args, **target.kwargs)
+    token = _watchdog.arm(timeout_sec)
+    try:
+        try:
+            return target.func(*target.args, **target.kwargs)
+        finally:
+            _watchdog.disarm(token)
+    except ActionTimeout:
+        _watchdog.disarm(token)
+        raise TimeoutError(f"python action timed out after {timeout_sec:g}s: {target.spec}") from None
+
+
+def add_search_path(path: str | os.PathLike) -> None:
+    """アクション用のモジュールを置くディレクトリを import の対象に加える（無ければ何もしない）"""
+    p = os.path.abspath(path)
+    if os.path.isdir(p) and p not in sys.path:
+        sys.path.insert(0, p)
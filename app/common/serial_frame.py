@@ -0,0 +1,131 @@
+# serial_frame.py (ESP32 とのシリアル通信用のバイナリフレーム)
+# -*- coding: utf-8 -*-
+"""
+ESP32-S3（app/key_sender/esp32-s3_arduino/main.ino）とホストの間でやり取りする小さなフレーム。
+デバッグ用のテキストログ（Serial.println）と同じ線に混ざっても、SOF と CRC で見分ける。
+
+  0      1     2    3    4..7        8..8+len-1  末尾2バイト
+  +------+-----+----+----+-----------+-----------+-----------+
+  | 0xA5 | type| seq| len| t_ms (LE) | payload   | CRC16 (LE)|
+  +------+-----+----+----+-----------+-----------+-----------+
+
+  - type: フレーム種別（下の FT_*）
+  - seq:  送信側の通し番号（0-255 で一周。欠落の検出用）
+  - t_ms: 送信側の millis()（デバイス → ホストの遅延の推定用）
+  - CRC16-CCITT（多項式 0x1021、初期値 0xFFFF）を type から payload の末尾まで計算
+
+リスナー（serial_bridge.py）と設定送信ツール（device_config_push.py）で共用する。
+"""
+from __future__ import annotations
+
+import struct
+from typing import NamedTuple
+
+SOF = 0xA5
+MAX_PAYLOAD = 240            # デバイス側の受信バッファ（256 バイト）に収まる大きさ
+HEADER = struct.Struct("<BBBBI")   # SOF, type, seq, len, t_ms
+CRC = struct.Struct("<H")
+OVERHEAD = HEADER.size + CRC.size
+
+# デバイス -> ホスト
+FT_HELLO = 0x01      # payload: プロトコルバージョン u8
+FT_EVENT = 0x02      # payload: イベント番号 u8 [, 引数 u8]
+FT_CFG_ACK = 0x03    # payload: 設定バージョン u16 + 結果 u8（device_config.py）
+
+# ホスト -> デバイス（設定の送信。詳細は device_config.py）
+FT_CFG_BEGIN = 0x10
+FT_CFG_CHUNK = 0x11
+FT_CFG_COMMIT = 0x12
+
+# デバイスのイベント番号 -> 名前（設定ファイルの "device_event" に書く名前）
+EVENT_NAMES = {
+    1: "shortcut",      # shortcut 画面で UP x2
+    2: "pass_ok",       # パスフレーズ一致
+    3: "pass_ng",       # パスフレーズ不一致
+    4: "menu_select",   # メニュー選択の変更（引数: 選択番号）
+    5: "fire_slot",     # 送信済みの設定のショートカットを実行（引数: スロット番号）
+}
+
+
+def crc16(data: bytes, crc: int = 0xFFFF) -> int:
+    for b in data:
+        crc ^= b << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+class Frame(NamedTuple):
+    type: int
+    seq: int
+    t_ms: int
+    payload: bytes
+
+
+def encode_frame(ftype: int, payload: bytes = b"", seq: int = 0, t_ms: int = 0) -> bytes:
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"payload too large: {len(payload)} > {MAX_PAYLOAD}")
+    head = HEADER.pack(SOF, ftype, seq & 0xFF, len(payload), t_ms & 0xFFFFFFFF)
+    return head + payload + CRC.pack(crc16(head[1:] + payload))
+
+
+def event_name(payload: bytes) -> str:
+    """FT_EVENT の payload -> "shortcut" / "menu_select:1" など"""
+    if not payload:
+        return ""
+    name = EVENT_NAMES.get(payload[0], f"event{payload[0]}")
+    if len(payload) > 1:
+        return f"{name}:{payload[1]}"
+    return name
+
+
+class FrameParser:
+    """
+    受信したバイト列を少しずつ feed() し、完成したフレームを取り出す。
+    SOF 以外のバイト（テキストログ）は読み飛ばし、CRC が合わなければ SOF の次から探し直す。
+    """
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def reset(self) -> None:
+        """読みかけのバイト列を捨てる（再接続時）"""
+        self._buf.clear()
+
+    def feed(self, data: bytes) -> list[Frame]:
+        buf = self._buf
+        buf += data
+        out: list[Frame] = []
+        while True:
+            start = buf.find(SOF)
+            if start < 0:
+                self.skipped_bytes += len(buf)
+                buf.clear()
+                break
+            if start:
+                self.skipped_bytes += start
+                del buf[:start]
+            if len(buf) < HEADER.size:
+                break
+            _, ftype, seq, length, t_ms = HEADER.unpack_from(buf)
+            if length > MAX_PAYLOAD:
+                # 長さが壊れている: この SOF は偽物
+                self.skipped_bytes += 1
+                del buf[:1]
+                continue
+            total = HEADER.size + length + CRC.size
+            if len(buf) < total:
+                break
+            body = bytes(buf[1:HEADER.size + length])
+            (crc,) = CRC.unpack_from(buf, HEADER.size + length)
+            if crc != crc16(body):
+                self.crc_errors += 1
+                self.skipped_bytes += 1
+                del buf[:1]
+                continue
+            out.append(Frame(ftype, seq, t_ms, bytes(buf[HEADER.size:HEADER.size + length])))
+            self.frames += 1
+            del buf[:total]
+        return out
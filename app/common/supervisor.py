@@ -0,0 +1,171 @@
+# supervisor.py (アクションが起動した子プロセスの監視: 回収・タイムアウト・同時数上限)
+# -*- coding: utf-8 -*-
+"""
+アクションで起動した子プロセスをすべて追跡する。
+
+- 終了した子は回収する（POSIX のゾンビ / Windows のハンドルリークを防ぐ）
+- ショートカット毎の timeout_sec を過ぎた子は kill する
+- 生きている子の数が max_children に達したら新規起動を拒否する（連打による fork 爆弾対策）
+- stats() で生存数・終了コードの集計などを返す
+
+回収スレッドは子がいないときは完全に寝ている。子がいる間は、起動直後は短い間隔で、
+長生きしている子ほど間隔を空けて確認する（タイムアウトの期限には正確に起きる）。
+
+リスナー（shortcut_key_listener.py）と WebUI（shortcut_key_setting_webui.py）で共用する。
+"""
+from __future__ import annotations
+
+import collections
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+import launcher
+
+IS_WINDOWS = sys.platform == "win32"
+
+
+def _poll_interval(age_sec: float) -> float:
+    if age_sec < 1.0:
+        return 0.01
+    if age_sec < 10.0:
+        return 0.1
+    return 1.0
+
+
+class Child:
+    __slots__ = ("proc", "key", "started_at", "deadline", "next_check", "killed")
+
+    def __init__(self, proc: subprocess.Popen, key: str, started_at: float, deadline: Optional[float]) -> None:
+        self.proc = proc
+        self.key = key
+        self.started_at = started_at
+        self.deadline = deadline
+        self.next_check = started_at
+        self.killed = False
+
+
+class ProcessSupervisor:
+    def __init__(self, max_children: int = 32, history: int = 100) -> None:
+        self._max_children = max(1, max_children)
+        self._cond = threading.Condition()
+        self._children: dict[int, Child] = {}
+        self._th: Optional[threading.Thread] = None
+        self._closed = False
+
+        # メトリクス
+        self.spawned = 0
+        self.reaped = 0
+        self.killed_timeout = 0
+        self.rejected_cap = 0
+        self.exit_codes: collections.Counter[int] = collections.Counter()
+        # 直近の終了: (key, pid, 終了コード, 実行時間ms, タイムアウトで kill したか)
+        self.recent: collections.deque[tuple[str, int, int, float, bool]] = collections.deque(maxlen=history)
+
+    # ---- 起動 ----
+    def spawn(
+        self,
+        spec: launcher.LaunchSpec,
+        key: str = "",
+        timeout_sec: Optional[float] = None,
+        new_console: bool = False,
+    ) -> Optional[subprocess.Popen]:
+        """
+        子プロセスを起動して監視下に置く。上限に達していたら起動せず None。
+        （Windows の ShellExecute で開いた場合はハンドルが無いので監視しない）
+        """
+        with self._cond:
+            if len(self._children) >= self._max_children:
+                self.rejected_cap += 1
+                print(f"[SUPERVISOR] too many live children ({len(self._children)}), skip: {key}")
+                return None
+
+            proc = launcher.spawn(spec, new_console=new_console)
+            if proc is None:
+                return None
+
+            now = time.monotonic()
+            deadline = now + timeout_sec if timeout_sec and timeout_sec > 0 else None
+            self._children[proc.pid] = Child(proc, key, now, deadline)
+            self.spawned += 1
+            if self._th is None:
+                self._th = threading.Thread(target=self._reaper, name="supervisor", daemon=True)
+                self._th.start()
+            self._cond.notify()
+            return proc
+
+    # ---- 回収 ----
+    def _reaper(self) -> None:
+        with self._cond:
+            while not self._closed:
+                if not self._children:
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                for pid, child in list(self._children.items()):
+                    if child.deadline is not None and now >= child.deadline:
+                        self._kill(child)
+                        child.deadline = None
+                        child.killed = True
+                        self.killed_timeout += 1
+                        child.next_check = now  # kill 後はすぐ回収を試みる
+                    if now < child.next_check:
+                        continue
+                    rc = child.proc.poll()
+                    if rc is None:
+                        child.next_check = now + _poll_interval(now - child.started_at)
+                        continue
+                    del self._children[pid]
+                    self.reaped += 1
+                    self.exit_codes[rc] += 1
+                    runtime_ms = (now - child.started_at) * 1000.0
+                    self.recent.append((child.key, pid, rc, runtime_ms, child.killed))
+
+                if not self._children:
+                    continue
+                wake = min(
+                    min(c.next_check for c in self._children.values()),
+                    min((c.deadline for c in self._children.values() if c.deadline is not None), default=float("inf")),
+                )
+                self._cond.wait(max(0.0, wake - time.monotonic()))
+
+    @staticmethod
+    def _kill(child: Child) -> None:
+        print(f"[SUPERVISOR] kill: {child.key} (pid={child.proc.pid})")
+        try:
+            if IS_WINDOWS:
+                child.proc.kill()
+            else:
+                # シェル経由の孫プロセスもまとめて止める（launcher は新しいセッションで起動する）
+                os.killpg(child.proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, OSError):
+            pass
+
+    # ---- 管理 ----
+    def live_count(self) -> int:
+        with self._cond:
+            return len(self._children)
+
+    def shutdown(self, kill: bool = False) -> None:
+        with self._cond:
+            if kill:
+                for child in self._children.values():
+                    self._kill(child)
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "live": len(self._children),
+                "spawned": self.spawned,
+                "reaped": self.reaped,
+                "killed_timeout": self.killed_timeout,
+                "rejected_cap": self.rejected_cap,
+                "exit_codes": dict(self.exit_codes),
+            }
@@ -0,0 +1,187 @@
+# chord.py (複数ストロークのホットキー "ctrl+k, ctrl+c" の照合)
+# -*- coding: utf-8 -*-
+"""
+ストローク（(mods, vk)）の列をトライ木にして、1打ごとに状態を進める。
+
+  - ChordTrie.insert() は登録時に衝突を調べる:
+      duplicate  同じ列が既にある
+      has_prefix 既にある短い列が、新しい列の先頭と一致する（"ctrl+k" と "ctrl+k, ctrl+c"）
+      is_prefix  新しい列が、既にある長い列の先頭と一致する
+    衝突したものは登録しない（先に書いたものが勝つ）。これで「確定したノードは葉」になるので、
+    照合は待たずに確定できる。
+  - ChordMatcher.feed() は子の dict を1回引くだけ（1打 O(1)）。
+    途中で続かないキーが来たら捨てて、そのキーを1打目として見直す。
+    timeout_sec 以上間が空いたら最初から。
+  - DeadlineTimer は待ち時間切れを知らせるスレッド（押す度にスレッドを作らない）。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Optional
+
+Stroke = tuple[int, int]   # (mods, vk)
+
+NO_MATCH = 0
+PENDING = 1
+MATCH = 2
+
+_NO_CHILDREN: Mapping = MappingProxyType({})   # 葉は子の dict を持たない（1万件でもメモリを食わない）
+
+
+class ChordNode:
+    __slots__ = ("strokes", "children", "value")
+
+    def __init__(self, strokes: tuple[Stroke, ...]) -> None:
+        self.strokes = strokes                       # 根からここまでの列
+        self.children: Mapping[Stroke, ChordNode] = _NO_CHILDREN
+        self.value: Any = None                       # 葉なら登録した値
+
+    def first_value(self) -> Any:
+        """この下にある値を1つ（衝突の相手の表示用）"""
+        node = self
+        while node.value is None:
+            node = next(iter(node.children.values()))
+        return node.value
+
+
+class Conflict(NamedTuple):
+    reason: str     # duplicate / has_prefix / is_prefix
+    other: Any      # 既に登録されている値
+
+
+class ChordTrie:
+    def __init__(self) -> None:
+        self.root = ChordNode(())
+        self.size = 0
+
+    def insert(self, strokes: Iterable[Stroke], value: Any) -> Optional[Conflict]:
+        """登録できなければ衝突を返す（そのときは何も変えない）"""
+        strokes = tuple(strokes)
+        if not strokes:
+            raise ValueError("empty sequence")
+        node = self.root
+        depth = 0
+        for s in strokes:
+            if node.value is not None:
+                return Conflict("has_prefix", node.value)
+            child = node.children.get(s)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        else:
+            if node.value is not None:
+                return Conflict("duplicate", node.value)
+            return Conflict("is_prefix", node.first_value())
+
+        for i in range(depth, len(strokes)):
+            child = ChordNode(strokes[:i + 1])
+            if node.children is _NO_CHILDREN:
+                node.children = {}
+            node.children[strokes[i]] = child
+            node = child
+        node.value = value
+        self.size += 1
+        return None
+
+
+class ChordMatcher:
+    def __init__(self, trie: ChordTrie, timeout_sec: float) -> None:
+        self.trie = trie
+        self.timeout_sec = timeout_sec
+        self.node: Optional[ChordNode] = None   # 途中まで一致しているノード（None = 待ち無し）
+        self.deadline = 0.0
+
+        # メトリクス
+        self.matched = 0     # 2打以上の列が確定した
+        self.aborted = 0     # 途中で続かないキーが来た
+        self.timeouts = 0
+
+    def set_trie(self, trie: ChordTrie) -> None:
+        """設定の再読込: 途中の列は捨てる（メトリクスは引き継ぐ）"""
+        self.trie = trie
+        self.node = None
+
+    def feed(self, stroke: Stroke, now: float) -> tuple[int, Any]:
+        """
+        1打進める。now は time.monotonic()。
+          (MATCH, 値) / (PENDING, ノード) / (NO_MATCH, None)
+        """
+        node = self.node
+        if node is not None and now > self.deadline:
+            self.timeouts += 1
+            node = None
+        root = self.trie.root
+        nxt = (node or root).children.get(stroke)
+        if nxt is None and node is not None:
+            self.aborted += 1
+            nxt = root.children.get(stroke)
+        if nxt is None:
+            self.node = None
+            return NO_MATCH, None
+        if nxt.value is not None:
+            self.node = None
+            if len(nxt.strokes) > 1:
+                self.matched += 1
+            return MATCH, nxt.value
+        self.node = nxt
+        self.deadline = now + self.timeout_sec
+        return PENDING, nxt
+
+    def expire(self) -> bool:
+        """待ち時間切れ（タイマー）: 途中なら最初に戻して True"""
+        if self.node is None:
+            return False
+        self.node = None
+        self.timeouts += 1
+        return True
+
+    def reset(self) -> None:
+        self.node = None
+
+
+class DeadlineTimer:
+    """
+    1本のスレッドで「最後に arm() した期限」だけを待ち、過ぎたら fire(token) を呼ぶ。
+    fire は別スレッドから呼ばれるので、メッセージキューに積むだけのもの（post_timer）を渡す。
+    """
+    def __init__(self, fire: Callable[[int], None]) -> None:
+        self._fire = fire
+        self._cond = threading.Condition()
+        self._deadline: Optional[float] = None
+        self._token = 0
+        self._closed = False
+        self._th: Optional[threading.Thread] = None
+
+    def arm(self, token: int, delay_sec: float) -> None:
+        with self._cond:
+            self._deadline = time.monotonic() + delay_sec
+            self._token = token
+            if self._th is None:
+                self._th = threading.Thread(target=self._run, name="chord-timer", daemon=True)
+                self._th.start()
+            self._cond.notify()
+
+    def cancel(self) -> None:
+        with self._cond:
+            self._deadline = None
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _run(self) -> None:
+        with self._cond:
+            while not self._closed:
+                if self._deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._deadline = None
+                self._fire(self._token)
@@ -0,0 +1,423 @@
+# config_watcher.py (設定ファイル変更監視: inotify / ディレクトリ変更通知 / stat ポーリング)
+# -*- coding: utf-8 -*-
+"""
+設定ファイルの変更を検知してコールバックを呼ぶウォッチャー。
+
+- Linux:   inotify（カーネル通知。待機中はスレッドが完全に寝る）
+- Windows: FindFirstChangeNotificationW（ディレクトリ変更通知）
+- その他 / 初期化失敗時: stat ポーリング
+
+保存時の連続書き込み（truncate → write → close など）は
+debounce_sec の間イベントが途切れるまで待ってから 1 回だけ通知する。
+通知の前にファイルの中身（sha256）を前回の通知時と比べ、同じなら通知しない
+（mtime だけ変わった / 同じ内容で保存し直した）。
+
+pattern を渡すと path はディレクトリで、その中のファイル名が pattern（fnmatch）に合うファイルの
+追加 / 変更 / 削除を監視する（config/shortcuts.d/*.json など、include した分割ファイル用）。
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+DEFAULT_DEBOUNCE_SEC = 0.005   # 連続書き込みをまとめる静止時間（秒）
+DEFAULT_POLL_SEC = 0.5         # ポーリング版の stat 間隔（秒）
+
+
+class FileWatcher:
+    """
+    ウォッチャーの共通部分（スレッド管理とデバウンス）。
+
+    サブクラスは _wait(timeout) を実装する:
+      - 対象ファイルに関係する変更が来たら True
+      - タイムアウト / 停止要求なら False
+    timeout=None は「変更か停止まで無期限に待つ」。
+    """
+    kind = "base"
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[], None],
+        debounce_sec: float = DEFAULT_DEBOUNCE_SEC,
+        pattern: Optional[str] = None,
+    ) -> None:
+        self.path = Path(path).resolve()
+        self.pattern = pattern
+        self.dir = self.path if pattern is not None else self.path.parent
+        self._on_change = on_change
+        self._debounce_sec = debounce_sec
+        self._stop = threading.Event()
+        self._th: Optional[threading.Thread] = None
+
+        self._digest = self._content_digest()
+
+        self.wakeups = 0      # _wait から戻った回数（アイドル時に増えないことの確認用）
+        self.fired = 0        # コールバック呼び出し回数
+        self.unchanged = 0    # 中身が前回と同じで通知しなかった回数
+
+    def start(self) -> None:
+        self._th = threading.Thread(target=self._run, name=f"watcher-{self.kind}", daemon=True)
+        self._th.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._interrupt()
+        if self._th is not None:
+            self._th.join(timeout=2.0)
+        self._close()
+
+    # ---- サブクラス実装 ----
+    def _wait(self, timeout: Optional[float]) -> bool:
+        raise NotImplementedError
+
+    def _interrupt(self) -> None:
+        """ブロック中の _wait を起こす"""
+
+    def _close(self) -> None:
+        """OS リソースの解放"""
+
+    def _match(self, name: str) -> bool:
+        """ディレクトリの中の name が監視対象か"""
+        if self.pattern is None:
+            return name == self.path.name
+        return fnmatch.fnmatch(name, self.pattern)
+
+    def _files(self) -> list[Path]:
+        if self.pattern is None:
+            return [self.path]
+        try:
+            return sorted(p for p in self.dir.iterdir() if self._match(p.name) and p.is_file())
+        except OSError:
+            return []
+
+    def _signature(self) -> Optional[tuple]:
+        """対象ファイルの (mtime, size)。pattern なら (名前, mtime, size) の並び"""
+        if self.pattern is None:
+            try:
+                st = self.path.stat()
+            except FileNotFoundError:
+                return None
+            return (st.st_mtime_ns, st.st_size)
+        sig = []
+        for p in self._files():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            sig.append((p.name, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def _content_digest(self) -> Optional[bytes]:
+        if self.pattern is None:
+            try:
+                return hashlib.sha256(self.path.read_bytes()).digest()
+            except OSError:
+                return None
+        h = hashlib.sha256()
+        for p in self._files():
+            try:
+                data = p.read_bytes()
+            except OSError:
+                continue
+            h.update(os.fsencode(p.name) + b"\0" + hashlib.sha256(data).digest())
+        return h.digest()
+
+    # ---- 共通ループ ----
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self._wait(None):
+                continue
+            # バースト吸収: debounce_sec の間イベントが来なくなるまで待つ
+            while not self._stop.is_set() and self._wait(self._debounce_sec):
+                pass
+            if self._stop.is_set():
+                break
+            digest = self._content_digest()
+            if digest == self._digest:
+                self.unchanged += 1
+                continue
+            self._digest = digest
+            self.fired += 1
+            try:
+                self._on_change()
+            except Exception as e:
+                print("[WATCHER] callback failed:", e)
+
+
+# ===============================
+# stat ポーリング（フォールバック）
+# ===============================
+class PollingWatcher(FileWatcher):
+    kind = "poll"
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[], None],
+        debounce_sec: float = DEFAULT_DEBOUNCE_SEC,
+        poll_sec: float = DEFAULT_POLL_SEC,
+        pattern: Optional[str] = None,
+    ) -> None:
+        super().__init__(path, on_change, debounce_sec, pattern)
+        self._poll_sec = poll_sec
+        self._last = self._signature()
+
+    def _changed(self) -> bool:
+        sig = self._signature()
+        if sig == self._last:
+            return False
+        self._last = sig
+        return True
+
+    def _wait(self, timeout: Optional[float]) -> bool:
+        while True:
+            wait_sec = self._poll_sec if timeout is None else max(timeout, self._poll_sec)
+            if self._stop.wait(wait_sec):
+                return False
+            self.wakeups += 1
+            if self._changed():
+                return True
+            if timeout is not None:
+                return False
+
+    def _interrupt(self) -> None:
+        # _stop.wait で寝ているので set だけで起きる
+        pass
+
+
+# ===============================
+# Linux: inotify
+# ===============================
+IN_MODIFY      = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_NONBLOCK    = 0o4000
+IN_CLOEXEC     = 0o2000000
+
+_INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    ファイルではなく親ディレクトリを監視する
+    （temp + rename で置き換えられても監視が外れないように）。
+    """
+    kind = "inotify"
+
+    # 書き込み完了 / rename 置換 / 新規作成 / 削除 を拾う
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[], None],
+        debounce_sec: float = DEFAULT_DEBOUNCE_SEC,
+        pattern: Optional[str] = None,
+    ) -> None:
+        super().__init__(path, on_change, debounce_sec, pattern)
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(fd, os.fsencode(self.dir), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed: {self.dir}")
+
+        self._fd = fd
+        self._wake_r, self._wake_w = os.pipe()
+
+    def _drain(self) -> bool:
+        """溜まったイベントを読み切り、対象ファイルに関係するものがあれば True"""
+        hit = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return hit
+            if not buf:
+                return hit
+            off = 0
+            while off + _INOTIFY_EVENT.size <= len(buf):
+                _wd, _mask, _cookie, length = _INOTIFY_EVENT.unpack_from(buf, off)
+                off += _INOTIFY_EVENT.size
+                name = buf[off:off + length].rstrip(b"\0")
+                off += length
+                if name and self._match(os.fsdecode(name)):
+                    hit = True
+
+    def _wait(self, timeout: Optional[float]) -> bool:
+        while True:
+            r, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+            if self._stop.is_set():
+                return False
+            self.wakeups += 1
+            if not r:
+                return False
+            if self._drain():
+                return True
+            if timeout is not None:
+                # 無関係なファイルの変更: デバウンス中はタイムアウト扱い
+                return False
+
+    def _interrupt(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def _close(self) -> None:
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+# ===============================
+# Windows: ディレクトリ変更通知
+# ===============================
+FILE_NOTIFY_CHANGE_FILE_NAME  = 0x00000001
+FILE_NOTIFY_CHANGE_SIZE       = 0x00000008
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x00000010
+WAIT_OBJECT_0 = 0x00000000
+WAIT_TIMEOUT  = 0x00000102
+INFINITE      = 0xFFFFFFFF
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+
+class WinDirChangeWatcher(FileWatcher):
+    """
+    FindFirstChangeNotificationW はファイル名を返さないので、
+    通知が来たら (mtime, size) を比べて対象ファイルの変更かを判定する。
+    """
+    kind = "win32"
+
+    FILTER = (
+        FILE_NOTIFY_CHANGE_FILE_NAME
+        | FILE_NOTIFY_CHANGE_SIZE
+        | FILE_NOTIFY_CHANGE_LAST_WRITE
+    )
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[], None],
+        debounce_sec: float = DEFAULT_DEBOUNCE_SEC,
+        pattern: Optional[str] = None,
+    ) -> None:
+        super().__init__(path, on_change, debounce_sec, pattern)
+        from ctypes import wintypes
+
+        k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        k32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+        k32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+        k32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+        k32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+        k32.CreateEventW.restype = wintypes.HANDLE
+        k32.CreateEventW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+        k32.SetEvent.argtypes = [wintypes.HANDLE]
+        k32.CloseHandle.argtypes = [wintypes.HANDLE]
+        k32.WaitForMultipleObjects.restype = wintypes.DWORD
+        k32.WaitForMultipleObjects.argtypes = [
+            wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD,
+        ]
+        self._k32 = k32
+
+        h = k32.FindFirstChangeNotificationW(str(self.dir), False, self.FILTER)
+        if not h or h == INVALID_HANDLE_VALUE:
+            raise ctypes.WinError(ctypes.get_last_error())
+        self._h_change = h
+        self._h_stop = k32.CreateEventW(None, True, False, None)
+        self._handles = (wintypes.HANDLE * 2)(self._h_change, self._h_stop)
+        self._last = self._signature()
+
+    def _wait(self, timeout: Optional[float]) -> bool:
+        ms = INFINITE if timeout is None else max(0, int(timeout * 1000))
+        while True:
+            rc = self._k32.WaitForMultipleObjects(2, self._handles, False, ms)
+            if self._stop.is_set():
+                return False
+            self.wakeups += 1
+            if rc == WAIT_TIMEOUT or rc != WAIT_OBJECT_0:
+                return False
+            self._k32.FindNextChangeNotification(self._h_change)
+            sig = self._signature()
+            if sig != self._last:
+                self._last = sig
+                return True
+            if timeout is not None:
+                return False
+
+    def _interrupt(self) -> None:
+        self._k32.SetEvent(self._h_stop)
+
+    def _close(self) -> None:
+        self._k32.FindCloseChangeNotification(self._h_change)
+        self._k32.CloseHandle(self._h_stop)
+
+
+def create_watcher(
+    path: Path,
+    on_change: Callable[[], None],
+    debounce_sec: float = DEFAULT_DEBOUNCE_SEC,
+    poll_sec: float = DEFAULT_POLL_SEC,
+    pattern: Optional[str] = None,
+) -> FileWatcher:
+    """
+    OS のネイティブ通知を優先し、使えなければ stat ポーリングにフォールバックする。
+    pattern を渡すと path（ディレクトリ）の中のファイル名が pattern に合うファイルを監視する。
+    """
+    native: Optional[type[FileWatcher]] = None
+    if sys.platform.startswith("linux"):
+        native = InotifyWatcher
+    elif sys.platform == "win32":
+        native = WinDirChangeWatcher
+
+    if native is not None:
+        try:
+            return native(path, on_change, debounce_sec, pattern)
+        except (OSError, AttributeError) as e:
+            print(f"[WATCHER] {native.kind} unavailable, fallback to polling: {e}")
+
+    return PollingWatcher(path, on_change, debounce_sec, poll_sec, pattern)
+
+
+def sync_watchers(
+    watchers: dict[tuple[Path, Optional[str]], FileWatcher],
+    targets: Iterable[tuple[Path, Optional[str]]],
+    on_change: Callable[[], None],
+    debounce_sec: float = DEFAULT_DEBOUNCE_SEC,
+) -> list[FileWatcher]:
+    """
+    watchers（(パス, pattern) -> ウォッチャー）を targets に合わせる。要らなくなったものは止め、
+    足りないものは作って start() する。targets はメインの設定の (パス, None) と ConfigSet.targets
+    （include したファイル / ディレクトリ）。新しく作ったウォッチャーを返す（ログ用）。
+    """
+    wanted = set(targets)
+    for key in [k for k in watchers if k not in wanted]:
+        watchers.pop(key).stop()
+    started = []
+    for path, pattern in sorted(wanted - set(watchers), key=str):
+        w = create_watcher(path, on_change, debounce_sec=debounce_sec, pattern=pattern)
+        w.start()
+        watchers[(path, pattern)] = w
+        started.append(w)
+    return started
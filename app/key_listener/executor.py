@@ -0,0 +1,317 @@
+# executor.py (アクション実行プール: 複数ワーカー + 有界キュー + ショートカット毎の同時実行数制限)
+# -*- coding: utf-8 -*-
+"""
+トリガーされたショートカットを N 本のワーカーで実行する。
+
+- キューは有界（max_queue）。満杯時の動作は policy で選ぶ:
+    "drop_oldest": 一番古い待ちジョブを捨てて新しいものを積む
+    "drop_newest": 新しいジョブを捨てる
+    "block":       空くまで待つ（block_timeout_sec を超えたら捨てる）
+投入するのは shortcut_key_listener.CompiledShortcut（key / priority /
+max_concurrency / max_age_ms / coalesce 属性を持つもの）。
+
+- ショートカット毎に max_concurrency（設定ファイルの同名キー）まで同時実行。
+  上限に達したショートカットのジョブは待たせ、他のショートカットを先に回す。
+- 実行可能なショートカットはラウンドロビンで取り出すので、
+  連打された1つのショートカットが他を締め出さない。
+- priority（設定の同名キー、大きいほど先）が高いショートカットから取り出す。
+- max_age_ms（設定の同名キー）を過ぎたジョブは実行せずに捨てる
+  （押してから時間が経ったホットキーは実行しない方がまし、という前提）。
+- coalesce（設定の同名キー。rate_limit.py）が真のショートカットは、待ちジョブを1件までにする。
+  実行中に何度押されても「終わったらもう1回」だけ実行される（それ以上は "coalesced" で捨てる）。
+- submit() に metrics.Trace を渡すと enqueued / dequeued の時刻を記録し、
+  execute(sc, trace) の形で実行関数へ引き渡す。
+"""
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from metrics import DEQUEUED, ENQUEUED, Trace
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_NEWEST = "drop_newest"
+POLICY_BLOCK = "block"
+POLICIES = (POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_BLOCK)
+
+
+class Job:
+    __slots__ = ("sc", "key", "seq", "enqueued_at", "deadline", "trace")
+
+    def __init__(
+        self, sc: Any, key: str, seq: int, enqueued_at: float, deadline: float | None, trace: Trace | None = None,
+    ) -> None:
+        self.sc = sc
+        self.key = key
+        self.seq = seq
+        self.enqueued_at = enqueued_at  # time.monotonic()
+        self.deadline = deadline        # これを過ぎたら捨てる（None なら無期限）
+        self.trace = trace
+
+
+class ActionExecutor:
+    def __init__(
+        self,
+        execute: Callable[[Any], None],
+        workers: int = 4,
+        max_queue: int = 256,
+        policy: str = POLICY_DROP_OLDEST,
+        block_timeout_sec: float = 1.0,
+        default_max_concurrency: int = 1,
+        default_max_age_ms: int | None = None,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"unknown queue policy: {policy!r} (choose from {POLICIES})")
+        self._execute = execute
+        self._max_queue = max(1, max_queue)
+        self._policy = policy
+        self._block_timeout_sec = block_timeout_sec
+        self._default_max_concurrency = max(1, default_max_concurrency)
+        self._default_max_age_ms = default_max_age_ms
+
+        self._cond = threading.Condition()
+        self._pending: dict[str, collections.deque[Job]] = {}
+        # 実行可能なショートカット: priority 毎のラウンドロビン列
+        self._ready: dict[int, collections.deque[str]] = {}
+        self._in_ready: set[str] = set()
+        self._running: dict[str, int] = {}
+        self._limits: dict[str, int] = {}
+        self._priority: dict[str, int] = {}
+        self._size = 0
+        self._seq = 0
+        self._closed = False
+
+        # メトリクス
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected: dict[str, int] = {
+            "drop_oldest": 0, "drop_newest": 0, "block_timeout": 0, "expired": 0, "closed": 0, "coalesced": 0,
+        }
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"executor-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for th in self._threads:
+            th.start()
+
+    # ---- 投入 ----
+    def submit(self, sc: Any, enqueued_at: float | None = None, trace: Trace | None = None) -> bool:
+        """
+        積めたら True、ポリシーで捨てたら False。
+        enqueued_at はトリガー時刻（time.monotonic()）。省略時は今。
+        """
+        return self.offer(sc, enqueued_at, trace) is None
+
+    def offer(self, sc: Any, enqueued_at: float | None = None, trace: Trace | None = None) -> str | None:
+        """submit() と同じ。積めたら None、捨てたら理由（rejected のキー: coalesced / drop_newest など）"""
+        key = sc.key
+        now = time.monotonic()
+        if enqueued_at is None:
+            enqueued_at = now
+        max_age_ms = sc.max_age_ms if sc.max_age_ms is not None else self._default_max_age_ms
+        deadline = enqueued_at + max_age_ms / 1000.0 if max_age_ms and max_age_ms > 0 else None
+
+        with self._cond:
+            if self._closed:
+                self.rejected["closed"] += 1
+                return "closed"
+            if sc.coalesce and self._pending.get(key):
+                self.rejected["coalesced"] += 1
+                return "coalesced"
+
+            if self._size >= self._max_queue:
+                self._purge_expired(now)
+            if self._size >= self._max_queue:
+                if self._policy == POLICY_DROP_NEWEST:
+                    self.rejected["drop_newest"] += 1
+                    return "drop_newest"
+                if self._policy == POLICY_DROP_OLDEST:
+                    self._drop_oldest()
+                else:
+                    block_until = now + self._block_timeout_sec
+                    while self._size >= self._max_queue and not self._closed:
+                        remaining = block_until - time.monotonic()
+                        if remaining <= 0 or not self._cond.wait(remaining):
+                            if self._size >= self._max_queue:
+                                self.rejected["block_timeout"] += 1
+                                return "block_timeout"
+                    if self._closed:
+                        self.rejected["closed"] += 1
+                        return "closed"
+
+            self._seq += 1
+            job = Job(sc, key, self._seq, enqueued_at, deadline, trace)
+            self._pending.setdefault(key, collections.deque()).append(job)
+            self._limits[key] = self._limit_of(sc)
+            self._set_priority(key, sc.priority)
+            self._size += 1
+            self.submitted += 1
+            self._mark_ready(key)
+            if trace is not None:
+                trace.mark(ENQUEUED)  # ワーカーに渡る前に記録する
+            self._cond.notify_all()
+            return None
+
+    def _limit_of(self, sc: Any) -> int:
+        return max(1, sc.max_concurrency or self._default_max_concurrency)
+
+    def _set_priority(self, key: str, prio: int) -> None:
+        old = self._priority.get(key)
+        if old == prio:
+            return
+        self._priority[key] = prio
+        if old is not None and key in self._in_ready:
+            # 設定変更で priority が変わった: 列を移す
+            self._ready[old].remove(key)
+            self._ready.setdefault(prio, collections.deque()).append(key)
+
+    def _purge_expired(self, now: float) -> None:
+        for key in list(self._pending):
+            dq = self._pending[key]
+            kept = collections.deque(j for j in dq if j.deadline is None or j.deadline > now)
+            dropped = len(dq) - len(kept)
+            if not dropped:
+                continue
+            self._size -= dropped
+            self.rejected["expired"] += dropped
+            if kept:
+                self._pending[key] = kept
+            else:
+                del self._pending[key]
+                self._unmark_ready(key)
+
+    def _drop_oldest(self) -> None:
+        oldest_key = None
+        oldest_seq = None
+        for key, dq in self._pending.items():
+            if dq and (oldest_seq is None or dq[0].seq < oldest_seq):
+                oldest_key, oldest_seq = key, dq[0].seq
+        if oldest_key is None:
+            return
+        dq = self._pending[oldest_key]
+        dq.popleft()
+        if not dq:
+            del self._pending[oldest_key]
+            self._unmark_ready(oldest_key)
+        self._size -= 1
+        self.rejected["drop_oldest"] += 1
+
+    def _mark_ready(self, key: str) -> None:
+        if key in self._in_ready or not self._pending.get(key):
+            return
+        if self._running.get(key, 0) >= self._limits.get(key, self._default_max_concurrency):
+            return
+        self._ready.setdefault(self._priority.get(key, 0), collections.deque()).append(key)
+        self._in_ready.add(key)
+
+    def _unmark_ready(self, key: str) -> None:
+        if key in self._in_ready:
+            self._in_ready.discard(key)
+            self._ready[self._priority.get(key, 0)].remove(key)
+
+    def _pop_ready(self) -> str | None:
+        best = None
+        for prio, dq in self._ready.items():
+            if dq and (best is None or prio > best):
+                best = prio
+        if best is None:
+            return None
+        key = self._ready[best].popleft()
+        self._in_ready.discard(key)
+        return key
+
+    # ---- ワーカー ----
+    def _take(self) -> Optional[Job]:
+        with self._cond:
+            while True:
+                while not self._in_ready and not self._closed:
+                    self._cond.wait()
+                key = self._pop_ready()
+                if key is None:
+                    return None
+                dq = self._pending[key]
+                job = dq.popleft()
+                if not dq:
+                    del self._pending[key]
+                self._size -= 1
+                self._cond.notify_all()  # block ポリシーで待っている投入側を起こす
+
+                now = time.monotonic()
+                if job.deadline is not None and now >= job.deadline:
+                    # 古すぎるトリガーは実行しない
+                    self.rejected["expired"] += 1
+                    self._mark_ready(key)
+                    continue
+
+                self._running[key] = self._running.get(key, 0) + 1
+                # まだ枠があれば列の最後に回す（同じ priority の他のショートカットと交互に）
+                self._mark_ready(key)
+
+                wait_ms = (now - job.enqueued_at) * 1000.0
+                self.wait_ms_total += wait_ms
+                if wait_ms > self.wait_ms_max:
+                    self.wait_ms_max = wait_ms
+                return job
+
+    def _done(self, job: Job, ok: bool) -> None:
+        with self._cond:
+            n = self._running.get(job.key, 1) - 1
+            if n:
+                self._running[job.key] = n
+            else:
+                self._running.pop(job.key, None)
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._mark_ready(job.key)
+            self._cond.notify_all()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._take()
+            if job is None:
+                return
+            ok = True
+            try:
+                if job.trace is None:
+                    self._execute(job.sc)
+                else:
+                    job.trace.mark(DEQUEUED)
+                    self._execute(job.sc, job.trace)
+            except Exception as e:
+                ok = False
+                print("[EXEC] failed:", e)
+            finally:
+                self._done(job, ok)
+
+    # ---- 管理 ----
+    def shutdown(self, wait: bool = False, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._closed = True
+            self._ready.clear()
+            self._in_ready.clear()
+            self._cond.notify_all()
+        if wait:
+            for th in self._threads:
+                th.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            taken = self.completed + self.failed + sum(self._running.values())
+            return {
+                "queue_depth": self._size,
+                "running": sum(self._running.values()),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": dict(self.rejected),
+                "wait_ms_avg": (self.wait_ms_total / taken) if taken else 0.0,
+                "wait_ms_max": self.wait_ms_max,
+            }
@@ -0,0 +1,167 @@
+# hotkey_backend.py (ホットキー登録 + イベント待ちのバックエンド)
+# -*- coding: utf-8 -*-
+"""
+HotkeyListener が使うバックエンド。MessageSource（wait / post_reload / post_stop）に
+ホットキーの登録・解除を足したもの。
+
+  - Win32Backend:    RegisterHotKey + GetMessageW（本番用。Windows のみ）
+  - KeyboardBackend: keyboard ライブラリの add_hotkey（WebUI の listener_loop と同じ方式）
+  - FakeBackend:     メモリ上だけで動く。press() / replay() で決まった順にキー入力を再生できる
+                     （Linux でもテスト・ベンチマークができる）
+
+register(hid, mods, vk, hotkey) の mods / vk は parse_hotkey() の結果、
+hotkey はその元になった文字列（"ctrl+f1" など。keyboard ライブラリ用）。
+登録・解除・wait() は同じスレッドから呼ぶこと（Win32 のホットキーはスレッドに紐づく）。
+"""
+from __future__ import annotations
+
+import ctypes
+import sys
+import threading
+import time
+from typing import Any, Iterable
+
+from hotkeys import (  # noqa: F401 (再エクスポート)
+    MOD_ALT, MOD_CONTROL, MOD_NOREPEAT, MOD_SHIFT, MOD_WIN, keyboard_hotkey_name,
+)
+from message_source import FakeMessageSource, MessageSource, Win32MessageSource
+
+
+class HotkeyBackend(MessageSource):
+    name = "base"
+    last_error: Any = None
+
+    def register(self, hid: int, mods: int, vk: int, hotkey: str) -> bool:
+        """登録できたら True。失敗理由は last_error に残す"""
+        raise NotImplementedError
+
+    def unregister(self, hid: int) -> None:
+        raise NotImplementedError
+
+
+class Win32Backend(Win32MessageSource, HotkeyBackend):
+    """RegisterHotKey(hWnd=NULL)。WM_HOTKEY はこのオブジェクトを作ったスレッドに届く"""
+    name = "win32"
+
+    def register(self, hid: int, mods: int, vk: int, hotkey: str) -> bool:
+        ok = self._user32.RegisterHotKey(None, hid, mods, vk)
+        if not ok:
+            self.last_error = ctypes.get_last_error()
+        return bool(ok)
+
+    def unregister(self, hid: int) -> None:
+        self._user32.UnregisterHotKey(None, hid)
+
+
+class KeyboardBackend(FakeMessageSource, HotkeyBackend):
+    """
+    keyboard ライブラリ（低レベルキーボードフック）で監視する。
+    コールバックは keyboard のスレッドで呼ばれるので、キューに積んで wait() 側へ渡す。
+    """
+    name = "keyboard"
+
+    def __init__(self) -> None:
+        super().__init__()
+        import keyboard  # 任意依存（このバックエンドを選んだときだけ必要）
+
+        self._kb = keyboard
+        self._handles: dict[int, Any] = {}
+
+    def register(self, hid: int, mods: int, vk: int, hotkey: str) -> bool:
+        try:
+            name = keyboard_hotkey_name(mods, vk)
+            self._handles[hid] = self._kb.add_hotkey(name, self.inject_hotkey, args=(hid,))
+            return True
+        except (ValueError, ImportError, OSError) as e:
+            self.last_error = e
+            return False
+
+    def unregister(self, hid: int) -> None:
+        handle = self._handles.pop(hid, None)
+        if handle is not None:
+            try:
+                self._kb.remove_hotkey(handle)
+            except (KeyError, ValueError):
+                pass
+
+
+class FakeBackend(FakeMessageSource, HotkeyBackend):
+    """
+    テスト / ベンチマーク用。登録内容を dict に持つだけで OS には触らない。
+
+    press(mods, vk) は登録済みなら WM_HOTKEY 相当のイベントを積み、未登録なら unmatched を数える。
+    fail_bindings に入れた (mods, vk) は登録に失敗する（既に他アプリが使っている場合の再現）。
+    """
+    name = "fake"
+
+    def __init__(self, fail_bindings: Iterable[tuple[int, int]] = ()) -> None:
+        super().__init__()
+        self.fail_bindings = set(fail_bindings)
+        self.registered: dict[int, tuple[int, int]] = {}   # 登録ID -> (mods, vk)
+        self._by_binding: dict[tuple[int, int], int] = {}
+        self.register_calls = 0
+        self.unregister_calls = 0
+        self.unmatched = 0
+
+    def register(self, hid: int, mods: int, vk: int, hotkey: str) -> bool:
+        self.register_calls += 1
+        binding = (mods, vk)
+        if binding in self.fail_bindings or binding in self._by_binding:
+            self.last_error = "already registered"
+            return False
+        self.registered[hid] = binding
+        self._by_binding[binding] = hid
+        return True
+
+    def unregister(self, hid: int) -> None:
+        self.unregister_calls += 1
+        binding = self.registered.pop(hid, None)
+        if binding is not None:
+            self._by_binding.pop(binding, None)
+
+    def press(self, mods: int, vk: int) -> bool:
+        hid = self._by_binding.get((mods, vk))
+        if hid is None:
+            self.unmatched += 1
+            return False
+        self.inject_hotkey(hid)
+        return True
+
+    def replay(self, script: Iterable[tuple[float, tuple[int, int]]], realtime: bool = False) -> threading.Thread | None:
+        """
+        script: (押すまでの待ち秒, (mods, vk)) の並び。
+        realtime=False なら待ちを無視してその場で全部積む（完全に決定的）。
+        realtime=True なら別スレッドで待ちを守って再生し、そのスレッドを返す。
+        """
+        if not realtime:
+            for _, binding in script:
+                self.press(*binding)
+            return None
+
+        def _run() -> None:
+            for delay, binding in script:
+                if delay > 0:
+                    time.sleep(delay)
+                self.press(*binding)
+
+        th = threading.Thread(target=_run, name="fake-replay", daemon=True)
+        th.start()
+        return th
+
+
+BACKENDS = {
+    "win32": Win32Backend,
+    "keyboard": KeyboardBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend(name: str = "auto") -> HotkeyBackend:
+    """name: "auto"（Windows は win32、それ以外は keyboard）/ "win32" / "keyboard" / "fake" """
+    if name == "auto":
+        name = "win32" if sys.platform == "win32" else "keyboard"
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown hotkey backend: {name!r} (choose from auto, {', '.join(BACKENDS)})") from None
+    return cls()
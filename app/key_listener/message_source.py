@@ -0,0 +1,145 @@
+# message_source.py (ディスパッチループ用のブロッキングなメッセージ源)
+# -*- coding: utf-8 -*-
+"""
+HotkeyListener のディスパッチループが待つ「イベント源」。
+
+wait() は次のどれかが来るまでブロックし、来たら即座に戻る:
+  - EV_HOTKEY: ホットキー押下（payload = 登録ID）
+  - EV_RELOAD: 設定変更通知（post_reload()）
+  - EV_STOP:   停止要求（post_stop()）
+  - EV_TIMER:  タイマー（post_timer(token)。payload = token。複数ストロークの待ち時間切れ用）
+
+post_reload() / post_stop() / post_timer() は別スレッドから呼んでよい。
+"""
+from __future__ import annotations
+
+import ctypes
+import queue
+import time
+from ctypes import wintypes
+from typing import Optional
+
+EV_HOTKEY = "hotkey"
+EV_RELOAD = "reload"
+EV_STOP = "stop"
+EV_TIMER = "timer"
+
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+WM_APP = 0x8000
+WM_APP_RELOAD = WM_APP + 1
+WM_APP_TIMER = WM_APP + 2
+PM_NOREMOVE = 0x0000
+
+CTRL_C_EVENT = 0
+CTRL_BREAK_EVENT = 1
+CTRL_CLOSE_EVENT = 2
+
+
+class MessageSource:
+    def wait(self) -> tuple[str, int]:
+        raise NotImplementedError
+
+    def post_reload(self) -> None:
+        raise NotImplementedError
+
+    def post_stop(self) -> None:
+        raise NotImplementedError
+
+    def post_timer(self, token: int) -> None:
+        raise NotImplementedError
+
+
+class Win32MessageSource(MessageSource):
+    """
+    GetMessageW でスレッドのメッセージキューをブロッキング待ちする。
+    設定変更 / 停止は PostThreadMessageW で同じキューに積んで起こす。
+
+    RegisterHotKey(hWnd=NULL) の WM_HOTKEY は登録したスレッドに届くので、
+    このクラスはホットキー登録と同じスレッドで生成・wait() すること。
+    """
+    def __init__(self) -> None:
+        self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._user32.GetMessageW.argtypes = [
+            ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT,
+        ]
+        self._user32.PostThreadMessageW.argtypes = [
+            wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM,
+        ]
+
+        self._thread_id = self._kernel32.GetCurrentThreadId()
+        # メッセージキューはメッセージ系APIを呼んだ時点で作られるので先に作っておく
+        msg = wintypes.MSG()
+        self._user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_NOREMOVE)
+        self._msg = msg
+        self._ctrl_handler = None
+
+    def wait(self) -> tuple[str, int]:
+        msg = self._msg
+        while True:
+            rc = self._user32.GetMessageW(ctypes.byref(msg), None, 0, 0)
+            if rc == 0 or rc == -1:
+                # WM_QUIT / エラー
+                return EV_STOP, 0
+            if msg.message == WM_HOTKEY:
+                return EV_HOTKEY, int(msg.wParam)
+            if msg.message == WM_APP_RELOAD:
+                return EV_RELOAD, 0
+            if msg.message == WM_APP_TIMER:
+                return EV_TIMER, int(msg.wParam)
+            self._user32.TranslateMessage(ctypes.byref(msg))
+            self._user32.DispatchMessageW(ctypes.byref(msg))
+
+    def post_reload(self) -> None:
+        self._user32.PostThreadMessageW(self._thread_id, WM_APP_RELOAD, 0, 0)
+
+    def post_stop(self) -> None:
+        self._user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+
+    def post_timer(self, token: int) -> None:
+        self._user32.PostThreadMessageW(self._thread_id, WM_APP_TIMER, token, 0)
+
+    def install_console_ctrl_handler(self) -> None:
+        """
+        GetMessageW でブロック中は Python の KeyboardInterrupt が届かないので、
+        Ctrl+C / コンソールクローズをコンソール制御ハンドラで拾って停止要求にする。
+        """
+        HANDLER = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.DWORD)
+
+        def _handler(ctrl_type: int) -> bool:
+            if ctrl_type in (CTRL_C_EVENT, CTRL_BREAK_EVENT, CTRL_CLOSE_EVENT):
+                self.post_stop()
+                return True
+            return False
+
+        self._ctrl_handler = HANDLER(_handler)  # GC されないよう保持
+        self._kernel32.SetConsoleCtrlHandler(self._ctrl_handler, True)
+
+
+class FakeMessageSource(MessageSource):
+    """
+    テスト / ベンチマーク用（Linux でも動く）。
+    inject_hotkey() で WM_HOTKEY 相当のイベントを積む。
+    last_event_at にはイベントを積んだ時刻（perf_counter）を記録する。
+    """
+    def __init__(self) -> None:
+        self._q: "queue.SimpleQueue[tuple[str, int, float]]" = queue.SimpleQueue()
+        self.last_event_at: Optional[float] = None
+
+    def inject_hotkey(self, hid: int) -> None:
+        self._q.put((EV_HOTKEY, hid, time.perf_counter()))
+
+    def wait(self) -> tuple[str, int]:
+        kind, payload, t = self._q.get()
+        self.last_event_at = t
+        return kind, payload
+
+    def post_reload(self) -> None:
+        self._q.put((EV_RELOAD, 0, time.perf_counter()))
+
+    def post_stop(self) -> None:
+        self._q.put((EV_STOP, 0, time.perf_counter()))
+
+    def post_timer(self, token: int) -> None:
+        self._q.put((EV_TIMER, token, time.perf_counter()))
@@ -0,0 +1,199 @@
+# metrics.py (ディスパッチ遅延の段階別計測 + Prometheus 形式の公開)
+# -*- coding: utf-8 -*-
+"""
+トリガー1件ごとに各段階の時刻（time.perf_counter()）を Trace に記録し、
+完了時にショートカット毎・段階毎のヒストグラムへ集計する。
+
+段階（STAGES の順）:
+  received        メッセージループが WM_HOTKEY を受け取った
+  debounced       連打抑止を通過した
+  enqueued        実行キューへ積み終わった
+  dequeued        ワーカーが取り出した
+  spawned         アクション本体（子プロセス起動）を呼ぶ直前
+  spawn_returned  アクション本体から戻った
+
+ヒストグラムの stage ラベルは「直前の段階からの経過時間」、"total" は received からの合計。
+MetricsServer は 127.0.0.1 だけで待ち受け、GET /metrics に Prometheus テキスト形式で返す。
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+STAGES = ("received", "debounced", "enqueued", "dequeued", "spawned", "spawn_returned")
+RECEIVED, DEBOUNCED, ENQUEUED, DEQUEUED, SPAWNED, SPAWN_RETURNED = range(len(STAGES))
+
+# 秒。ホットキーの遅延は 10us〜数百ms に収まる想定
+BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+METRIC_PREFIX = "shortcut_listener"
+
+
+class Trace:
+    """1回のトリガーの段階別時刻（未到達の段階は 0.0）"""
+    __slots__ = ("key", "t")
+
+    def __init__(self, key: str, received_at: Optional[float] = None) -> None:
+        self.key = key
+        self.t = [0.0] * len(STAGES)
+        self.t[RECEIVED] = received_at if received_at is not None else time.perf_counter()
+
+    def mark(self, stage: int) -> None:
+        self.t[stage] = time.perf_counter()
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)  # 最後は +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, v)] += 1
+        self.count += 1
+        self.sum += v
+
+    def quantile(self, q: float) -> float:
+        """バケット上限での近似値（表示用）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+        return float("inf")
+
+
+class LatencyMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (ショートカット, 段階ラベル) -> ヒストグラム
+        self._hist: dict[tuple[str, str], Histogram] = {}
+        self.observed = 0
+
+    def observe(self, trace: Trace) -> None:
+        t = trace.t
+        with self._lock:
+            prev = t[RECEIVED]
+            for i in range(DEBOUNCED, len(STAGES)):
+                if not t[i]:
+                    continue
+                self._get(trace.key, STAGES[i]).observe(max(0.0, t[i] - prev))
+                prev = t[i]
+            self._get(trace.key, "total").observe(max(0.0, prev - t[RECEIVED]))
+            self.observed += 1
+
+    def _get(self, key: str, stage: str) -> Histogram:
+        h = self._hist.get((key, stage))
+        if h is None:
+            h = self._hist[(key, stage)] = Histogram()
+        return h
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """段階毎（全ショートカット合算）の p50 / p99 の近似（ミリ秒）"""
+        merged: dict[str, Histogram] = {}
+        with self._lock:
+            for (_, stage), h in self._hist.items():
+                m = merged.setdefault(stage, Histogram())
+                for i, c in enumerate(h.counts):
+                    m.counts[i] += c
+                m.count += h.count
+                m.sum += h.sum
+        return {
+            stage: {"count": h.count, "p50_ms": h.quantile(0.5) * 1000.0, "p99_ms": h.quantile(0.99) * 1000.0}
+            for stage, h in merged.items()
+        }
+
+    def render(self) -> list[str]:
+        name = f"{METRIC_PREFIX}_dispatch_stage_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each dispatch stage (since the previous stage; total since received).",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for (key, stage), h in sorted(self._hist.items()):
+                labels = f'shortcut="{_escape(key)}",stage="{stage}"'
+                acc = 0
+                for bound, c in zip(BUCKETS, h.counts):
+                    acc += c
+                    lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {acc}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"{name}_sum{{{labels}}} {h.sum:.9f}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+        return lines
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_gauges(values: dict[str, tuple[str, str, Any]]) -> list[str]:
+    """
+    {名前: (型 "gauge"/"counter", 説明, 値)} を Prometheus テキストにする。
+    値を {ラベル文字列: 値} の dict にするとラベル付きで並べる。
+    """
+    lines: list[str] = []
+    for name, (kind, help_text, value) in values.items():
+        full = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        if isinstance(value, dict):
+            lines.extend(f"{full}{{{labels}}} {v}" for labels, v in value.items())
+        else:
+            lines.append(f"{full} {value}")
+    return lines
+
+
+class MetricsServer:
+    """
+    GET /metrics を返すだけの HTTP サーバー（127.0.0.1 限定、別スレッド）。
+    render は呼ばれる度に本文の行リストを返す関数。
+    """
+    def __init__(self, render: Callable[[], list[str]], port: int, host: str = "127.0.0.1") -> None:
+        self._render = render
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._th: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def _handler_class(self):
+        render = self._render
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = ("\n".join(render()) + "\n").encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:  # noqa: A002
+                pass  # スクレイプ毎のアクセスログは出さない
+
+        return Handler
+
+    def start(self) -> None:
+        self._th = threading.Thread(target=self._httpd.serve_forever, name="metrics", daemon=True)
+        self._th.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
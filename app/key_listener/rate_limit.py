@@ -0,0 +1,134 @@
+# rate_limit.py (ショートカット毎の連打抑止 / レート制限)
+# -*- coding: utf-8 -*-
+"""
+_enqueue の手前で、ショートカット毎のポリシーに従ってトリガーを間引く。
+
+設定ファイルのショートカット毎の項目:
+  "debounce_ms": 300     前回通したトリガーからこのミリ秒以内のものは捨てる（省略時はリスナーの DEBOUNCE_SEC）
+  "rate_per_sec": 2      トークンバケット: 1秒あたり補充するトークン数（省略時は制限なし）
+  "burst": 5             トークンバケットの容量（連続で通せる数。省略時は 1）
+  "coalesce": true       実行中にトリガーされても、待ちは1件までにまとめる（実行キュー側で判定。executor.py）
+
+時刻はすべて time.monotonic()（時計合わせで壁時計が飛んでも影響を受けない）。
+状態はショートカットの key（id / 旧設定は hotkey）毎に1つで、
+  - 再読込で消えたショートカットの状態は retain() で捨てる
+  - それでも max_keys を超えたら、最後に使ってから一番長いものから捨てる（LRU）
+ので、hotkey の書き換えを繰り返しても増え続けない。
+allow() はホットキー / IPC / シリアルの各スレッドから呼ばれるのでロックで守る。
+"""
+from __future__ import annotations
+
+import collections
+import threading
+from typing import Iterable, NamedTuple, Optional
+
+DEBOUNCED = "debounced"
+RATE_LIMITED = "rate_limited"
+COALESCED = "coalesced"       # executor.py が返す（同じ名前で数える）
+
+DEFAULT_MAX_KEYS = 4096
+
+
+class RatePolicy(NamedTuple):
+    debounce_sec: Optional[float]   # None ならリスナーの既定値
+    rate_per_sec: Optional[float]   # None ならトークンバケットなし
+    burst: float
+    coalesce: bool
+
+
+_policy_pool: dict[RatePolicy, RatePolicy] = {}  # 同じポリシーは1つのタプルを共有する
+
+
+def make_policy(
+    debounce_ms: Optional[float] = None,
+    rate_per_sec: Optional[float] = None,
+    burst: Optional[float] = None,
+    coalesce: bool = False,
+) -> Optional[RatePolicy]:
+    """設定の値からポリシーを作る。全部省略（既定どおり）なら None"""
+    if rate_per_sec is not None and rate_per_sec <= 0:
+        rate_per_sec = None
+    if debounce_ms is None and rate_per_sec is None and not coalesce:
+        return None
+    policy = RatePolicy(
+        debounce_sec=max(0.0, debounce_ms / 1000.0) if debounce_ms is not None else None,
+        rate_per_sec=rate_per_sec,
+        burst=max(1.0, burst or 1.0),
+        coalesce=bool(coalesce),
+    )
+    return _policy_pool.setdefault(policy, policy)
+
+
+class _State:
+    __slots__ = ("last_fire", "tokens", "tokens_at")
+
+    def __init__(self) -> None:
+        self.last_fire: Optional[float] = None
+        self.tokens = 0.0
+        self.tokens_at: Optional[float] = None
+
+
+class RateLimiter:
+    def __init__(self, default_debounce_sec: float, max_keys: int = DEFAULT_MAX_KEYS) -> None:
+        self.default_debounce_sec = default_debounce_sec
+        self.max_keys = max(1, max_keys)
+        self._lock = threading.Lock()
+        self._states: "collections.OrderedDict[str, _State]" = collections.OrderedDict()
+
+        # メトリクス（ポリシー別に捨てた数）
+        self.suppressed: dict[str, int] = {DEBOUNCED: 0, RATE_LIMITED: 0}
+        self.evicted = 0
+
+    def allow(self, key: str, policy: Optional[RatePolicy], now: float) -> Optional[str]:
+        """通すなら None、捨てるなら理由（debounced / rate_limited）。now は time.monotonic()"""
+        debounce = self.default_debounce_sec
+        rate = None
+        if policy is not None:
+            if policy.debounce_sec is not None:
+                debounce = policy.debounce_sec
+            rate = policy.rate_per_sec
+        if debounce <= 0 and rate is None:
+            return None
+
+        with self._lock:
+            states = self._states
+            st = states.get(key)
+            if st is None:
+                st = states[key] = _State()
+                if len(states) > self.max_keys:
+                    states.popitem(last=False)
+                    self.evicted += 1
+            else:
+                states.move_to_end(key)
+
+            if st.last_fire is not None and now - st.last_fire < debounce:
+                self.suppressed[DEBOUNCED] += 1
+                return DEBOUNCED
+
+            if rate is not None:
+                burst = policy.burst
+                if st.tokens_at is None:
+                    tokens = burst
+                else:
+                    tokens = min(burst, st.tokens + (now - st.tokens_at) * rate)
+                st.tokens_at = now
+                if tokens < 1.0:
+                    st.tokens = tokens
+                    self.suppressed[RATE_LIMITED] += 1
+                    return RATE_LIMITED
+                st.tokens = tokens - 1.0
+
+            st.last_fire = now
+            return None
+
+    def retain(self, keys: Iterable[str]) -> int:
+        """再読込: 設定に残っている key の状態だけ残す。捨てた数を返す"""
+        keep = set(keys)
+        with self._lock:
+            drop = [k for k in self._states if k not in keep]
+            for k in drop:
+                del self._states[k]
+        return len(drop)
+
+    def __len__(self) -> int:
+        return len(self._states)
@@ -0,0 +1,313 @@
+# serial_bridge.py (ESP32 のシリアル出力をリスナーへ直接つなぐ)
+# -*- coding: utf-8 -*-
+"""
+ESP32-S3 デバイスが送るバイナリフレーム（app/common/serial_frame.py）を読み、
+イベントをそのままリスナーの実行キューへ渡す（HID の F13 を経由しない）。
+
+- ポートが無い / 抜けた ときは、間隔を延ばしながら自動で繋ぎ直す
+- フレーム毎に「受信 → 実行キュー投入」の時間と、デバイスの millis() から推定した
+  デバイス → ホストの遅延（最速だったフレームとの差）を記録し、stats() で p50 / p99 を返す
+- pyserial があれば使う。無い場合も Linux / macOS なら termios で直接開ける
+  （pty を使ったテスト: bench/check_serial_bridge.py）
+- イベント以外のフレーム（設定送信の ack など）は frame_handlers に種別毎の関数を渡して受け取る。
+  on_connect は接続直後とデバイスの HELLO 受信時に呼ばれる（設定の全体同期に使う）
+- デバイスへの書き込みは write_timeout 秒で諦める。他のスレッド（ホットキーのメッセージループなど）から
+  送りたいときは call_soon() でこのスレッドに渡す（止まったデバイスで呼び出し側が固まらない）
+"""
+from __future__ import annotations
+
+import collections
+import os
+import select
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+from serial_frame import FT_EVENT, FT_HELLO, Frame, FrameParser, event_name
+
+# (イベント名, 受信時刻 perf_counter) -> None なら成功、文字列ならエラー理由
+EventFn = Callable[[str, float], Optional[str]]
+FrameFn = Callable[[Frame], None]
+
+READ_SIZE = 256
+WRITE_TIMEOUT_SEC = 1.0   # 書き込みがこれ以上進まなければ OSError（送信バッファが詰まった / デバイスが止まった）
+
+
+class PosixTty:
+    """pyserial が無いときの POSIX 用シリアルポート（raw モード）"""
+    def __init__(self, path: str, baudrate: int, timeout: float, write_timeout: float = WRITE_TIMEOUT_SEC) -> None:
+        import termios
+        import tty
+
+        self._timeout = timeout
+        self._write_timeout = write_timeout
+        self._fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        try:
+            tty.setraw(self._fd)
+            speed = getattr(termios, f"B{baudrate}", None)
+            if speed is not None:
+                attrs = termios.tcgetattr(self._fd)
+                attrs[4] = attrs[5] = speed
+                termios.tcsetattr(self._fd, termios.TCSANOW, attrs)
+            os.set_blocking(self._fd, False)   # 書き込みを write_timeout で打ち切れるように（読み込みは select で待つ）
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def read(self, n: int) -> bytes:
+        """timeout 秒待っても何も来なければ b""。切断されたら OSError"""
+        r, _, _ = select.select([self._fd], [], [], self._timeout)
+        if not r:
+            return b""
+        try:
+            data = os.read(self._fd, n)
+        except BlockingIOError:
+            return b""
+        if not data:
+            raise OSError("serial port closed")
+        return data
+
+    def write(self, data: bytes) -> None:
+        """write_timeout 秒書けなければ TimeoutError（OSError）"""
+        view = memoryview(data)
+        deadline = time.monotonic() + self._write_timeout
+        while view:
+            _, w, _ = select.select([], [self._fd], [], max(0.0, deadline - time.monotonic()))
+            if not w:
+                raise TimeoutError(f"serial write timed out ({len(view)} bytes left)")
+            try:
+                n = os.write(self._fd, view)
+            except BlockingIOError:
+                continue
+            view = view[n:]
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+class PySerialPort:
+    """pyserial の Serial を read(n) が来た分だけ返す形に合わせる"""
+    def __init__(self, path: str, baudrate: int, timeout: float, write_timeout: float = WRITE_TIMEOUT_SEC) -> None:
+        import serial  # 任意依存
+
+        # write_timeout を過ぎると SerialTimeoutException（OSError の仲間）
+        self._s = serial.Serial(path, baudrate, timeout=timeout, write_timeout=write_timeout)
+
+    def read(self, n: int) -> bytes:
+        first = self._s.read(1)  # timeout まで待つ
+        if not first:
+            return b""
+        waiting = self._s.in_waiting
+        return first + self._s.read(min(n - 1, waiting)) if waiting else first
+
+    def write(self, data: bytes) -> None:
+        self._s.write(data)
+
+    def close(self) -> None:
+        self._s.close()
+
+
+def open_serial(path: str, baudrate: int = 115200, timeout: float = 0.1, write_timeout: float = WRITE_TIMEOUT_SEC):
+    try:
+        return PySerialPort(path, baudrate, timeout, write_timeout)
+    except ImportError:
+        if sys.platform == "win32":
+            raise ImportError("pyserial is required on Windows (pip install pyserial)") from None
+        return PosixTty(path, baudrate, timeout, write_timeout)
+
+
+def _percentiles(values) -> tuple[float, float]:
+    if not values:
+        return 0.0, 0.0
+    s = sorted(values)
+    return s[len(s) // 2], s[min(len(s) - 1, int(len(s) * 0.99))]
+
+
+class SerialBridge:
+    def __init__(
+        self,
+        port: str,
+        on_event: EventFn,
+        baudrate: int = 115200,
+        read_timeout: float = 0.1,
+        reconnect_min_sec: float = 0.5,
+        reconnect_max_sec: float = 5.0,
+        opener: Callable[[str, int, float], object] = open_serial,
+        history: int = 1000,
+        frame_handlers: Optional[dict[int, FrameFn]] = None,
+        on_connect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.port = port
+        self._on_event = on_event
+        self._frame_handlers = dict(frame_handlers or {})
+        self._on_connect = on_connect
+        self._baudrate = baudrate
+        self._read_timeout = read_timeout
+        self._reconnect_min_sec = reconnect_min_sec
+        self._reconnect_max_sec = reconnect_max_sec
+        self._opener = opener
+        self._stop = threading.Event()
+        self._th: Optional[threading.Thread] = None
+        self._tasks: collections.deque[Callable[[], object]] = collections.deque()  # call_soon() で渡された処理
+        self._conn = None
+        self._parser = FrameParser()
+        self._last_seq: Optional[int] = None
+        self._clock_offset_ms: Optional[float] = None  # ホスト時刻 - デバイス時刻 の最小値
+
+        # メトリクス
+        self.connected = False
+        self.connects = 0
+        self.events = 0
+        self.dispatch_failed = 0
+        self.dispatch_errors = 0
+        self.lost_frames = 0
+        self.device_version: Optional[int] = None
+        self.dispatch_us: collections.deque[float] = collections.deque(maxlen=history)
+        self.transit_ms: collections.deque[float] = collections.deque(maxlen=history)
+
+    def start(self) -> None:
+        self._th = threading.Thread(target=self._run, name="serial-bridge", daemon=True)
+        self._th.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._th is not None:
+            self._th.join(timeout=timeout)
+
+    def write(self, data: bytes) -> bool:
+        """デバイスへ送る（繋がっていなければ False）"""
+        conn = self._conn
+        if conn is None:
+            return False
+        try:
+            conn.write(data)
+            return True
+        except OSError:
+            return False
+
+    def call_soon(self, fn: Callable[[], object]) -> None:
+        """
+        fn をブリッジのスレッドで実行する（すぐ戻る）。デバイスへの送信を他のスレッドから頼むときに使う。
+        受信の合間（最大 read_timeout 秒後）に、渡した順に実行される。
+        """
+        self._tasks.append(fn)
+
+    # ---- 受信スレッド ----
+    def _run(self) -> None:
+        backoff = self._reconnect_min_sec
+        logged = False
+        while not self._stop.is_set():
+            self._run_tasks()
+            try:
+                conn = self._opener(self.port, self._baudrate, self._read_timeout)
+            except (OSError, ImportError) as e:
+                if not logged:
+                    print(f"[SERIAL] cannot open {self.port}: {e} (retrying)")
+                    logged = True
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self._reconnect_max_sec)
+                continue
+
+            backoff = self._reconnect_min_sec
+            logged = False
+            self._conn = conn
+            self._parser.reset()  # 途中まで読んだフレームは捨てる
+            self._last_seq = None
+            self.connected = True
+            self.connects += 1
+            print(f"[SERIAL] connected: {self.port}")
+            try:
+                self._run_tasks()
+                self._notify_connect()
+                while not self._stop.is_set():
+                    data = conn.read(READ_SIZE)
+                    if data:
+                        self._feed(data, time.perf_counter())
+                    self._run_tasks()
+            except OSError as e:
+                print(f"[SERIAL] disconnected: {self.port}: {e}")
+            finally:
+                self.connected = False
+                self._conn = None
+                conn.close()
+
+    def _feed(self, data: bytes, received_at: float) -> None:
+        for frame in self._parser.feed(data):
+            if frame.type == FT_HELLO:
+                # デバイスが（再）起動した: seq と millis() は最初からやり直し
+                self.device_version = frame.payload[0] if frame.payload else 0
+                self._clock_offset_ms = None
+                print(f"[SERIAL] device hello (protocol v{self.device_version})")
+                self._notify_connect()
+            elif self._last_seq is not None and frame.seq != (self._last_seq + 1) & 0xFF:
+                self.lost_frames += (frame.seq - self._last_seq - 1) & 0xFF
+            self._last_seq = frame.seq
+            self._track_transit(frame.t_ms, received_at)
+
+            if frame.type == FT_EVENT:
+                name = event_name(frame.payload)
+                self.events += 1
+                try:
+                    err = self._on_event(name, received_at)
+                except Exception as e:
+                    # 受信スレッドを落とさない（落ちると繋ぎ直しもされない）
+                    self.dispatch_errors += 1
+                    err = f"error: {e}"
+                self.dispatch_us.append((time.perf_counter() - received_at) * 1e6)
+                if err is not None:
+                    self.dispatch_failed += 1
+                    print(f"[SERIAL] event {name!r} not dispatched: {err}")
+            else:
+                handler = self._frame_handlers.get(frame.type)
+                if handler is not None:
+                    try:
+                        handler(frame)
+                    except Exception as e:
+                        print(f"[SERIAL] frame 0x{frame.type:02x} handler failed: {e}")
+
+    def _run_tasks(self) -> None:
+        while self._tasks:
+            fn = self._tasks.popleft()
+            try:
+                fn()
+            except Exception as e:
+                print(f"[SERIAL] task failed: {e}")
+
+    def _notify_connect(self) -> None:
+        if self._on_connect is None:
+            return
+        try:
+            self._on_connect()
+        except Exception as e:
+            print(f"[SERIAL] on_connect failed: {e}")
+
+    def _track_transit(self, t_ms: int, received_at: float) -> None:
+        host_ms = received_at * 1000.0
+        offset = host_ms - t_ms
+        if self._clock_offset_ms is None or offset < self._clock_offset_ms:
+            self._clock_offset_ms = offset
+        self.transit_ms.append(offset - self._clock_offset_ms)
+
+    def stats(self) -> dict:
+        d50, d99 = _percentiles(self.dispatch_us)
+        t50, t99 = _percentiles(self.transit_ms)
+        p = self._parser
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "frames": p.frames,
+            "events": self.events,
+            "dispatch_failed": self.dispatch_failed,
+            "dispatch_errors": self.dispatch_errors,
+            "crc_errors": p.crc_errors,
+            "skipped_bytes": p.skipped_bytes,
+            "lost_frames": self.lost_frames,
+            "dispatch_us_p50": d50,
+            "dispatch_us_p99": d99,
+            "transit_ms_p50": t50,
+            "transit_ms_p99": t99,
+        }
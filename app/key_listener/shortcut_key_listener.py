@@ -2,49 +2,285 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import ctypes
-from ctypes import wintypes
-import json
+import signal
+import sys
 import time
-import subprocess
 import threading
-import queue
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+# リスナー / WebUI 共用モジュール（app/common）
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "common"))
+
+import config_store
+import injector
+import launcher
+import py_action
+from supervisor import ProcessSupervisor
+from config_watcher import FileWatcher, sync_watchers
+from executor import ActionExecutor
+from rate_limit import COALESCED, DEBOUNCED as SUPPRESS_DEBOUNCED, RATE_LIMITED, RateLimiter, RatePolicy, make_policy
+from hotkey_backend import FakeBackend, HotkeyBackend, create_backend
+from message_source import EV_HOTKEY, EV_RELOAD, EV_STOP, EV_TIMER, Win32MessageSource
+from chord import MATCH, PENDING, ChordMatcher, ChordNode, ChordTrie, Conflict, DeadlineTimer
+from hotkeys import (  # noqa: F401 (再エクスポート)
+    find_conflicts, find_sequence_conflicts, format_stroke, parse_hotkey, split_sequence, vk_from_key_name,
+)
+from metrics import DEBOUNCED, SPAWN_RETURNED, SPAWNED, LatencyMetrics, MetricsServer, Trace, render_gauges
+from trigger_log import TriggerLog
+from trigger_server import DEFAULT_ADDRESS as DEFAULT_TRIGGER_ADDRESS, TriggerServer
+from serial_bridge import SerialBridge
+from serial_frame import FT_CFG_ACK
+from device_config import ConfigPusher
 
 # ====== 設定 ======
 CONFIG_PATH = Path("config/shortcut_config.json")
 
-POLL_INTERVAL_SEC = 0.5   # 設定ファイル更新チェック間隔
-DEBOUNCE_SEC = 0.30       # 同一hotkeyの連打抑止（秒）
+# ホットキーの監視方法: auto（Windows は win32、それ以外は keyboard）/ win32 / keyboard / fake
+HOTKEY_BACKEND = "auto"
+
+DEBOUNCE_SEC = 0.30       # 同じショートカットの連打抑止（秒。設定の debounce_ms で上書き）
+RATE_LIMIT_MAX_KEYS = 4096  # 連打抑止 / レート制限の状態を持つショートカット数の上限（超えたら古いものから捨てる）
+CHORD_TIMEOUT_SEC = 1.0   # "ctrl+k, ctrl+c" の次のキーを待つ最大秒数
+CONFIG_DEBOUNCE_SEC = 0.005  # 設定ファイルの連続書き込みを1回の再読込にまとめる静止時間（秒）
+
+# 実行プール
+EXECUTOR_WORKERS = 4            # 同時に実行できるアクション数
+EXECUTOR_MAX_QUEUE = 256        # 実行待ちキューの上限
+EXECUTOR_QUEUE_POLICY = "drop_oldest"  # 満杯時: drop_oldest / drop_newest / block
+EXECUTOR_BLOCK_TIMEOUT_SEC = 1.0       # block 時に待つ最大秒数
+DEFAULT_MAX_CONCURRENCY = 1     # ショートカット毎の同時実行数（設定の max_concurrency で上書き）
+DEFAULT_MAX_AGE_MS = None       # 押下からこれ以上待たされたジョブは捨てる（設定の max_age_ms で上書き。None=無期限）
+
+# 子プロセス監視
+MAX_LIVE_CHILDREN = 32          # アクションが起動して生きている子プロセスの上限（超えたら起動しない）
+DEFAULT_TIMEOUT_SEC = None      # 子プロセスをこの秒数で kill（設定の timeout_sec で上書き。None=無期限）
+
+# action_type "python"（プロセスを起動せずに関数を呼ぶ。py_action.py）
+PY_ACTION_PATHS = [Path("actions")]   # "module:function" の module を探す場所（sys.path の前に足す）
+PY_ACTION_TIMEOUT_SEC = 5.0           # 関数の実行時間の上限（設定の timeout_sec で上書き。0 で無期限）
+
+# action_type "type_text" / "macro"（キー入力の合成。injector.py）
+INJECT_BACKEND = "auto"   # auto（Windows は win32 = SendInput、それ以外は keyboard）/ win32 / keyboard / fake
+
+# トリガー履歴（JSON Lines、バックグラウンドでまとめて追記）
+TRIGGER_LOG_PATH = Path("logs/trigger_log.jsonl")
+TRIGGER_LOG_MAX_BYTES = 5 * 1024 * 1024   # これを超えたらローテート
+TRIGGER_LOG_BACKUPS = 3
+LAST_TRIGGER_PATH: Path | None = Path("last_trigger.txt")  # 従来互換の最終トリガー表示（None で出力しない）
+
+# 遅延計測（http://127.0.0.1:<port>/metrics に Prometheus 形式で公開。None で無効）
+METRICS_PORT: int | None = 9464
+
+# 他プロセスから id 指定で発火させるローカルソケット（None で無効）
+# 既定は Linux / macOS ならユーザー毎の Unix ドメインソケット、Windows は無効。
+# "tcp://127.0.0.1:9465" はループバックだが認証が無く、同じ PC の他のユーザーからも発火できる
+TRIGGER_SERVER_ADDRESS: str | None = DEFAULT_TRIGGER_ADDRESS
+
+# ESP32-S3 デバイスのシリアルポート（"COM5" / "/dev/ttyACM0" など。None で無効）
+# デバイスのイベントは設定の "device_event" が一致するショートカットとして実行する
+SERIAL_PORT: str | None = None
+SERIAL_BAUDRATE = 115200
+# 接続中のデバイスのメニューへショートカット一覧（id / title）を送る（device_config.py）
+SERIAL_PUSH_CONFIG = True
+
+supervisor = ProcessSupervisor(max_children=MAX_LIVE_CHILDREN)
+trigger_log = TriggerLog(
+    TRIGGER_LOG_PATH,
+    max_bytes=TRIGGER_LOG_MAX_BYTES,
+    backups=TRIGGER_LOG_BACKUPS,
+    compat_path=LAST_TRIGGER_PATH,
+)
+latency = LatencyMetrics()
+py_actions = py_action.PyActionResolver()
+config_reader = config_store.ConfigSetReader(CONFIG_PATH)   # 内容が変わった shard だけ読み直す
+
+
+def _stroke_name(mods: int, vk: int) -> str:
+    try:
+        return format_stroke(mods, vk)
+    except ValueError:
+        return f"vk=0x{vk:02x}"   # キー表に無い vk（表示用なので落とさない）
+
+
+@lru_cache(maxsize=None)
+def _hotkey_name(mods: int, vk: int, sequence: tuple[tuple[int, int], ...]) -> str:
+    """CompiledShortcut.hotkey の中身。発火毎のログで使うので、使われたものだけ作って覚えておく"""
+    return ", ".join(_stroke_name(m, v) for m, v in ((mods, vk),) + sequence)
+
+
+class CompiledShortcut(NamedTuple):
+    """
+    load_shortcuts() が設定1件を事前コンパイルした不変レコード。
+    発火時は handler(self) を呼ぶだけで、dict の参照やコマンドの解析はしない。
+    hotkey / action_type / value は strokes / handler / target から引ける（件数分持たない）。
+    """
+    id: str
+    title: str
+    mods: int                 # parse_hotkey() 済み
+    vk: int
+    handler: Callable[["CompiledShortcut"], Any]
+    target: Any               # handler が使う事前解析済みの対象（run_cmd / open_url は launcher.LaunchSpec、python は py_action.PyTarget、type_text / macro は injector.Macro）
+    priority: int
+    max_concurrency: int | None
+    max_age_ms: int | None
+    timeout_sec: float | None
+    device_event: str | None = None   # ESP32 から受けるイベント名（serial_bridge）
+    sequence: tuple[tuple[int, int], ...] = ()   # "ctrl+k, ctrl+c" の2打目以降の (mods, vk)
+    rate_policy: RatePolicy | None = None        # debounce_ms / rate_per_sec / burst / coalesce（None = 既定）
+
+    @property
+    def key(self) -> str:
+        """同時実行数などを数える単位（id が無い旧設定は hotkey）"""
+        return self.id or self.hotkey
+
+    @property
+    def hotkey(self) -> str:
+        """正規化したホットキー（"ctrl+k, ctrl+c"）"""
+        return _hotkey_name(self.mods, self.vk, self.sequence)
+
+    @property
+    def action_type(self) -> str:
+        if self.handler is run_python_action:
+            return py_action.ACTION_TYPE
+        if self.handler is run_inject_action:
+            return self.target.action_type
+        return "open_url" if self.target.kind == launcher.KIND_OPEN else "run_cmd"
+
+    @property
+    def value(self) -> str:
+        """ログ表示用の対象（コマンド / URL / module:function。type_text / macro はキーイベント数）"""
+        if isinstance(self.target, launcher.LaunchSpec):
+            return self.target.command
+        if isinstance(self.target, py_action.PyTarget):
+            return self.target.spec
+        return f"{len(self.target.events)} key events"
+
+    @property
+    def binding(self) -> tuple[int, int]:
+        """OS に登録するキー（複数ストロークなら1打目）"""
+        return (self.mods, self.vk)
+
+    @property
+    def strokes(self) -> tuple[tuple[int, int], ...]:
+        return ((self.mods, self.vk),) + self.sequence
+
+    @property
+    def coalesce(self) -> bool:
+        """実行中は待ちを1件までにまとめる（executor が見る）"""
+        return self.rate_policy is not None and self.rate_policy.coalesce
+
+
+def _num_option(sc: dict, name: str, conv: Callable[[Any], Any] = int) -> Any:
+    v = sc.get(name)
+    if v is None or v == "":
+        return None
+    try:
+        return conv(v)
+    except (TypeError, ValueError):
+        print(f"[LISTENER] ignore invalid {name}={v!r} ({sc.get('hotkey')!r})")
+        return None
+
+
+def spawn_action(sc: CompiledShortcut) -> None:
+    """run_cmd / open_url: 子プロセスを起動して supervisor の監視下に置く"""
+    timeout = sc.timeout_sec if sc.timeout_sec is not None else DEFAULT_TIMEOUT_SEC
+    supervisor.spawn(sc.target, key=sc.key, timeout_sec=timeout)
+
 
-# Windows constants
-WM_HOTKEY = 0x0312
+def run_python_action(sc: CompiledShortcut) -> None:
+    """python: 実行プールのワーカーでそのまま関数を呼ぶ（timeout_sec を過ぎたら TimeoutError）"""
+    timeout = sc.timeout_sec if sc.timeout_sec is not None else PY_ACTION_TIMEOUT_SEC
+    py_action.call(sc.target, timeout)
 
-MOD_ALT      = 0x0001
-MOD_CONTROL  = 0x0002
-MOD_SHIFT    = 0x0004
-MOD_WIN      = 0x0008
-MOD_NOREPEAT = 0x4000  # 押しっぱなし時の繰り返し抑止
 
-user32 = ctypes.windll.user32
-kernel32 = ctypes.windll.kernel32
+_injector: injector.Injector | None = None
+_injector_lock = threading.Lock()
 
 
-def open_url(url: str) -> None:
-    # 既定ブラウザで開く
-    subprocess.Popen(f'start "" "{url}"', shell=True)
+def get_injector() -> injector.Injector:
+    """最初に type_text / macro を実行したときに作る（keyboard ライブラリが無い環境でも他の動作は使える）"""
+    global _injector
+    with _injector_lock:
+        if _injector is None:
+            _injector = injector.create_injector(INJECT_BACKEND)
+        return _injector
 
 
-def run_cmd(cmd: str) -> None:
-    subprocess.Popen(cmd, shell=True)
+def run_inject_action(sc: CompiledShortcut) -> None:
+    """type_text / macro: 読み込み時に作ったキーイベントの列を1回で送る"""
+    get_injector().run(sc.target)
+
+
+_mods_pool: dict[int, int] = {}  # 修飾キーの組み合わせは数種類しかないので int を共有する
+_stroke_pool: dict[str, tuple[int, int]] = {}  # "ctrl+k" -> (mods, vk)。ストロークの書き方は限られるので解析結果を共有する
+
+
+def _parse_stroke(text: str) -> tuple[int, int]:
+    stroke = _stroke_pool.get(text)
+    if stroke is None:
+        stroke = _stroke_pool[text] = parse_hotkey(text)
+    return stroke
+
+
+def compile_shortcut(sc: dict) -> CompiledShortcut:
+    hotkey = (sc.get("hotkey") or "").strip().lower()
+    first, *rest = split_sequence(hotkey)
+    mods, vk = _parse_stroke(first)
+    mods = _mods_pool.setdefault(mods, mods)
+    sequence = tuple(_parse_stroke(part) for part in rest)
+    action_type = sc.get("action_type") or "run_cmd"
+    value = sc.get("value") or ""
+
+    handler: Callable[[CompiledShortcut], Any] = spawn_action
+    if action_type in injector.ACTION_TYPES:
+        # 文字列 / キー操作の列をキーイベントの列にしておく
+        target = injector.compile_action(
+            action_type, value, pace_ms=_num_option(sc, "pace_ms", float), chunk=_num_option(sc, "chunk"),
+        )
+        handler = run_inject_action
+    elif action_type == py_action.ACTION_TYPE:
+        # import して関数まで引いておく（モジュールは再読込をまたいでキャッシュ）
+        target = py_actions.resolve(value, sc.get("args"))
+        handler = run_python_action
+    elif action_type == "open_url":
+        # 既定ブラウザで開く
+        target = launcher.url_spec(value)
+    else:
+        # シェルは "shell": true を明示したものだけ
+        shell = bool(sc.get("shell"))
+        target = launcher.parse_command(value, shell=shell)
+        if not shell and launcher.needs_shell(value):
+            print(f"[LISTENER] {hotkey!r}: command may need a shell, set \"shell\": true if it fails: {value!r}")
+        elif target.kind == launcher.KIND_EXEC and target.executable is None:
+            print(f"[LISTENER] {hotkey!r}: executable not found in PATH: {target.argv[0]!r}")
+
+    return CompiledShortcut(
+        id=str(sc.get("id") or ""),
+        title=sc.get("title", ""),
+        mods=mods,
+        vk=vk,
+        handler=handler,
+        target=target,
+        priority=_num_option(sc, "priority") or 0,
+        max_concurrency=_num_option(sc, "max_concurrency"),
+        max_age_ms=_num_option(sc, "max_age_ms"),
+        timeout_sec=_num_option(sc, "timeout_sec", float),
+        device_event=sc.get("device_event") or None,
+        sequence=sequence,
+        rate_policy=make_policy(
+            debounce_ms=_num_option(sc, "debounce_ms", float),
+            rate_per_sec=_num_option(sc, "rate_per_sec", float),
+            burst=_num_option(sc, "burst", float),
+            coalesce=bool(sc.get("coalesce")),
+        ),
+    )
 
 
-def execute(sc: dict) -> None:
-    title = sc.get("title", "")
-    hotkey = sc.get("hotkey", "")
-    action_type = sc.get("action_type", "run_cmd")
-    value = sc.get("value", "")
-    print(f"[EXEC] {title} | {hotkey} | {action_type} | {value}")
+def execute(sc: CompiledShortcut, trace: Trace | None = None) -> None:
+    print(f"[EXEC] {sc.title} | {sc.hotkey} | {sc.action_type} | {sc.value}")
 
     # トリガー確認用
     try:
@@ -53,293 +289,579 @@ def execute(sc: dict) -> None:
     except Exception:
         pass
 
-    # トリガーが走った証拠（ファイル更新）
-    try:
-        Path("last_trigger.txt").write_text(
-            f"{time.strftime('%Y-%m-%d %H:%M:%S')} | {title} | {hotkey}\n",
-            encoding="utf-8"
-        )
-    except Exception:
-        pass
+    # トリガーが走った証拠（書き込みは別スレッドでまとめて行う。詰まっていたら捨てる）
+    trigger_log.record({
+        "ts": time.time(),
+        "id": sc.id,
+        "title": sc.title,
+        "hotkey": sc.hotkey,
+        "action_type": sc.action_type,
+    })
 
     # 実行本体
-    if action_type == "open_url":
-        open_url(value)
-    else:
-        run_cmd(value)
+    if trace is None:
+        sc.handler(sc)
+        return
+    trace.mark(SPAWNED)
+    try:
+        sc.handler(sc)
+    finally:
+        trace.mark(SPAWN_RETURNED)
+        latency.observe(trace)
 
 
-def load_shortcuts() -> list[dict]:
-    with CONFIG_PATH.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+def _compile_one(sc: dict) -> CompiledShortcut | None:
+    hk = (sc.get("hotkey") or "").strip().lower()
+    if not hk:
+        return None
+    try:
+        return compile_shortcut(sc)
+    except Exception as e:
+        print(f"[LISTENER] skip invalid shortcut {hk!r}: {e}")
+        return None
 
-    shortcuts = data.get("shortcuts", [])
-    if not isinstance(shortcuts, list):
-        raise ValueError("shortcuts must be a list")
 
-    out: list[dict] = []
-    for sc in shortcuts:
-        hk = (sc.get("hotkey") or "").strip().lower()
-        if not hk:
-            continue
-        item = dict(sc)
-        item["hotkey"] = hk
-        out.append(item)
-    return out
+# shard ごとのコンパイル結果: (パス, hash) -> shard の shortcuts と同じ並びの CompiledShortcut | None
+# hash が同じなら中身も並びも同じなので、ConfigSet の (origins, positions) で引ける（設定の dict は持たない）
+_compiled_shards: dict[tuple[Path, str], list[CompiledShortcut | None]] = {}
 
 
-# ---- Hotkey parsing (e.g. "ctrl+alt+f13") ----
-def vk_from_key_name(key: str) -> int:
+def compile_config(cs: config_store.ConfigSet) -> list[CompiledShortcut]:
     """
-    よく使うキーだけ対応（必要なら追加OK）
+    まとめた設定を事前コンパイルする。内容が変わった shard のものだけコンパイルし直し、
+    他の shard は前回の CompiledShortcut をそのまま使う。
     """
-    key = key.lower().strip()
-
-    # F1-F24
-    if key.startswith("f") and key[1:].isdigit():
-        n = int(key[1:])
-        if 1 <= n <= 24:
-            return 0x70 + (n - 1)  # F1=0x70 ... F24=0x87
-
-    # A-Z
-    if len(key) == 1 and "a" <= key <= "z":
-        return ord(key.upper())
-
-    # 0-9
-    if len(key) == 1 and "0" <= key <= "9":
-        return ord(key)
-
-    special = {
-        "tab": 0x09,
-        "enter": 0x0D,
-        "return": 0x0D,
-        "esc": 0x1B,
-        "escape": 0x1B,
-        "space": 0x20,
-        "backspace": 0x08,
-        "delete": 0x2E,
-        "ins": 0x2D,
-        "insert": 0x2D,
-        "home": 0x24,
-        "end": 0x23,
-        "pgup": 0x21,
-        "pageup": 0x21,
-        "pgdn": 0x22,
-        "pagedown": 0x22,
-        "up": 0x26,
-        "down": 0x28,
-        "left": 0x25,
-        "right": 0x27,
-    }
-    if key in special:
-        return special[key]
-
-    raise ValueError(
-        f"Unsupported key: {key!r} "
-        f"(try ctrl+f1, ctrl+f2, a-z, 0-9, tab/enter/esc/space etc.)"
-    )
-
-
-def parse_hotkey(hotkey: str) -> tuple[int, int]:
+    keys = [(shard.path, shard.hash) for shard in cs.shards]
+    stale = [shard for shard, key in zip(cs.shards, keys) if key not in _compiled_shards]
+    if stale:
+        launcher.resolve_executable.cache_clear()  # PATH の変更を拾えるよう読み込み毎に引き直す
+        py_actions.begin_reload()                   # python アクションのモジュールは変更されたものだけ読み直す
+    for shard in stale:
+        _compiled_shards[(shard.path, shard.hash)] = [
+            _compile_one(sc) if isinstance(sc, dict) else None for sc in shard.shortcuts
+        ]
+    live = set(keys)
+    for key in [k for k in _compiled_shards if k not in live]:
+        del _compiled_shards[key]
+
+    by_path = {path: _compiled_shards[(path, h)] for path, h in keys}
+    records = [by_path[path][pos] for path, pos in zip(cs.origins, cs.positions)]
+    dropped = drop_conflicts(records, cs.origins)
+    return [sc for i, sc in enumerate(records) if sc is not None and i not in dropped]
+
+
+def load_shortcuts() -> list[CompiledShortcut] | None:
     """
-    examples:
-      - "ctrl+f1"
-      - "ctrl+f2"
-      - "ctrl+alt+f3"
-      - "win+shift+f4"
+    設定（include した shard を含む）を読んで事前コンパイルする。前回読んだときと内容
+    （config_store の hash）が同じなら None（保存し直し / 空白だけの変更では登録し直さない）。
     """
-    parts = [p.strip().lower() for p in hotkey.split("+") if p.strip()]
-    if not parts:
-        raise ValueError("empty hotkey")
-
-    mods = 0
-    key_part = None
-
-    for p in parts:
-        if p in ("ctrl", "control"):
-            mods |= MOD_CONTROL
-        elif p == "alt":
-            mods |= MOD_ALT
-        elif p == "shift":
-            mods |= MOD_SHIFT
-        elif p in ("win", "windows", "meta"):
-            mods |= MOD_WIN
-        else:
-            # 最後に残ったものをキーとみなす（複数あるならエラー）
-            if key_part is not None:
-                raise ValueError(f"hotkey has multiple keys: {hotkey!r}")
-            key_part = p
-
-    if key_part is None:
-        raise ValueError(f"no key specified in hotkey: {hotkey!r}")
-
-    vk = vk_from_key_name(key_part)
+    cs = config_reader.read()
+    if cs is None:
+        return None
+    try:
+        for p in cs.missing:
+            print(f"[CONFIG] include not found: {p}")
+        for d in cs.duplicates:
+            print(f"[CONFIG] duplicate id {d.id!r} in {d.dropped} (kept the one in {d.kept})")
+        return compile_config(cs)
+    except Exception:
+        config_reader.reset()  # 次の再読込でもう一度試す
+        raise
 
-    # 押しっぱなしによる連続発火抑止
-    mods |= MOD_NOREPEAT
 
-    return mods, vk
+def drop_conflicts(records: list, origins: list | None = None) -> set[int]:
+    """
+    同じキー（"ctrl+alt+f1" と "alt+ctrl+f1" も同じ）や先頭が一致する列を、OS に登録する前にまとめて見つける。
+    records は事前コンパイル済みのレコードの並び（解析できなかったものは None。_compile_one が報告済み）。
+    後に書いた方を外す。外す位置（records の添字）を返す。
+    origins（それぞれが書かれていたファイル）があれば、ファイルをまたぐ衝突にファイル名を添える。
+    """
+    drop: set[int] = set()
+    for c in find_sequence_conflicts([sc.strokes if sc is not None else None for sc in records]):
+        drop.add(c.index)
+        sc, other = records[c.index], records[c.other]
+        where = ""
+        if origins is not None and origins[c.index] != origins[c.other]:
+            where = f" in {origins[c.index]} (kept the one in {origins[c.other]})"
+        print(f"[LISTENER] skip hotkey {sc.hotkey!r} ({sc.title!r}):"
+              f" {c.reason} {other.hotkey!r} ({other.title!r}) [{c.detail}]{where}")
+    return drop
+
+
+@dataclass
+class ReloadStats:
+    added: int = 0
+    removed: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    conflicts: int = 0
+    elapsed_ms: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"+{self.added} -{self.removed} ~{self.updated} ={self.unchanged}"
+            f" failed={self.failed} conflicts={self.conflicts} ({self.elapsed_ms:.2f} ms)"
+        )
 
 
 class HotkeyListener:
     """
-    RegisterHotKey でホットキー登録し、
-    WM_HOTKEY を受け取って実行キューへ積む。
+    バックエンド（RegisterHotKey など）でホットキー登録し、
+    押下イベントを受け取って実行キューへ積む。
+    backend を省略すると FakeBackend（OS に触らない。テスト / ベンチマーク用）。
     """
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        execute_fn: Callable[[CompiledShortcut], None] | None = None,
+        backend: HotkeyBackend | None = None,
+    ) -> None:
+        self.backend = backend if backend is not None else FakeBackend()
         self._lock = threading.RLock()
-        self._id_to_sc: dict[int, dict] = {}
-        self._registered_ids: set[int] = set()
+        # 登録ID -> レコード。再読込時は丸ごと作り直して差し替える（読み側はロック不要）
+        # 複数ストロークの1打目は ChordNode（続きは照合器で見る）
+        self._table: tuple[CompiledShortcut | ChordNode | None, ...] = ()
+        self._by_id: dict[str, CompiledShortcut] = {}  # id -> レコード（IPC 発火用。こちらも丸ごと差し替え）
+        self._by_event: dict[str, CompiledShortcut] = {}  # device_event -> レコード（シリアル用）
+        self._binding_to_id: dict[tuple[int, int], int] = {}  # (mods, vk) -> 登録ID
+        self._free_ids: list[int] = []
         self._next_id = 1
 
-        self._job_q: "queue.Queue[dict]" = queue.Queue()
-        self._stop = threading.Event()
-
-        self._last_fire: dict[str, float] = {}
-
-        self._worker_th = threading.Thread(target=self._worker, daemon=True)
-        self._worker_th.start()
+        # 複数ストローク: 照合器と、途中まで押されている間だけ登録する続きのキー（登録ID -> (mods, vk)）
+        self._chords = ChordMatcher(ChordTrie(), CHORD_TIMEOUT_SEC)
+        self._chord_grabs: dict[int, tuple[int, int]] = {}
+        self._chord_token = 0
+        self._chord_timer = DeadlineTimer(self.backend.post_timer)
+
+        self.reload_count = 0
+        self.last_reload: ReloadStats | None = None
+
+        # ショートカット毎の連打抑止 / トークンバケット（coalesce は実行キュー側）
+        self.limiter = RateLimiter(DEBOUNCE_SEC, max_keys=RATE_LIMIT_MAX_KEYS)
+
+        self.executor = ActionExecutor(
+            execute_fn or execute,
+            workers=EXECUTOR_WORKERS,
+            max_queue=EXECUTOR_MAX_QUEUE,
+            policy=EXECUTOR_QUEUE_POLICY,
+            block_timeout_sec=EXECUTOR_BLOCK_TIMEOUT_SEC,
+            default_max_concurrency=DEFAULT_MAX_CONCURRENCY,
+            default_max_age_ms=DEFAULT_MAX_AGE_MS,
+        )
 
     def stop(self) -> None:
-        self._stop.set()
-
-    def _worker(self) -> None:
-        while not self._stop.is_set():
-            try:
-                sc = self._job_q.get(timeout=0.2)
-            except queue.Empty:
-                continue
-            try:
-                execute(sc)
-            except Exception as e:
-                print("[EXEC] failed:", e)
-            finally:
-                self._job_q.task_done()
-
-    def _enqueue(self, sc: dict) -> None:
-        hk = sc.get("hotkey", "")
-        now = time.time()
-        last = self._last_fire.get(hk, 0.0)
-        if hk and (now - last) < DEBOUNCE_SEC:
-            return
-        self._last_fire[hk] = now
-        self._job_q.put(sc)
+        self._chord_timer.close()
+        self.executor.shutdown()
+
+    def _enqueue(self, sc: CompiledShortcut, received_at: float | None = None) -> str | None:
+        """実行キューへ積む。積めなかったらその理由（debounced / rate_limited / coalesced / rejected）を返す"""
+        triggered_at = time.monotonic()  # max_age_ms / 連打抑止の起点
+        reason = self.limiter.allow(sc.key, sc.rate_policy, triggered_at)
+        if reason is not None:
+            return reason
+        trace = Trace(sc.key, received_at)
+        trace.mark(DEBOUNCED)
+        reason = self.executor.offer(sc, enqueued_at=triggered_at, trace=trace)
+        if reason is None:
+            return None
+        return COALESCED if reason == COALESCED else "rejected"
+
+    def _alloc_id(self) -> int:
+        # RegisterHotKey の ID は 0x0000-0xBFFF。再読込を繰り返しても増え続けないよう再利用する
+        if self._free_ids:
+            return self._free_ids.pop()
+        hid = self._next_id
+        self._next_id += 1
+        return hid
 
     def unregister_all(self) -> None:
         with self._lock:
-            for hid in list(self._registered_ids):
+            self._chord_release()
+            for hid in list(self._binding_to_id.values()):
                 try:
-                    user32.UnregisterHotKey(None, hid)
+                    self.backend.unregister(hid)
                 except Exception:
                     pass
-            self._registered_ids.clear()
-            self._id_to_sc.clear()
+            self._binding_to_id.clear()
+            self._table = ()
+            self._by_id = {}
+            self._by_event = {}
+            self._free_ids.clear()
             self._next_id = 1
 
-    def register_shortcuts(self, shortcuts: list[dict]) -> None:
+    def register_shortcuts(self, shortcuts: list[CompiledShortcut]) -> ReloadStats:
         """
-        いったん全解除してから再登録（安全）
+        現在の登録との差分だけを反映する。
+          - 消えた (mods, vk) だけ UnregisterHotKey
+          - 増えた (mods, vk) だけ RegisterHotKey
+          - 同じ (mods, vk) で中身が変わったものは登録IDはそのままで action だけ差し替え
+        差し替え中も既存のホットキーは生きたまま。
+        複数ストロークはトライ木にまとめ、OS には1打目だけを登録する（1打のものは今まで通り dict）。
+        重複や「一方が他方の先頭と一致する」ものはここで見つけて、後に書いた方を登録しない。
         """
+        t0 = time.perf_counter()
+        stats = ReloadStats()
+
+        wanted: dict[tuple[int, int], CompiledShortcut | ChordNode] = {}
+        trie = ChordTrie()
+        for sc in shortcuts:
+            other = wanted.get(sc.binding)
+            if not sc.sequence:
+                if other is None:
+                    wanted[sc.binding] = sc
+                    continue
+                conflict = Conflict("duplicate", other) if type(other) is CompiledShortcut else \
+                    Conflict("is_prefix", other.first_value())
+            elif type(other) is CompiledShortcut:
+                conflict = Conflict("has_prefix", other)
+            else:
+                conflict = trie.insert(sc.strokes, sc)
+                if conflict is None:
+                    wanted[sc.binding] = trie.root.children[sc.binding]
+                    continue
+            stats.conflicts += 1
+            print(f"[LISTENER] skip hotkey {sc.hotkey!r}: {conflict.reason} {conflict.other.hotkey!r}")
+
         with self._lock:
-            self.unregister_all()
+            self._chord_release()
+            table = list(self._table)
 
-            for sc in shortcuts:
-                hk = sc.get("hotkey", "")
+            for binding in [b for b in self._binding_to_id if b not in wanted]:
+                hid = self._binding_to_id.pop(binding)
                 try:
-                    mods, vk = parse_hotkey(hk)
-                except Exception as e:
-                    print(f"[LISTENER] skip invalid hotkey {hk!r}: {e}")
+                    self.backend.unregister(hid)
+                except Exception:
+                    pass
+                table[hid] = None
+                self._free_ids.append(hid)
+                stats.removed += 1
+
+            for binding, sc in wanted.items():
+                hid = self._binding_to_id.get(binding)
+                if hid is not None:
+                    if table[hid] == sc:
+                        stats.unchanged += 1
+                    else:
+                        table[hid] = sc
+                        stats.updated += 1
                     continue
 
-                hid = self._next_id
-                self._next_id += 1
-
-                ok = user32.RegisterHotKey(None, hid, mods, vk)
+                mods, vk = binding
+                hid = self._alloc_id()
+                hotkey = sc.hotkey if isinstance(sc, CompiledShortcut) else sc.first_value().hotkey
+                ok = self.backend.register(hid, mods, vk, hotkey)
                 if not ok:
-                    err = kernel32.GetLastError()
-                    print(f"[LISTENER] RegisterHotKey failed: {hk!r} (id={hid}) err={err}")
+                    err = self.backend.last_error
+                    print(f"[LISTENER] register hotkey failed: {hotkey!r} (id={hid}) err={err}")
+                    self._free_ids.append(hid)
+                    stats.failed += 1
                     continue
 
-                self._registered_ids.add(hid)
-                self._id_to_sc[hid] = sc
+                self._binding_to_id[binding] = hid
+                if hid >= len(table):
+                    table.extend([None] * (hid + 1 - len(table)))
+                table[hid] = sc
+                stats.added += 1
 
-            print(f"[LISTENER] registered {len(self._registered_ids)} hotkeys")
-
-    def message_loop_tick(self) -> None:
+            self._table = tuple(table)
+            # ホットキーの登録に失敗したものも id 指定なら発火できる
+            by_id: dict[str, CompiledShortcut] = {}
+            by_event: dict[str, CompiledShortcut] = {}
+            for sc in shortcuts:
+                if sc.id:
+                    by_id.setdefault(sc.id, sc)
+                if sc.device_event:
+                    by_event.setdefault(sc.device_event, sc)
+            self._by_id = by_id
+            self._by_event = by_event
+            self._chords.set_trie(trie)
+            self.limiter.retain(sc.key for sc in shortcuts)
+
+            stats.elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            self.reload_count += 1
+            self.last_reload = stats
+            print(f"[LISTENER] registered {len(self._binding_to_id)} hotkeys: {stats.summary()}")
+
+        return stats
+
+    def dispatch_hotkey(self, hid: int, received_at: float | None = None) -> None:
+        table = self._table  # スナップショット（差し替えはアトミック）
+        entry = table[hid] if 0 <= hid < len(table) else None
+        if type(entry) is CompiledShortcut:
+            # 複数ストロークの途中なら、続きのキーかどうかを先に見る
+            if self._chords.node is None or not self._feed_chord(entry.binding, received_at):
+                self._enqueue(entry, received_at)
+        elif entry is not None:
+            self._feed_chord(entry.strokes[0], received_at)
+        else:
+            stroke = self._chord_grabs.get(hid)
+            if stroke is not None:
+                self._feed_chord(stroke, received_at)
+
+    # ---- 複数ストローク（dispatch_hotkey と同じスレッドから呼ぶ） ----
+    def _feed_chord(self, stroke: tuple[int, int], received_at: float | None) -> bool:
+        """照合器へ1打渡す。列の一部として使ったら True"""
+        kind, value = self._chords.feed(stroke, time.monotonic())
+        if kind == PENDING:
+            self._chord_grab(value)
+            return True
+        self._chord_release()
+        if kind == MATCH:
+            self._enqueue(value, received_at)
+            return True
+        return False
+
+    def _chord_grab(self, node: ChordNode) -> None:
+        """続きのキーを、待っている間だけ OS に登録する（普段はアプリにそのまま届く）"""
+        with self._lock:
+            self._chord_release()
+            grabs: dict[int, tuple[int, int]] = {}
+            for stroke in node.children:
+                if stroke in self._binding_to_id:
+                    continue  # 1打目として常に登録済み（dispatch_hotkey から照合器へ回る）
+                hid = self._alloc_id()
+                if self.backend.register(hid, stroke[0], stroke[1], ""):
+                    grabs[hid] = stroke
+                else:
+                    self._free_ids.append(hid)
+            self._chord_grabs = grabs
+            self._chord_token += 1
+            self._chord_timer.arm(self._chord_token, CHORD_TIMEOUT_SEC)
+
+    def _chord_release(self) -> None:
+        with self._lock:
+            self._chord_timer.cancel()
+            for hid in self._chord_grabs:
+                try:
+                    self.backend.unregister(hid)
+                except Exception:
+                    pass
+                self._free_ids.append(hid)
+            self._chord_grabs = {}
+
+    def expire_chord(self, token: int) -> None:
+        """EV_TIMER: 最後に待ち始めたものの時間切れなら、続きのキーの登録を外す"""
+        if token == self._chord_token and self._chords.expire():
+            self._chord_release()
+
+    def trigger_by_id(self, sid: str, received_at: float | None = None) -> str | None:
+        """IPC 用。ホットキーと同じ _enqueue を通す。失敗したら理由を返す"""
+        sc = self._by_id.get(sid)
+        if sc is None:
+            return "unknown_id"
+        return self._enqueue(sc, received_at)
+
+    def trigger_by_device_event(self, name: str, received_at: float | None = None) -> str | None:
+        """シリアル用。"menu_select:1" は完全一致が無ければ "menu_select" でも探す"""
+        by_event = self._by_event
+        sc = by_event.get(name)
+        if sc is None:
+            sc = by_event.get(name.split(":", 1)[0])
+        if sc is None:
+            return "unmapped_event"
+        return self._enqueue(sc, received_at)
+
+    def menu_items(self) -> list[tuple[str, str]]:
+        """デバイスのメニューに出す (id, title)。設定ファイルの順"""
+        return [(sid, sc.title or sid) for sid, sc in self._by_id.items()]
+
+    def run_message_loop(self, on_reload: Callable[[], None] | None = None) -> None:
         """
-        WM_HOTKEY を非ブロッキングで処理（PeekMessage）
+        ホットキー / 設定変更 / 停止要求のどれかが来るまでブロックし、
+        来たら即座に処理する（ポーリングしない）。
         """
-        msg = wintypes.MSG()
-        # 0x0001 = PM_REMOVE
-        while user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, 0x0001) != 0:
-            if msg.message == WM_HOTKEY:
-                hid = int(msg.wParam)
-                sc = None
-                with self._lock:
-                    sc = self._id_to_sc.get(hid)
-                if sc is not None:
-                    self._enqueue(sc)
-
-            user32.TranslateMessage(ctypes.byref(msg))
-            user32.DispatchMessageW(ctypes.byref(msg))
+        source = self.backend
+        while True:
+            kind, payload = source.wait()
+            if kind == EV_HOTKEY:
+                self.dispatch_hotkey(payload, time.perf_counter())
+            elif kind == EV_TIMER:
+                self.expire_chord(payload)
+            elif kind == EV_RELOAD:
+                if on_reload is not None:
+                    on_reload()
+            elif kind == EV_STOP:
+                break
+
+    def metrics_lines(self) -> list[str]:
+        """/metrics の本文（段階別ヒストグラム + キュー / 再読込の状態）"""
+        ex = self.executor.stats()
+        last = self.last_reload
+        lines = render_gauges({
+            "queue_depth": ("gauge", "Jobs waiting in the executor queue.", ex["queue_depth"]),
+            "running": ("gauge", "Actions currently running.", ex["running"]),
+            "triggers_submitted_total": ("counter", "Triggers accepted by the executor.", ex["submitted"]),
+            "triggers_completed_total": ("counter", "Actions finished without error.", ex["completed"]),
+            "triggers_failed_total": ("counter", "Actions that raised an error.", ex["failed"]),
+            "triggers_suppressed_total": (
+                "counter", "Triggers suppressed by per-shortcut policies.",
+                {
+                    'policy="debounce"': self.limiter.suppressed[SUPPRESS_DEBOUNCED],
+                    'policy="rate_limit"': self.limiter.suppressed[RATE_LIMITED],
+                    'policy="coalesce"': ex["rejected"][COALESCED],
+                },
+            ),
+            "rate_limit_keys": ("gauge", "Shortcuts with rate limiting state.", len(self.limiter)),
+            "triggers_rejected_total": (
+                "counter", "Triggers dropped by the executor.",
+                # coalesce で捨てたものは triggers_suppressed_total の方に出す（二重に数えない）
+                {f'reason="{k}"': v for k, v in ex["rejected"].items() if k != COALESCED},
+            ),
+            "chords_matched_total": ("counter", "Multi-stroke sequences completed.", self._chords.matched),
+            "chords_aborted_total": ("counter", "Multi-stroke sequences broken by another key.", self._chords.aborted),
+            "chords_timeout_total": ("counter", "Multi-stroke sequences that timed out.", self._chords.timeouts),
+            "reloads_total": ("counter", "Hotkey table (re)registrations.", self.reload_count),
+            "reload_duration_seconds": (
+                "gauge", "Duration of the last hotkey table registration.",
+                last.elapsed_ms / 1000.0 if last else 0.0,
+            ),
+            "children_live": ("gauge", "Live child processes started by actions.", supervisor.live_count()),
+            "config_version": ("gauge", "Version of the loaded config file.", config_reader.version or 0),
+            "config_shards": ("gauge", "Config files loaded (main + includes).", config_reader.stats()["shards"]),
+            "config_shard_parses_total": ("counter", "Config files parsed on load.", config_reader.parses),
+            "config_reloads_skipped_total": (
+                "counter", "Config reloads skipped because the content hash did not change.", config_reader.skipped,
+            ),
+        })
+        return lines + latency.render()
 
 
 def main() -> None:
-    print("[LISTENER] start (Ctrl+C to stop) [WinAPI RegisterHotKey]")
+    # ホットキーの登録・イベント待ちはこのスレッドで行う（RegisterHotKey はスレッドに紐づく）
+    backend = create_backend(HOTKEY_BACKEND)
+    print(f"[LISTENER] start (Ctrl+C to stop) [backend: {backend.name}]")
 
-    listener = HotkeyListener()
+    listener = HotkeyListener(backend=backend)
+    for path in PY_ACTION_PATHS:
+        py_action.add_search_path(path)
 
     # 初回ロード（設定が無ければ待つ）
     last_err = None
     shortcuts: list[dict] = []
     while True:
         try:
-            shortcuts = load_shortcuts()
+            shortcuts = load_shortcuts() or []
             listener.register_shortcuts(shortcuts)
             break
         except Exception as e:
+            config_reader.reset()
             if str(e) != str(last_err):
                 print("[LISTENER] wait config...", e)
                 last_err = e
             time.sleep(1)
 
-    # 変更監視用
-    last_mtime = None
-    try:
-        last_mtime = CONFIG_PATH.stat().st_mtime
-    except FileNotFoundError:
-        last_mtime = None
+    if isinstance(backend, Win32MessageSource):
+        backend.install_console_ctrl_handler()
+    else:
+        signal.signal(signal.SIGINT, lambda signum, frame: backend.post_stop())
 
-    try:
-        while True:
-            # WM_HOTKEY を捌く
-            listener.message_loop_tick()
-
-            # 設定ファイル更新を監視
-            try:
-                mtime = CONFIG_PATH.stat().st_mtime
-            except FileNotFoundError:
-                time.sleep(POLL_INTERVAL_SEC)
-                continue
-
-            if last_mtime is None:
-                last_mtime = mtime
-            elif mtime != last_mtime:
-                last_mtime = mtime
-                try:
-                    shortcuts = load_shortcuts()
-                    listener.register_shortcuts(shortcuts)
-                    print("[LISTENER] config reloaded")
-                except Exception as e:
-                    print("[LISTENER] reload failed:", e)
+    bridge = None
+    pusher = None
+
+    # 変更監視（inotify / ディレクトリ変更通知。使えなければ stat ポーリング）
+    # メインの設定と include したファイル / ディレクトリ（ワイルドカード）ごとに1つ
+    # RegisterHotKey はスレッドに紐づくので、通知はメッセージキュー経由でこのスレッドに渡す
+    watchers: dict[tuple[Path, str | None], FileWatcher] = {}
+
+    def update_watchers() -> None:
+        cs = config_reader.current
+        targets = [(CONFIG_PATH, None), *(cs.targets if cs is not None else ())]
+        for w in sync_watchers(watchers, targets, backend.post_reload, debounce_sec=CONFIG_DEBOUNCE_SEC):
+            print(f"[LISTENER] config watcher: {w.kind} {w.path}{'/' + w.pattern if w.pattern else ''}")
+
+    def reload() -> None:
+        try:
+            shortcuts = load_shortcuts()
+            if shortcuts is None:
+                print(f"[LISTENER] config unchanged (version {config_reader.version}), skip reload")
+                return
+            listener.register_shortcuts(shortcuts)
+            cs = config_reader.current
+            print(f"[LISTENER] config reloaded (version {config_reader.version}, {len(cs.shards)} files,"
+                  f" re-parsed: {', '.join(str(p) for p in cs.reparsed) or '-'})")
+            update_watchers()
+        except Exception as e:
+            print("[LISTENER] reload failed:", e)
+            return
+        if pusher is not None and bridge is not None:
+            # 送信はブリッジのスレッドで（止まったデバイスへの書き込みでホットキーの処理を止めない）
+            items = listener.menu_items()
+            bridge.call_soon(lambda: pusher.push(items))
+
+    update_watchers()
 
-            time.sleep(POLL_INTERVAL_SEC)
+    metrics_server = None
+    if METRICS_PORT is not None:
+        try:
+            metrics_server = MetricsServer(listener.metrics_lines, METRICS_PORT)
+            metrics_server.start()
+            print(f"[LISTENER] metrics: http://127.0.0.1:{metrics_server.port}/metrics")
+        except OSError as e:
+            print("[LISTENER] metrics server disabled:", e)
+
+    trigger_server = None
+    if TRIGGER_SERVER_ADDRESS is not None:
+        try:
+            trigger_server = TriggerServer(TRIGGER_SERVER_ADDRESS, listener.trigger_by_id)
+            trigger_server.start()
+            print(f"[LISTENER] trigger server: {trigger_server.address}")
+        except (OSError, ValueError) as e:
+            print("[LISTENER] trigger server disabled:", e)
+
+    if SERIAL_PORT is not None:
+        def on_device_event(name: str, received_at: float) -> str | None:
+            # "fire_slot:N" はデバイスのメニューに送ったスロット N のショートカット
+            if pusher is not None and name.startswith("fire_slot:"):
+                slot = name.split(":", 1)[1]
+                if not slot.isdigit():
+                    return "bad_slot"
+                sid = pusher.id_for_slot(int(slot))
+                return listener.trigger_by_id(sid, received_at) if sid else "empty_slot"
+            return listener.trigger_by_device_event(name, received_at)
+
+        frame_handlers = {}
+        on_connect = None
+        if SERIAL_PUSH_CONFIG:
+            pusher = ConfigPusher(lambda data: bridge is not None and bridge.write(data))
+            pusher.push(listener.menu_items())  # 未接続なら接続時に送る
+            frame_handlers[FT_CFG_ACK] = pusher.handle_ack
+            on_connect = pusher.resync
+        bridge = SerialBridge(
+            SERIAL_PORT, on_device_event, baudrate=SERIAL_BAUDRATE,
+            frame_handlers=frame_handlers, on_connect=on_connect,
+        )
+        bridge.start()
 
+    try:
+        listener.run_message_loop(reload)
+        print("\n[LISTENER] stopping...")
     except KeyboardInterrupt:
         print("\n[LISTENER] stopping...")
     finally:
+        if bridge is not None:
+            bridge.stop()
+            print(f"[LISTENER] serial: {bridge.stats()}")
+        if pusher is not None:
+            print(f"[LISTENER] device config: {pusher.stats()}")
+        if trigger_server is not None:
+            trigger_server.stop()
+            print(f"[LISTENER] trigger server: {trigger_server.stats()}")
+        if metrics_server is not None:
+            metrics_server.stop()
+        for w in watchers.values():
+            w.stop()
+        unchanged = sum(w.unchanged for w in watchers.values())
+        print(f"[LISTENER] config: {config_reader.stats()} (watchers skipped {unchanged} unchanged writes)")
         listener.unregister_all()
         listener.stop()
+        print(f"[LISTENER] children: {supervisor.stats()}")
+        print(f"[LISTENER] python actions: {py_actions.stats()}")
+        if _injector is not None:
+            print(f"[LISTENER] injector: {_injector.stats()}")
+        supervisor.shutdown()
+        trigger_log.close()
+        print(f"[LISTENER] trigger log: {trigger_log.stats()}")
+        print(f"[LISTENER] latency: {latency.summary()}")
 
 
 if __name__ == "__main__":
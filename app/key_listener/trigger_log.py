@@ -0,0 +1,151 @@
+# trigger_log.py (トリガー履歴の非同期・バッチ書き込み)
+# -*- coding: utf-8 -*-
+"""
+トリガー1件ごとの記録を JSON Lines で追記する。
+
+- record() はキューに積むだけで、ファイル I/O はバックグラウンドの書き込みスレッドが行う
+  （"ts"（time.time()）を渡せば、読みやすい "time" は書き込みスレッド側で付ける）
+- 書き込みは max_batch 件たまるか、最初の1件から flush_interval_sec 経ったらまとめて行う
+- ファイルが max_bytes を超えたらローテート（trigger_log.jsonl.1 ... .N）
+- 書き込みが追いつかずキューが満杯のときは、待たずに捨てて dropped を数える
+- compat_path を指定すると、従来の last_trigger.txt（最後の1件だけ）もバッチ毎に更新する
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+_STOP = object()
+
+
+class TriggerLog:
+    def __init__(
+        self,
+        path: Path,
+        max_batch: int = 64,
+        flush_interval_sec: float = 0.5,
+        max_bytes: int = 5 * 1024 * 1024,
+        backups: int = 3,
+        queue_size: int = 4096,
+        compat_path: Optional[Path] = None,
+    ) -> None:
+        self.path = Path(path)
+        self._max_batch = max(1, max_batch)
+        self._flush_interval_sec = flush_interval_sec
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._compat_path = Path(compat_path) if compat_path else None
+        self._q: "queue.Queue[object]" = queue.Queue(maxsize=queue_size)
+        self._th: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # メトリクス
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+    def record(self, rec: dict) -> bool:
+        """ブロックしない。書き込み待ちが満杯なら捨てて False"""
+        if self._th is None:
+            self._start()
+        try:
+            self._q.put_nowait(rec)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._th is None:
+                self._th = threading.Thread(target=self._writer, name="trigger-log", daemon=True)
+                self._th.start()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """残りを書き出して止める"""
+        if self._th is None:
+            return
+        self._q.put(_STOP)
+        self._th.join(timeout=timeout)
+
+    # ---- 書き込みスレッド ----
+    def _writer(self) -> None:
+        while True:
+            first = self._q.get()  # 何も無いときはここで寝ている
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            flush_at = time.monotonic() + self._flush_interval_sec
+            while len(batch) < self._max_batch:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: list) -> None:
+        for rec in batch:
+            if "ts" in rec and "time" not in rec:
+                rec["time"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(rec["ts"]))
+        lines = "".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in batch)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(lines)
+                size = f.tell()
+            self.written += len(batch)
+            self.batches += 1
+            if size >= self._max_bytes:
+                self._rotate()
+        except OSError as e:
+            self.errors += 1
+            print("[TRIGGER_LOG] write failed:", e)
+
+        if self._compat_path is not None:
+            last = batch[-1]
+            try:
+                self._compat_path.write_text(
+                    f"{last.get('time', '')} | {last.get('title', '')} | {last.get('hotkey', '')}\n",
+                    encoding="utf-8",
+                )
+            except OSError:
+                pass
+
+    def _rotate(self) -> None:
+        if self._backups <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for i in range(self._backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        self.rotations += 1
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._q.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "errors": self.errors,
+        }
@@ -0,0 +1,321 @@
+# trigger_server.py (ローカル IPC でショートカットを id 指定で発火させる)
+# -*- coding: utf-8 -*-
+"""
+キー入力を合成せずに、他プロセスからショートカットを発火させるためのローカルソケット。
+ホットキーと同じ HotkeyListener._enqueue（連打抑止 / レート制限 → 実行キュー）を通る。
+
+アドレス:
+  "unix:///tmp/skl.sock"   Unix ドメインソケット（Linux / macOS。自分のユーザーだけが接続できる 0600）
+  "tcp://127.0.0.1:9465"   ループバック TCP（Windows を含む全環境。認証が無く同じ PC の誰でも接続できるので、明示的に指定したときだけ）
+既定（DEFAULT_ADDRESS）は Unix ドメインソケットが使えればユーザー毎のソケット、使えなければ None（無効）。
+
+プロトコル（1フレーム = 4バイトのビッグエンディアン長 + UTF-8 の JSON）:
+  要求: {"seq": 1, "ids": ["id1", "id2", ...]}   （"id": "id1" の1件指定も可）
+  応答: {"seq": 1, "results": [{"id": "id1", "ok": true, "dispatch_us": 12.3}, ...]}
+        ok=false のときは "error" に理由（unknown_id / debounced / rate_limited / coalesced / rejected）
+        要求の形が不正なとき（JSON オブジェクトでない / ids がリストでない / id が文字列・整数でない）は
+        {"seq": ..., "error": "..."} を返す（接続はそのまま）
+        dispatch_us はフレームを受け取ってからその id を実行キューへ積み終わるまでの時間
+1つの接続で応答を待たずに複数フレームを送ってよい（応答は送った順に返る）。
+
+コマンドラインから発火する場合（リポジトリルートで実行）:
+  python app/key_listener/trigger_server.py <id> [<id> ...] [--address unix:///path | tcp://127.0.0.1:9465]
+"""
+from __future__ import annotations
+
+import collections
+import errno
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+TCP_ADDRESS = "tcp://127.0.0.1:9465"   # TCP を使うときの例（既定では使わない）
+MAX_FRAME_BYTES = 1024 * 1024
+
+_LEN = struct.Struct(">I")
+
+# (id, 受信時刻 perf_counter) -> None なら成功、文字列ならエラー理由
+TriggerFn = Callable[[str, float], Optional[str]]
+
+
+def default_address() -> str | None:
+    """
+    既定のアドレス。Unix ドメインソケットが使えれば $XDG_RUNTIME_DIR（無ければ一時ディレクトリ）の
+    ユーザー毎のソケット、使えなければ None（Windows では TCP を明示的に指定したときだけ有効）。
+    """
+    if os.name == "nt" or not hasattr(socket, "AF_UNIX"):
+        return None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return f"unix://{os.path.join(runtime_dir, 'skl-trigger.sock')}"
+    return f"unix://{os.path.join(tempfile.gettempdir(), f'skl-trigger-{os.getuid()}.sock')}"
+
+
+DEFAULT_ADDRESS = default_address()
+
+
+def parse_address(address: str) -> tuple[int, object]:
+    """アドレス文字列を (socket family, bind/connect 用アドレス) にする"""
+    if address.startswith("unix://"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("unix sockets are not available on this platform")
+        return socket.AF_UNIX, address[len("unix://"):]
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"unsupported address: {address!r} (use tcp://host:port or unix:///path)")
+
+
+def _unix_socket_alive(path: str) -> bool:
+    """path のソケットに接続できれば True（誰かが listen している）"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(0.5)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def read_frame(sock: socket.socket) -> dict | None:
+    """1フレーム読む。相手が閉じたら None"""
+    head = _recv_exact(sock, _LEN.size)
+    if head is None:
+        return None
+    (length,) = _LEN.unpack(head)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"frame too large: {length} bytes")
+    body = _recv_exact(sock, length)
+    if body is None:
+        return None
+    return json.loads(body)
+
+
+def encode_frame(obj: dict) -> bytes:
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _LEN.pack(len(body)) + body
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "_ServerMixin"
+
+    def handle(self) -> None:
+        sock: socket.socket = self.request
+        owner = self.server.owner
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # 小さな ack をすぐ返す
+        while True:
+            try:
+                req = read_frame(sock)
+            except (ValueError, json.JSONDecodeError) as e:
+                # 壊れたフレーム以降は区切りが分からないので切断する
+                owner.errors += 1
+                try:
+                    sock.sendall(encode_frame({"seq": None, "error": str(e)}))
+                except OSError:
+                    pass
+                return
+            except OSError:
+                return
+            if req is None:
+                return
+            try:
+                ack = owner.handle_request(req, time.perf_counter())
+            except Exception as e:
+                # 発火側の例外でこの接続のスレッドを落とさない（区切りは分かっているので接続は続ける）
+                owner.errors += 1
+                seq = req.get("seq") if isinstance(req, dict) else None
+                ack = {"seq": seq, "error": f"internal error: {e}"}
+            try:
+                sock.sendall(encode_frame(ack))
+            except OSError:
+                return
+
+
+class _ServerMixin:
+    owner: "TriggerServer"
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _TCPServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    pass
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+        pass
+
+
+class TriggerServer:
+    """
+    trigger(id, received_at) を呼ぶだけのソケットサーバー（別スレッド、接続毎にスレッド）。
+    TCP はループバックアドレスにしか bind しない（認証は無いので、使うときは明示的に指定する）。
+    """
+    def __init__(self, address: str, trigger: TriggerFn) -> None:
+        self._trigger = trigger
+        family, addr = parse_address(address)
+        if family == socket.AF_INET:
+            if addr[0] not in ("127.0.0.1", "localhost"):
+                raise ValueError(f"trigger server must listen on loopback only: {addr[0]!r}")
+            self._srv = _TCPServer(addr, _Handler)
+            self.address = f"tcp://{addr[0]}:{self._srv.server_address[1]}"
+        else:
+            if os.path.exists(addr):
+                if _unix_socket_alive(addr):
+                    # 動いている別のリスナーのソケットは消さない（乗っ取らない）
+                    raise OSError(errno.EADDRINUSE, f"trigger server already running at {addr}")
+                os.unlink(addr)  # 前回の残骸
+            # bind で作られるソケットを最初から 0600 にする（自分のユーザーからだけ。chmod までの隙間を作らない）
+            old_umask = os.umask(0o177)
+            try:
+                self._srv = _UnixServer(addr, _Handler)
+            finally:
+                os.umask(old_umask)
+            self.address = f"unix://{addr}"
+        self._srv.owner = self
+        self._unix_path = addr if family != socket.AF_INET else None
+        self._th: Optional[threading.Thread] = None
+
+        # メトリクス
+        self.frames = 0
+        self.triggers = 0
+        self.failed = 0
+        self.errors = 0
+
+    def handle_request(self, req: object, received_at: float) -> dict:
+        self.frames += 1
+        if not isinstance(req, dict):
+            self.errors += 1
+            return {"seq": None, "error": "request must be a JSON object"}
+        seq = req.get("seq")
+        ids = req.get("ids")
+        if ids is None:
+            ids = [req["id"]] if "id" in req else []
+        if not isinstance(ids, list):
+            self.errors += 1
+            return {"seq": seq, "error": "ids must be a list"}
+        # bool は int の仲間だが id ではない
+        if any(isinstance(sid, bool) or not isinstance(sid, (str, int)) for sid in ids):
+            self.errors += 1
+            return {"seq": seq, "error": "ids must be strings or integers"}
+        results = []
+        for sid in ids:
+            err = self._trigger(str(sid), received_at)
+            dispatch_us = (time.perf_counter() - received_at) * 1e6
+            if err is None:
+                results.append({"id": sid, "ok": True, "dispatch_us": round(dispatch_us, 1)})
+            else:
+                self.failed += 1
+                results.append({"id": sid, "ok": False, "error": err, "dispatch_us": round(dispatch_us, 1)})
+        self.triggers += len(ids)
+        return {"seq": seq, "results": results}
+
+    def start(self) -> None:
+        self._th = threading.Thread(target=self._srv.serve_forever, name="trigger-server", daemon=True)
+        self._th.start()
+
+    def stop(self) -> None:
+        self._srv.shutdown()
+        self._srv.server_close()
+        if self._unix_path:
+            try:
+                os.unlink(self._unix_path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "triggers": self.triggers, "failed": self.failed, "errors": self.errors}
+
+
+class TriggerClient:
+    """自動化スクリプト用のクライアント（1接続を使い回す）"""
+    def __init__(self, address: str | None = DEFAULT_ADDRESS, timeout: float = 5.0) -> None:
+        if address is None:
+            raise ValueError(f"no default trigger address on this platform; pass one explicitly (e.g. {TCP_ADDRESS})")
+        family, addr = parse_address(address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(addr)
+        if family == socket.AF_INET:
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._seq = 0
+
+    def fire(self, *ids: str) -> list[dict]:
+        """まとめて1フレームで送り、応答（id 毎の結果）を返す"""
+        return self.fire_many([list(ids)])[0]
+
+    def fire_many(self, batches: Iterable[list[str]], window: int = 32, max_inflight_ids: int = 512) -> list[list[dict]]:
+        """
+        複数フレームを応答を待たずに送る（先行は最大 window フレーム / max_inflight_ids 件まで）。
+        送信バッファと受信バッファが両方詰まって止まらないよう、未読の応答の量を制限している。
+        """
+        out: list[list[dict]] = []
+        inflight: collections.deque[int] = collections.deque()  # 応答待ちフレームの件数
+        inflight_ids = 0
+        for ids in batches:
+            while inflight and (len(inflight) >= window or inflight_ids + len(ids) > max_inflight_ids):
+                out.append(self._read_ack())
+                inflight_ids -= inflight.popleft()
+            self._seq += 1
+            self._sock.sendall(encode_frame({"seq": self._seq, "ids": ids}))
+            inflight.append(len(ids))
+            inflight_ids += len(ids)
+        for _ in range(len(inflight)):
+            out.append(self._read_ack())
+        return out
+
+    def _read_ack(self) -> list[dict]:
+        ack = read_frame(self._sock)
+        if ack is None:
+            raise ConnectionError("trigger server closed the connection")
+        if "error" in ack:
+            raise ValueError(ack["error"])
+        return ack["results"]
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    address = DEFAULT_ADDRESS
+    if "--address" in args:
+        i = args.index("--address")
+        address = args[i + 1]
+        del args[i:i + 2]
+    if not args:
+        raise SystemExit("usage: trigger_server.py <id> [<id> ...] [--address unix:///path | tcp://127.0.0.1:9465]")
+    if address is None:
+        raise SystemExit(f"--address is required on this platform (e.g. --address {TCP_ADDRESS})")
+
+    client = TriggerClient(address)
+    try:
+        for r in client.fire(*args):
+            status = "ok" if r["ok"] else f"NG ({r['error']})"
+            print(f"{r['id']}: {status}  dispatch={r['dispatch_us']:.1f}us")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
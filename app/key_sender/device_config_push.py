@@ -0,0 +1,109 @@
+# device_config_push.py (ショートカット一覧を ESP32 のメニューへ送るツール)
+# -*- coding: utf-8 -*-
+"""
+リスナーの SERIAL_PORT を使わない（F13 の HID 経由で動かす）構成向けに、
+config/shortcut_config.json（include した分割ファイルを含む）の id / title を ESP32-S3 のメニューへ送り続ける。
+設定が変わる度に差分だけを送る（device_config.py）。読み込みと監視はリスナーと同じ（config_store / config_watcher）。
+
+実行方法（リポジトリルートで実行）:
+  python app/key_sender/device_config_push.py COM5
+  python app/key_sender/device_config_push.py /dev/ttyACM0 --once
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+from pathlib import Path
+
+APP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP / "common"))
+sys.path.insert(0, str(APP / "key_listener"))
+
+import config_store  # noqa: E402
+from config_watcher import FileWatcher, sync_watchers  # noqa: E402
+from device_config import ConfigPusher  # noqa: E402
+from serial_bridge import SerialBridge  # noqa: E402
+from serial_frame import FT_CFG_ACK  # noqa: E402
+
+CONFIG_PATH = Path("config/shortcut_config.json")
+
+
+def load_items(cs: config_store.ConfigSet) -> list[tuple[str, str]]:
+    """まとめた設定（id の重複は先の shard の方）の (id, title)。リスナーの menu_items() と同じ順"""
+    items = []
+    for sc in cs.shortcuts:
+        sid = str(sc.get("id") or "") if isinstance(sc, dict) else ""
+        if sid:
+            items.append((sid, str(sc.get("title") or sid)))
+    return items
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Push shortcut titles to the ESP32-S3 menu")
+    ap.add_argument("port", help='serial port ("COM5", "/dev/ttyACM0")')
+    ap.add_argument("--baudrate", type=int, default=115200)
+    ap.add_argument("--config", type=Path, default=CONFIG_PATH)
+    ap.add_argument("--once", action="store_true", help="push once, wait for the ack and exit")
+    args = ap.parse_args()
+
+    acked = threading.Event()
+    bridge: SerialBridge | None = None
+    reader = config_store.ConfigSetReader(args.config)
+    # メインの設定と include したファイル / ディレクトリごとに1つ。通知はこのスレッドで処理する
+    watchers: dict[tuple[Path, str | None], FileWatcher] = {}
+    changed = threading.Event()
+    pusher = ConfigPusher(lambda data: bridge is not None and bridge.write(data))
+
+    def on_ack(frame) -> None:
+        pusher.handle_ack(frame)
+        acked.set()
+
+    def push() -> None:
+        try:
+            cs = reader.load()
+        except (OSError, ValueError) as e:
+            print("[DEVICE_CONFIG] cannot load config:", e)
+            return
+        for p in cs.missing:
+            print(f"[CONFIG] include not found: {p}")
+        items = load_items(cs)
+        n = pusher.push(items)
+        print(f"[DEVICE_CONFIG] {len(items)} shortcuts from {len(cs.shards)} files, sent {n} bytes")
+
+    def update_watchers() -> None:
+        cs = reader.current
+        sync_watchers(watchers, [(args.config, None), *(cs.targets if cs is not None else ())], changed.set)
+
+    push()
+    bridge = SerialBridge(
+        args.port, lambda name, received_at: None, baudrate=args.baudrate,
+        frame_handlers={FT_CFG_ACK: on_ack}, on_connect=pusher.resync,
+    )
+    bridge.start()
+
+    if args.once:
+        ok = acked.wait(10.0)
+        bridge.stop()
+        print(f"[DEVICE_CONFIG] {pusher.stats()}")
+        return 0 if ok and pusher.acks_failed == 0 else 1
+
+    update_watchers()
+    try:
+        while True:
+            if changed.wait(1.0):
+                changed.clear()
+                push()
+                update_watchers()   # include が増えた / 減ったら監視も合わせる
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for w in watchers.values():
+            w.stop()
+        bridge.stop()
+        print(f"[DEVICE_CONFIG] {pusher.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
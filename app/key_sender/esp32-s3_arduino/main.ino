@@ -111,6 +111,213 @@ unsigned long pass_result_until_ms = 0;
 bool thankyou_pending = false;
 unsigned long thankyou_due_ms = 0;
 
+// ===== Host bridge（app/common/serial_frame.py と同じ形式） =====
+// 1: shortcut の UP x2 を HID F13 ではなくシリアルのイベントで PC に送る
+//    （PC 側はリスナーの SERIAL_PORT を設定し、ショートカットに "device_event": "shortcut" を書く）
+// 0: 従来どおり HID F13（イベントのフレームも送る）
+#define HOST_BRIDGE 0
+
+static const uint8_t FRAME_SOF = 0xA5;
+static const uint8_t FRAME_MAX_PAYLOAD = 240;
+static const uint8_t FT_HELLO = 0x01;
+static const uint8_t FT_EVENT = 0x02;
+static const uint8_t PROTOCOL_VERSION = 1;
+
+static const uint8_t EV_SHORTCUT = 1;
+static const uint8_t EV_PASS_OK = 2;
+static const uint8_t EV_PASS_NG = 3;
+static const uint8_t EV_MENU_SELECT = 4;
+
+static uint8_t frame_seq = 0;
+
+static uint16_t crc16_ccitt(const uint8_t* p, size_t n) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < n; i++) {
+    crc ^= (uint16_t)p[i] << 8;
+    for (int b = 0; b < 8; b++) {
+      crc = (crc & 0x8000) ? (uint16_t)((crc << 1) ^ 0x1021) : (uint16_t)(crc << 1);
+    }
+  }
+  return crc;
+}
+
+// SOF | type | seq | len | millis(LE32) | payload | CRC16(LE)
+static void send_frame(uint8_t type, const uint8_t* payload, uint8_t len) {
+  if (len > FRAME_MAX_PAYLOAD) return;
+  uint8_t buf[8 + FRAME_MAX_PAYLOAD + 2];
+  uint32_t t = millis();
+  buf[0] = FRAME_SOF;
+  buf[1] = type;
+  buf[2] = frame_seq++;
+  buf[3] = len;
+  buf[4] = t & 0xFF; buf[5] = (t >> 8) & 0xFF; buf[6] = (t >> 16) & 0xFF; buf[7] = (t >> 24) & 0xFF;
+  if (len) memcpy(buf + 8, payload, len);
+  uint16_t crc = crc16_ccitt(buf + 1, 7 + len);
+  buf[8 + len] = crc & 0xFF;
+  buf[9 + len] = crc >> 8;
+  Serial.write(buf, 10 + len);  // 1回で書く（テキストログと混ざらないように）
+}
+
+static void send_event(uint8_t code) {
+  send_frame(FT_EVENT, &code, 1);
+}
+
+static void send_event_arg(uint8_t code, uint8_t arg) {
+  const uint8_t p[2] = { code, arg };
+  send_frame(FT_EVENT, p, 2);
+}
+
+// ===== 設定の受信（app/common/device_config.py と同じ形式） =====
+// PC から shortcut_config.json の title をスロット単位で受け取り、shortcut 画面で選んで実行する
+static const uint8_t FT_CFG_ACK = 0x03;
+static const uint8_t FT_CFG_BEGIN = 0x10;
+static const uint8_t FT_CFG_CHUNK = 0x11;
+static const uint8_t FT_CFG_COMMIT = 0x12;
+static const uint8_t EV_FIRE_SLOT = 5;
+
+static const uint8_t OP_CLEAR = 0;
+static const uint8_t OP_SET = 1;    // slot, id長, id, title長, title
+static const uint8_t OP_DEL = 2;    // slot
+
+static const uint8_t ACK_OK = 0;
+static const uint8_t ACK_BASE_MISMATCH = 1;
+static const uint8_t ACK_CRC = 2;
+static const uint8_t ACK_TOO_LARGE = 3;
+static const uint8_t ACK_SEQUENCE = 4;
+static const uint8_t ACK_BAD_OP = 5;
+
+static const int MAX_SLOTS = 32;
+static const int SLOT_TITLE_MAX = 21;   // OLED 1行
+static const uint16_t CFG_BLOB_MAX = 2048;
+static const uint16_t CFG_FULL_BASE = 0xFFFF;
+
+struct Slot {
+  bool used;
+  char title[SLOT_TITLE_MAX + 1];
+};
+static Slot slots[MAX_SLOTS];
+static int slot_count = 0;
+static int slot_sel = -1;            // shortcut 画面で選んでいるスロット（-1: 無し）
+static uint16_t cfg_version = 0;
+
+static uint8_t cfg_blob[CFG_BLOB_MAX];
+static bool cfg_active = false;
+static uint16_t cfg_new_version = 0;
+static uint16_t cfg_total = 0;
+static uint16_t cfg_crc = 0;
+static uint16_t cfg_len = 0;
+static int32_t cfg_rejected = -1;    // BEGIN / CHUNK で失敗を返したバージョン（その COMMIT には返さない）
+
+static uint16_t rd16(const uint8_t* p) {
+  return (uint16_t)(p[0] | (p[1] << 8));
+}
+
+static void send_cfg_ack(uint16_t version, uint8_t status) {
+  const uint8_t p[3] = { (uint8_t)(version & 0xFF), (uint8_t)(version >> 8), status };
+  send_frame(FT_CFG_ACK, p, 3);
+  cfg_rejected = (status == ACK_OK) ? -1 : (int32_t)version;
+}
+
+// apply=false で検査だけ（壊れた操作列なら何も変えない）
+static bool cfg_apply(const uint8_t* p, uint16_t n, bool apply) {
+  uint16_t i = 0;
+  while (i < n) {
+    uint8_t op = p[i];
+    if (op == OP_CLEAR) {
+      if (apply) for (int s = 0; s < MAX_SLOTS; s++) slots[s].used = false;
+      i += 1;
+    } else if (op == OP_DEL) {
+      if (i + 2 > n || p[i + 1] >= MAX_SLOTS) return false;
+      if (apply) slots[p[i + 1]].used = false;
+      i += 2;
+    } else if (op == OP_SET) {
+      if (i + 3 > n) return false;
+      uint8_t slot = p[i + 1];
+      uint16_t j = i + 3 + p[i + 2];   // id は PC 側で持っているので読み飛ばす
+      if (slot >= MAX_SLOTS || j + 1 > n) return false;
+      uint8_t title_len = p[j];
+      if (title_len > SLOT_TITLE_MAX || j + 1 + title_len > n) return false;
+      if (apply) {
+        slots[slot].used = true;
+        memcpy(slots[slot].title, p + j + 1, title_len);
+        slots[slot].title[title_len] = 0;
+      }
+      i = j + 1 + title_len;
+    } else {
+      return false;
+    }
+  }
+  return true;
+}
+
+static int next_slot(int from, int step) {
+  for (int k = 1; k <= MAX_SLOTS; k++) {
+    int s = ((from + step * k) % MAX_SLOTS + MAX_SLOTS) % MAX_SLOTS;
+    if (slots[s].used) return s;
+  }
+  return -1;
+}
+
+static void cfg_handle_frame(uint8_t type, const uint8_t* p, uint8_t len) {
+  if (type == FT_CFG_BEGIN) {
+    if (len < 8) return;
+    uint16_t new_version = rd16(p), base = rd16(p + 2), total = rd16(p + 4);
+    cfg_active = false;
+    if (base != CFG_FULL_BASE && base != cfg_version) { send_cfg_ack(new_version, ACK_BASE_MISMATCH); return; }
+    if (total > CFG_BLOB_MAX) { send_cfg_ack(new_version, ACK_TOO_LARGE); return; }
+    cfg_active = true;
+    cfg_new_version = new_version;
+    cfg_total = total;
+    cfg_crc = rd16(p + 6);
+    cfg_len = 0;
+  } else if (type == FT_CFG_CHUNK) {
+    if (!cfg_active || len < 2) return;
+    uint16_t n = len - 2;
+    if (rd16(p) != cfg_len || cfg_len + n > cfg_total) {
+      cfg_active = false;
+      send_cfg_ack(cfg_new_version, ACK_SEQUENCE);
+      return;
+    }
+    memcpy(cfg_blob + cfg_len, p + 2, n);
+    cfg_len += n;
+  } else if (type == FT_CFG_COMMIT) {
+    if (len < 2) return;
+    uint16_t version = rd16(p);
+    bool active = cfg_active;
+    cfg_active = false;
+    if (!active && (int32_t)version == cfg_rejected) return;
+    if (!active || version != cfg_new_version) { send_cfg_ack(version, ACK_SEQUENCE); return; }
+    if (cfg_len != cfg_total || crc16_ccitt(cfg_blob, cfg_len) != cfg_crc) { send_cfg_ack(version, ACK_CRC); return; }
+    if (!cfg_apply(cfg_blob, cfg_len, false)) { send_cfg_ack(version, ACK_BAD_OP); return; }
+    cfg_apply(cfg_blob, cfg_len, true);
+    cfg_version = version;
+    slot_count = 0;
+    for (int s = 0; s < MAX_SLOTS; s++) if (slots[s].used) slot_count++;
+    if (slot_sel < 0 || !slots[slot_sel].used) slot_sel = next_slot(-1, 1);
+    Serial.printf("[CFG] v%u applied (%d slots)\n", version, slot_count);
+    send_cfg_ack(version, ACK_OK);
+  }
+}
+
+// PC からのフレームを読む（CRC が合わないフレームは捨てる。テキストは読み飛ばす）
+static uint8_t rx_buf[8 + FRAME_MAX_PAYLOAD + 2];
+static uint16_t rx_len = 0;
+
+static void poll_serial_rx() {
+  while (Serial.available() > 0) {
+    uint8_t b = (uint8_t)Serial.read();
+    if (rx_len == 0 && b != FRAME_SOF) continue;
+    rx_buf[rx_len++] = b;
+    if (rx_len == 4 && rx_buf[3] > FRAME_MAX_PAYLOAD) { rx_len = 0; continue; }
+    if (rx_len >= 8 && rx_len == 10 + rx_buf[3]) {
+      uint8_t n = rx_buf[3];
+      uint16_t crc = rd16(rx_buf + 8 + n);
+      if (crc == crc16_ccitt(rx_buf + 1, 7 + n)) cfg_handle_frame(rx_buf[1], rx_buf + 8, n);
+      rx_len = 0;
+    }
+  }
+}
+
 // ===== HID =====
 static void send_f13_once() {
   Keyboard.press(KEY_F13);
@@ -137,7 +344,9 @@ static void draw_menu(int xN, int yN, bool sw, Dir d) {
   oled_clear_text();
   display.println("MENU");
   display.println("----------------");
-  display.print(menu_sel == 0 ? "> " : "  "); display.println("1. shortcut key");
+  display.print(menu_sel == 0 ? "> " : "  "); display.print("1. shortcut key");
+  if (slot_count > 0) { display.print(" ("); display.print(slot_count); display.print(")"); }
+  display.println();
   display.print(menu_sel == 1 ? "> " : "  "); display.println("2. passphrase");
   display.println("----------------");
   display.print("X:"); display.print(xN);
@@ -151,7 +360,11 @@ static void draw_menu(int xN, int yN, bool sw, Dir d) {
 static void draw_shortcut(int xN, int yN, bool sw, Dir d) {
   oled_clear_text();
   display.println("shortcut key");
-  display.println("UP x2 => F13"); // ★
+  if (HOST_BRIDGE && slot_sel >= 0) {
+    display.println(slots[slot_sel].title);   // LEFT / RIGHT で選択、UP x2 で実行
+  } else {
+    display.println("UP x2 => F13"); // ★
+  }
   display.println("----------------");
   display.print("X:"); display.print(xN); display.print(" Y:"); display.println(yN);
   display.print("SW: "); display.println(sw ? "PRESSED" : "released");
@@ -205,6 +418,7 @@ void setup() {
   delay(300);
 
   Serial.println("=== UI: MENU + HID(F13) + PASS(thank you) ===");
+  send_frame(FT_HELLO, &PROTOCOL_VERSION, 1);
   Serial.printf("I2C SDA=%d SCL=%d | JOY X=%d Y=%d SW=%d\n", I2C_SDA, I2C_SCL, JOY_X_PIN, JOY_Y_PIN, JOY_SW_PIN);
 
   USB.begin();
@@ -241,6 +455,9 @@ static void go_menu(const char* reason) {
 }
 
 void loop() {
+  // PC からの受信は毎回（USB CDC はフロー制御があるので、読むまで PC 側が待つ）
+  poll_serial_rx();
+
   // 100ms周期
   static unsigned long last_read_ms = 0;
   if (millis() - last_read_ms < 100) return;
@@ -276,6 +493,7 @@ void loop() {
       menu_sel = (menu_sel + 1) % 2;
       last_event = String("menu sel -> ") + (menu_sel == 0 ? "shortcut" : "passphrase");
       Serial.printf("[MENU] select=%d\n", menu_sel);
+      send_event_arg(EV_MENU_SELECT, (uint8_t)menu_sel);
     }
 
     static bool last_sw = false;
@@ -304,15 +522,35 @@ void loop() {
     }
     last_sw = sw;
 
+    if (slot_sel >= 0 && (dir_edge(d, DIR_LEFT) || dir_edge(d, DIR_RIGHT))) {
+      int s = next_slot(slot_sel, d == DIR_RIGHT ? 1 : -1);
+      if (s >= 0) slot_sel = s;
+      up_count = 0;
+      last_event = String("slot ") + slot_sel;
+    }
+
     if (dir_edge(d, DIR_UP)) {
       up_count++;
       Serial.printf(">>> UP EDGE (%d/%d)\n", up_count, UP_TARGET);
       last_event = String("UP EDGE -> ") + up_count + "/" + UP_TARGET;
 
       if (up_count >= UP_TARGET) {
+#if HOST_BRIDGE
+        if (slot_sel >= 0) {
+          send_event_arg(EV_FIRE_SLOT, (uint8_t)slot_sel);
+          Serial.printf("### SENT SLOT %d (bridge) ###\n", slot_sel);
+          last_event = String("### SENT: ") + slots[slot_sel].title;
+        } else {
+          send_event(EV_SHORTCUT);
+          Serial.println("### SENT EVENT (bridge) ###");
+          last_event = "### SENT EVENT ###";
+        }
+#else
+        send_event(EV_SHORTCUT);
         Serial.println("### SENT F13 ###");
         last_event = "### SENT F13 ###";
         send_f13_once();
+#endif
         up_count = 0;
         Serial.println(">>> UP COUNT RESET (0/2)");
       }
@@ -344,6 +582,7 @@ void loop() {
         pass_result_until_ms = millis() + 1500;
         last_event = "PASS NG";
         Serial.println("[PASS] RESULT = NG");
+        send_event(EV_PASS_NG);
       } else {
         pass_idx++;
         last_event = String("PASS OK step ") + pass_idx;
@@ -354,6 +593,7 @@ void loop() {
           pass_result_until_ms = millis() + 1500;
           last_event = "PASS OK (typing in 5s)";
           Serial.println("[PASS] RESULT = OK");
+          send_event(EV_PASS_OK);
 
           // ★ 5秒後に thank you! をタイプ予約
           thankyou_pending = true;
@@ -1,12 +1,57 @@
 # f13_f16_gui.py
+import sys
 import tkinter as tk
-import keyboard
+from pathlib import Path
+from tkinter import ttk
+
+# リスナー / WebUI 共用モジュール（app/common）
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "common"))
+
+import injector
+import keymap
+from hotkeys import MOD_ALT, MOD_CONTROL, MOD_SHIFT, MOD_WIN
+
+# Windows は SendInput で vk をそのまま送る（表のどのキーでも送れる。テンキーも区別される）。それ以外は keyboard
+sender = injector.create_injector()
+
+
+def send_stroke(mods: int, vk: int):
+    sender.send(injector.compile_stroke(mods, vk))
+
 
 def send_key(key_name: str):
     # クリックしたら指定キーを送信
-    keyboard.send(key_name)
+    try:
+        send_stroke(0, keymap.vk_from_name(key_name))
+    except (ValueError, OSError) as e:
+        status_var.set(f"Error: {e}")
+        return
     status_var.set(f"Sent {key_name.upper()}")
 
+
+def send_selected():
+    mods = sum(bit for bit, var in mod_vars if var.get())
+    try:
+        vk = keymap.vk_from_name(key_var.get())
+        send_stroke(mods, vk)
+    except (ValueError, OSError) as e:
+        status_var.set(f"Error: {e}")
+        return
+    names = [name for (bit, _), name in zip(mod_vars, ("ctrl", "alt", "shift", "win")) if mods & bit]
+    status_var.set(f"Sent {'+'.join(names + [keymap.VK_TO_NAME[vk]]).upper()}")
+
+
+def type_text():
+    # 文字列をまとめて1回で送る（1文字ずつ send しない）
+    text = text_var.get()
+    try:
+        sender.send(injector.compile_text(text))
+    except (ValueError, OSError) as e:
+        status_var.set(f"Error: {e}")
+        return
+    status_var.set(f"Typed {len(text)} chars")
+
+
 root = tk.Tk()
 root.title("F13-F16 Sender")
 root.resizable(False, False)
@@ -33,7 +78,33 @@ for label, key_name in buttons:
     )
     btn.pack(side="left", padx=6)
 
+# 任意のキー（keymap.py の表にあるもの全部）
+any_frame = tk.Frame(root, padx=12)
+any_frame.pack(fill="x")
+
+mod_vars = [(bit, tk.BooleanVar(value=False)) for bit in (MOD_CONTROL, MOD_ALT, MOD_SHIFT, MOD_WIN)]
+for (bit, var), label in zip(mod_vars, ("Ctrl", "Alt", "Shift", "Win")):
+    tk.Checkbutton(any_frame, text=label, variable=var).pack(side="left")
+
+key_var = tk.StringVar(value="f17")
+key_box = ttk.Combobox(
+    any_frame,
+    textvariable=key_var,
+    values=[keymap.VK_TO_NAME[vk] for vks in keymap.GROUPS.values() for vk in vks],
+    width=18,
+)
+key_box.pack(side="left", padx=6)
+key_box.bind("<Return>", lambda _e: send_selected())
+tk.Button(any_frame, text="Send", width=8, command=send_selected).pack(side="left")
+
+# 文字列の入力
+text_frame = tk.Frame(root, padx=12, pady=6)
+text_frame.pack(fill="x")
+text_var = tk.StringVar(value="thank you!")
+tk.Entry(text_frame, textvariable=text_var, width=32).pack(side="left")
+tk.Button(text_frame, text="Type", width=8, command=type_text).pack(side="left", padx=6)
+
 status = tk.Label(root, textvariable=status_var, padx=12, pady=6, anchor="w")
 status.pack(fill="x")
 
-root.mainloop()
\ No newline at end of file
+root.mainloop()
@@ -1,18 +1,33 @@
 from __future__ import annotations
 
+import copy
 import json
-import os
-import subprocess
+import sys
 import threading
 import time
 import uuid
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Any
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
 import streamlit as st
 import keyboard
 
+# リスナー / WebUI 共用モジュール（app/common）
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "common"))
+
+import config_store
+import injector
+import launcher
+import keymap
+import py_action
+from hotkeys import DUPLICATE, HAS_PREFIX, IS_PREFIX, canonical_hotkey, find_conflicts, keyboard_hotkey
+from supervisor import ProcessSupervisor
+
 CONFIG_PATH = "config/shortcut_config.json"
+MAX_LIVE_CHILDREN = 32  # アクションで起動して生きている子プロセスの上限
+SAVE_RETRIES = 5  # 保存の直前に他のセッションが保存していたら取り込み直す回数
+STATUS_REFRESH_SEC = 0.5  # 監視中に「常駐監視」の状態表示だけを更新する間隔（ページ全体は再実行しない）
 
 # ===============================
 # データ構造
@@ -24,6 +39,17 @@ class Shortcut:
     hotkey: str
     action_type: str  # "open_url" / "run_cmd" / "open_cmd"
     value: str
+    # リスナー用の追加項目（shell / max_concurrency など）。保存時にそのまま書き戻す
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+SHORTCUT_FIELDS = ("id", "title", "hotkey", "action_type", "value")
+
+
+def shortcut_to_dict(s: Shortcut) -> Dict[str, Any]:
+    d: Dict[str, Any] = {k: getattr(s, k) for k in SHORTCUT_FIELDS}
+    d.update({k: v for k, v in s.extra.items() if k not in SHORTCUT_FIELDS})
+    return d
 
 
 def new_id() -> str:
@@ -47,7 +73,8 @@ DEFAULT_SHORTCUTS: List[Shortcut] = [
     ),
 ]
 
-ACTION_TYPES = ["open_url", "run_cmd", "open_cmd"]
+ACTION_TYPES = ["open_url", "run_cmd", "open_cmd", "python", "type_text", "macro"]
+DEFAULT_ITEMS = [shortcut_to_dict(s) for s in DEFAULT_SHORTCUTS]
 
 
 # ===============================
@@ -64,112 +91,284 @@ def _normalize_action_type(at: str) -> str:
     return at
 
 
-def load_config() -> List[Shortcut]:
+def _args_text(args: Any) -> str:
+    return "" if args is None else json.dumps(args, ensure_ascii=False)
+
+
+def set_python_args(sc: Shortcut, text: str) -> None:
+    """action_type "python" の引数（JSON 文字列）を extra["args"] へ。空なら消す。解析できなければ ValueError"""
+    text = (text or "").strip()
+    if not text:
+        sc.extra.pop("args", None)
+        return
+    try:
+        sc.extra["args"] = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(str(e)) from None
+
+
+def shortcut_from_item(item: Dict[str, Any]) -> Shortcut:
     """
     旧フォーマット互換:
       - title が無い → title = hotkey
       - id が無い → 自動生成
       - action_type 未知 → run_cmd
     """
-    if not os.path.exists(CONFIG_PATH):
-        save_config(DEFAULT_SHORTCUTS)
-        return [Shortcut(**asdict(s)) for s in DEFAULT_SHORTCUTS]
+    sid = item.get("id") or new_id()
+    hotkey = _normalize_hotkey(item.get("hotkey", ""))
+    action_type = _normalize_action_type(item.get("action_type") or "run_cmd")
+    value = item.get("value") or ""
+    if action_type != injector.TYPE_TEXT:
+        value = value.strip()   # 入力する文字列は前後の空白 / 改行も中身
+
+    title = item.get("title")
+    if not title:
+        title = hotkey or "Unnamed"
+
+    # open_cmd は value 不要
+    if action_type == "open_cmd":
+        value = ""
+
+    return Shortcut(
+        id=sid,
+        title=title,
+        hotkey=hotkey,
+        action_type=action_type,
+        value=value,
+        extra={k: v for k, v in item.items() if k not in SHORTCUT_FIELDS},
+    )
 
-    try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            data: Dict[str, Any] = json.load(f)
-    except Exception:
-        save_config(DEFAULT_SHORTCUTS)
-        return [Shortcut(**asdict(s)) for s in DEFAULT_SHORTCUTS]
 
-    shortcuts: List[Shortcut] = []
-    for item in data.get("shortcuts", []):
-        sid = item.get("id") or new_id()
-        hotkey = _normalize_hotkey(item.get("hotkey", ""))
-        action_type = _normalize_action_type(item.get("action_type") or "run_cmd")
-        value = (item.get("value") or "").strip()
+def normalize_shortcut(s: Shortcut) -> Shortcut:
+    """保存する形に揃えたコピー"""
+    ss = Shortcut(**asdict(s))
+    ss.hotkey = _normalize_hotkey(ss.hotkey)
+    ss.title = (ss.title or "").strip() or (ss.hotkey or "Unnamed")
+    ss.action_type = _normalize_action_type(ss.action_type or "run_cmd")
+    ss.value = ss.value or ""
+    if ss.action_type != injector.TYPE_TEXT:
+        ss.value = ss.value.strip()
 
-        title = item.get("title")
-        if not title:
-            title = hotkey or "Unnamed"
+    if ss.action_type == "open_cmd":
+        ss.value = ""
+    return ss
+
+
+def to_item(s: Shortcut) -> Dict[str, Any]:
+    """比較 / マージ / 保存に使う形（normalize_shortcut 済みの dict）"""
+    return shortcut_to_dict(normalize_shortcut(s))
 
-        # open_cmd は value 不要
-        if action_type == "open_cmd":
-            value = ""
 
-        shortcuts.append(
-            Shortcut(
-                id=sid,
-                title=title,
-                hotkey=hotkey,
-                action_type=action_type,
-                value=value,
-            )
+def to_shortcuts(items: Sequence[Dict[str, Any]]) -> List[Shortcut]:
+    """共有の items からセッション用の Shortcut を作る（extra も含めてコピーする）"""
+    return [
+        Shortcut(
+            **{k: d[k] for k in SHORTCUT_FIELDS},
+            extra=copy.deepcopy({k: v for k, v in d.items() if k not in SHORTCUT_FIELDS}),
         )
+        for d in items
+    ]
+
+
+def _parse_items(cfg: config_store.ConfigFile) -> Tuple[Dict[str, Any], ...]:
+    return tuple(to_item(shortcut_from_item(item)) for item in cfg.shortcuts if isinstance(item, dict))
+
+
+@st.cache_resource
+def get_config_cache() -> config_store.ConfigCache:
+    """全セッションで共有する解析結果（version が変わったときだけ読み直す）"""
+    return config_store.ConfigCache(CONFIG_PATH, _parse_items)
+
+
+@st.cache_resource
+def get_config_set_reader() -> config_store.ConfigSetReader:
+    """include した分割ファイルも含めた設定（変わったファイルだけ読み直す）。編集はメインの設定だけ"""
+    return config_store.ConfigSetReader(CONFIG_PATH)
 
-    if not shortcuts:
-        shortcuts = [Shortcut(**asdict(s)) for s in DEFAULT_SHORTCUTS]
 
-    return shortcuts
+def load_all_shortcuts() -> List[Shortcut]:
+    """監視に使う、include した分割ファイルも含めた保存済みの設定（読めなければメインの設定だけ）"""
+    try:
+        cs = get_config_set_reader().load()
+    except (OSError, ValueError) as e:
+        print(f"[CONFIG] include ignored: {e}")
+        return to_shortcuts(load_config()[1] or DEFAULT_ITEMS)
+    return [shortcut_from_item(d) for d in cs.shortcuts if isinstance(d, dict)] or to_shortcuts(DEFAULT_ITEMS)
 
 
-def save_config(shortcuts: List[Shortcut]) -> None:
-    os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
+def load_config() -> Tuple[int, Tuple[Dict[str, Any], ...]]:
+    """
+    保存済みの設定を (version, items) で返す。items は全セッションで共有なので書き換えない
+    （セッションで編集するものは to_shortcuts() でコピーする）。
+    ファイルが無い / 読めなければ初期値で作り直す。
+    """
+    cache = get_config_cache()
+    try:
+        cfg, items = cache.get()
+    except (OSError, ValueError):
+        save_config(DEFAULT_SHORTCUTS)
+        cfg, items = cache.get()
+    return cfg.version, items
 
-    normalized: List[Shortcut] = []
-    for s in shortcuts:
-        ss = Shortcut(**asdict(s))
-        ss.hotkey = _normalize_hotkey(ss.hotkey)
-        ss.title = (ss.title or "").strip() or (ss.hotkey or "Unnamed")
-        ss.action_type = _normalize_action_type(ss.action_type or "run_cmd")
-        ss.value = (ss.value or "").strip()
 
-        if ss.action_type == "open_cmd":
-            ss.value = ""
+def hotkey_conflicts(shortcuts: List[Shortcut], hotkeys: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    ホットキーの衝突（同じキー / 先頭が一致する列 / 解析できない）を id -> メッセージで返す。
+    "ctrl+alt+f1" と "alt+ctrl+f1" のように書き方が違っても同じキーなら衝突。後に書いた方に付ける。
+    """
+    if hotkeys is None:
+        hotkeys = [s.hotkey for s in shortcuts]
+    out: Dict[str, str] = {}
+    for c in find_conflicts(hotkeys):
+        if c.other is None:
+            out[shortcuts[c.index].id] = f"ホットキーを解析できません: {c.detail}"
+            continue
+        other = shortcuts[c.other]
+        if c.reason == DUPLICATE:
+            msg = f"「{other.title}」と同じキーです（{c.detail}）"
+        elif c.reason == HAS_PREFIX:
+            msg = f"「{other.title}」（{hotkeys[c.other]}）が先に確定するため、この列は押せません"
+        elif c.reason == IS_PREFIX:
+            msg = f"「{other.title}」（{hotkeys[c.other]}）の先頭と同じため、そちらが押せなくなります"
+        else:
+            msg = c.reason
+        out[shortcuts[c.index].id] = msg
+    return out
 
-        normalized.append(ss)
 
-    data = {"shortcuts": [asdict(s) for s in normalized]}
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+@dataclass
+class SaveResult:
+    version: Optional[int] = None            # 保存した（内容が同じなら今の）version。保存しなかったら None
+    items: Tuple[Dict[str, Any], ...] = ()   # 保存した内容（他のセッションの変更を取り込んだ後）
+    merged_from: Optional[int] = None        # 変更を取り込んだ他のセッションの version（取り込んでいなければ None）
+    hotkey_conflicts: Dict[str, str] = field(default_factory=dict)   # id -> メッセージ
+    edit_conflicts: List[str] = field(default_factory=list)          # 他のセッションも変えていた id
+    current: Optional[Tuple[int, Tuple[Dict[str, Any], ...]]] = None  # 衝突したときの保存済みの設定
+
+    @property
+    def ok(self) -> bool:
+        return self.version is not None
+
+
+def save_config(
+    shortcuts: List[Shortcut], base: Optional[Tuple[int, Sequence[Dict[str, Any]]]] = None,
+) -> SaveResult:
+    """
+    base（編集を始めたときの (version, items)）を渡すと、その後に他のセッションが保存した変更を
+    id ごとに取り込んでから保存する（同じ項目を両方が変えていたら保存せず edit_conflicts に入れる）。
+    base が無ければそのまま上書きする。
+    ホットキーが衝突していれば保存せずにその内容（id -> メッセージ）を返す。
+    """
+    mine = [to_item(s) for s in shortcuts]
+    for _ in range(SAVE_RETRIES):
+        expect = merged_from = None
+        merged = mine
+        if base is not None:
+            version, theirs = load_config()
+            if version != base[0]:
+                merged, edit_conflicts = config_store.merge_shortcuts(base[1], mine, theirs)
+                if edit_conflicts:
+                    return SaveResult(edit_conflicts=edit_conflicts, current=(version, theirs))
+                merged_from = version
+            expect = version
+
+        conflicts = hotkey_conflicts(to_shortcuts(merged))
+        if conflicts:
+            return SaveResult(hotkey_conflicts=conflicts)
+
+        # 一時ファイル + rename で置き換える（リスナーが書きかけを読まない）。内容が同じなら書かない
+        try:
+            cfg = config_store.write_config(CONFIG_PATH, merged, expect_version=expect)
+        except config_store.VersionConflict:
+            continue   # load_config() と書き込みの間に他が保存した。取り込み直す
+        return SaveResult(version=cfg.version, items=tuple(merged), merged_from=merged_from)
+    raise RuntimeError(f"config is being saved by others; gave up after {SAVE_RETRIES} tries")
 
 
 # ===============================
 # 実行処理
 # ===============================
 def open_url_in_chrome(url: str) -> None:
-    subprocess.Popen(f'start chrome "{url}"', shell=True)
+    get_supervisor().spawn(launcher.url_spec(url, app="chrome"), key="test")
 
 
-def run_command(cmd: str) -> None:
-    subprocess.Popen(
-        f'cmd.exe /c start "" {cmd}',
-        shell=True,
-    )
+@st.cache_resource
+def get_supervisor() -> ProcessSupervisor:
+    # rerun / セッションをまたいでプロセス全体で1つ（起動した子プロセスを回収・上限管理する）
+    return ProcessSupervisor(max_children=MAX_LIVE_CHILDREN)
 
 
-def open_cmd_window() -> None:
-    subprocess.Popen(
-        ["cmd.exe", "/k"],
-        creationflags=subprocess.CREATE_NEW_CONSOLE,
-    )
+@st.cache_resource
+def get_py_resolver() -> py_action.PyActionResolver:
+    # action_type "python" のモジュールはプロセス全体で1回 import（変更されたものだけ読み直す）
+    py_action.add_search_path("actions")
+    return py_action.PyActionResolver()
 
 
-def execute(sc: Shortcut) -> None:
-    print(f"[EXEC] {sc.title} | {sc.hotkey} | {sc.action_type} | {sc.value}")
+@st.cache_resource
+def get_injector() -> injector.Injector:
+    # type_text / macro のキー入力の合成（Windows は SendInput、それ以外は keyboard）
+    return injector.create_injector()
 
+
+def build_launch(sc: Shortcut) -> Any:
+    """監視開始時に1回だけ解析しておく（python は import して関数まで引く / type_text・macro はキーイベントの列にする）"""
+    if sc.action_type in injector.ACTION_TYPES:
+        return injector.compile_action(sc.action_type, sc.value, sc.extra.get("pace_ms"), sc.extra.get("chunk"))
+    if sc.action_type == py_action.ACTION_TYPE:
+        return get_py_resolver().resolve(sc.value, sc.extra.get("args"))
     if sc.action_type == "open_url":
-        open_url_in_chrome(sc.value)
-    elif sc.action_type == "open_cmd":
-        open_cmd_window()
-    else:
-        run_command(sc.value)
+        return launcher.url_spec(sc.value, app="chrome")
+    if sc.action_type == "open_cmd":
+        return launcher.parse_command("cmd.exe /k")
+    return launcher.parse_command(sc.value, shell=bool(sc.extra.get("shell")))
+
+
+def _timeout_of(sc: Shortcut) -> Optional[float]:
+    try:
+        return float(sc.extra["timeout_sec"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _run_python(sc: Shortcut, target: py_action.PyTarget) -> None:
+    try:
+        py_action.call(target, _timeout_of(sc))
+    except Exception as e:
+        print(f"[EXEC] failed: {sc.title}: {e}")
+
+
+def execute(sc: Shortcut, spec: Any = None) -> None:
+    print(f"[EXEC] {sc.title} | {sc.hotkey} | {sc.action_type} | {sc.value}")
+
+    if sc.action_type == py_action.ACTION_TYPE:
+        # keyboard のフックスレッドを止めないよう別スレッドで呼ぶ
+        threading.Thread(target=_run_python, args=(sc, spec or build_launch(sc)), daemon=True).start()
+        return
+    if sc.action_type in injector.ACTION_TYPES:
+        threading.Thread(target=get_injector().run, args=(spec or build_launch(sc),), daemon=True).start()
+        return
+
+    # 新しいコンソールで直接起動（旧: cmd.exe /c start "" ... の二重起動）
+    get_supervisor().spawn(
+        spec or build_launch(sc),
+        key=sc.id,
+        timeout_sec=_timeout_of(sc),
+        new_console=True,
+    )
 
 
 # ===============================
 # 常駐監視スレッド（keyboard版）
 # ===============================
-def listener_loop(shortcuts: List[Shortcut], stop_event: threading.Event, status: Dict[str, str]) -> None:
+def on_hotkey(sc: Shortcut, spec: Any, status: Dict[str, Any]) -> None:
+    # 状態表示用（keyboard のコールバックは1本のフックスレッドから呼ばれる）
+    status["triggers"] = status.get("triggers", 0) + 1
+    status["last"] = f"{time.strftime('%H:%M:%S')}  {sc.hotkey}  {sc.title}"
+    execute(sc, spec)
+
+
+def listener_loop(shortcuts: List[Shortcut], stop_event: threading.Event, status: Dict[str, Any]) -> None:
     try:
         keyboard.unhook_all_hotkeys()
     except Exception:
@@ -178,13 +377,18 @@ def listener_loop(shortcuts: List[Shortcut], stop_event: threading.Event, status
     hook_ids = []
     errors = []
     registered = 0
+    conflicts = hotkey_conflicts(shortcuts)
 
     for sc in shortcuts:
         hk = _normalize_hotkey(sc.hotkey)
         if not hk:
             continue
+        if sc.id in conflicts:
+            errors.append(f"{hk}: {conflicts[sc.id]}")
+            continue
         try:
-            hid = keyboard.add_hotkey(hk, lambda s=sc: execute(s))
+            spec = build_launch(sc)
+            hid = keyboard.add_hotkey(keyboard_hotkey(hk), lambda s=sc, p=spec: on_hotkey(s, p, status))
             hook_ids.append(hid)
             registered += 1
         except Exception as e:
@@ -215,7 +419,9 @@ def listener_loop(shortcuts: List[Shortcut], stop_event: threading.Event, status
 # ===============================
 def ensure_state() -> None:
     if "shortcuts" not in st.session_state:
-        st.session_state.shortcuts = load_config()
+        reload_shortcuts()
+    if "save_conflict" not in st.session_state:
+        st.session_state.save_conflict = None
 
     if "listener_thread" not in st.session_state:
         st.session_state.listener_thread = None
@@ -226,8 +432,8 @@ def ensure_state() -> None:
     if "listener_status" not in st.session_state:
         st.session_state.listener_status = {"state": "stopped", "msg": "停止中"}
 
-    if "ui_last_tick" not in st.session_state:
-        st.session_state.ui_last_tick = 0.0
+    if "status_shown" not in st.session_state:
+        st.session_state.status_shown = "stopped"
 
     if "add_title" not in st.session_state:
         st.session_state.add_title = "New Shortcut"
@@ -239,6 +445,95 @@ def ensure_state() -> None:
         st.session_state.add_value_url = "https://chat.openai.com"
     if "add_value_cmd" not in st.session_state:
         st.session_state.add_value_cmd = ""
+    if "add_shell" not in st.session_state:
+        st.session_state.add_shell = False
+    if "add_value_py" not in st.session_state:
+        st.session_state.add_value_py = ""
+    if "add_args_py" not in st.session_state:
+        st.session_state.add_args_py = ""
+    if "add_value_text" not in st.session_state:
+        st.session_state.add_value_text = ""
+    if "add_value_macro" not in st.session_state:
+        st.session_state.add_value_macro = ""
+
+    # 一覧の絞り込み / ページ分け（ウィジェットの key と同じ名前）
+    if "editor_mode" not in st.session_state:
+        st.session_state.editor_mode = EDITOR_FORM
+    if "editor_query" not in st.session_state:
+        st.session_state.editor_query = ""
+    if "editor_types" not in st.session_state:
+        st.session_state.editor_types = []
+    if "editor_conflicts_only" not in st.session_state:
+        st.session_state.editor_conflicts_only = False
+    if "editor_page_size" not in st.session_state:
+        st.session_state.editor_page_size = PAGE_SIZES[1]
+    if "editor_page" not in st.session_state:
+        st.session_state.editor_page = 1
+    if "bulk_seq" not in st.session_state:
+        st.session_state.bulk_seq = 0
+
+
+# 1件分の入力欄の key の接頭辞（key は f"{接頭辞}{id}"）
+WIDGET_PREFIXES = (
+    "title_", "hotkey_", "type_", "value_url_", "value_cmd_", "shell_",
+    "value_py_", "args_py_", "value_text_", "value_macro_",
+)
+
+
+def forget_widgets(ids: Sequence[str]) -> None:
+    """入力欄に残っている値を捨てる（次の再実行でモデルの値から作り直す）"""
+    for sc_id in ids:
+        for prefix in WIDGET_PREFIXES:
+            st.session_state.pop(f"{prefix}{sc_id}", None)
+
+
+def reload_shortcuts() -> None:
+    """保存済みの設定を読み込み、それを編集の起点（config_base）にする"""
+    version, items = load_config()
+    st.session_state.config_base = (version, items)
+    st.session_state.shortcuts = to_shortcuts(items or DEFAULT_ITEMS)
+
+
+def adopt_items(current: Tuple[int, Sequence[Dict[str, Any]]], items: Sequence[Dict[str, Any]]) -> None:
+    """
+    他のセッションの変更を取り込んだ items を編集中の内容にし、current を新しい起点にする。
+    中身が変わった項目だけ入力欄の値を捨てる（自分が編集中の他の項目の入力はそのまま）。
+    """
+    mine = {sc.id: to_item(sc) for sc in st.session_state.shortcuts}
+    forget_widgets([d["id"] for d in items if mine.get(d["id"]) != d])
+    st.session_state.shortcuts = to_shortcuts(items)
+    st.session_state.config_base = (current[0], tuple(current[1]))
+    reset_bulk_view()
+
+
+def save_session() -> SaveResult:
+    """編集中の内容を保存する。他のセッションの変更と衝突したら save_conflict に残して保存しない"""
+    result = save_config(st.session_state.shortcuts, st.session_state.config_base)
+    if result.ok:
+        if result.merged_from is not None:
+            adopt_items((result.version, result.items), result.items)
+        st.session_state.config_base = (result.version, result.items)
+        st.session_state.save_conflict = None
+    elif result.edit_conflicts:
+        st.session_state.save_conflict = result
+    return result
+
+
+def resolve_save_conflict(keep_mine: bool) -> Optional[SaveResult]:
+    """
+    save_conflict を解消する。keep_mine なら衝突した項目を自分の内容にして保存し直す。
+    そうでなければ衝突した項目を保存済みの内容にする（衝突しなかった自分の変更は残す。保存はしない）。
+    """
+    conflict: SaveResult = st.session_state.save_conflict
+    merged, _ = config_store.merge_shortcuts(
+        st.session_state.config_base[1],
+        [to_item(sc) for sc in st.session_state.shortcuts],
+        conflict.current[1],
+        ours_wins=keep_mine,
+    )
+    adopt_items(conflict.current, merged)
+    st.session_state.save_conflict = None
+    return save_session() if keep_mine else None
 
 
 def listener_running() -> bool:
@@ -246,12 +541,13 @@ def listener_running() -> bool:
     return t is not None and t.is_alive()
 
 
-def start_listener_from_saved_config() -> None:
+def start_listener_from_saved_config() -> Optional[SaveResult]:
+    """編集中の内容を保存して監視を始める（衝突があれば保存せず、保存済みの設定で始める）"""
     if listener_running():
-        return
+        return None
 
-    save_config(st.session_state.shortcuts)
-    shortcuts = load_config()
+    result = save_session()
+    shortcuts = load_all_shortcuts()
 
     st.session_state.stop_event = threading.Event()
     st.session_state.listener_thread = threading.Thread(
@@ -260,6 +556,7 @@ def start_listener_from_saved_config() -> None:
         daemon=True,
     )
     st.session_state.listener_thread.start()
+    return result
 
 
 def stop_listener() -> None:
@@ -268,11 +565,27 @@ def stop_listener() -> None:
         time.sleep(0.2)
 
 
-def soft_autorefresh(interval_sec: float = 0.5) -> None:
-    now = time.time()
-    if now - st.session_state.ui_last_tick >= interval_sec:
-        st.session_state.ui_last_tick = now
-        st.rerun()
+def status_panel() -> None:
+    """
+    「常駐監視」の状態表示。監視中は st.fragment(run_every=...) でこの関数だけを再実行する
+    （ページ全体の再実行は入力があったときだけ）。
+    状態が変わったとき（監視スレッドの登録完了 / 停止）だけ、見出しのバッジのためにページ全体を1回再実行する。
+    """
+    status = st.session_state.listener_status
+    state = status.get("state", "stopped")
+    msg = status.get("msg", "停止中")
+    if state != st.session_state.status_shown:
+        st.session_state.status_shown = state
+        st.rerun(scope="app")
+
+    if state == "running":
+        st.success(msg)
+    elif state == "warning":
+        st.warning(msg)
+    else:
+        st.info(msg)
+    if status.get("triggers"):
+        st.caption(f"発火 {status['triggers']} 回 / 最後: {status.get('last', '')}")
 
 
 # ===============================
@@ -338,6 +651,10 @@ div.stButton > button {
 
 
 def badge_action(action_type: str) -> str:
+    if action_type == py_action.ACTION_TYPE:
+        return '<span class="badge badge-green">PYTHON</span>'
+    if action_type in injector.ACTION_TYPES:
+        return f'<span class="badge badge-blue">{action_type.upper().replace("_", " ")}</span>'
     if action_type == "open_url":
         return '<span class="badge badge-blue">OPEN URL</span>'
     if action_type == "open_cmd":
@@ -345,6 +662,167 @@ def badge_action(action_type: str) -> str:
     return '<span class="badge badge-gray">RUN CMD</span>'
 
 
+KEY_GROUP_LABELS = {
+    "letter": "英字", "digit": "数字", "function": "ファンクション", "numpad": "テンキー",
+    "edit": "編集", "nav": "移動", "system": "システム", "oem": "記号",
+    "media": "メディア", "browser": "ブラウザ / 起動",
+}
+
+
+def key_name_rows() -> List[Dict[str, str]]:
+    """keymap の表を一覧表示用の行にする"""
+    rows = []
+    for group, vks in keymap.GROUPS.items():
+        for vk in vks:
+            rows.append({
+                "グループ": KEY_GROUP_LABELS.get(group, group),
+                "キー名": keymap.VK_TO_NAME[vk],
+                "別名": ", ".join(keymap.aliases_of(vk)),
+                "vk": f"0x{vk:02X}",
+            })
+    return rows
+
+
+# ===============================
+# UI: 一覧の絞り込み / ページ分け / 表での一括編集
+# ===============================
+EDITOR_FORM = "フォーム"
+EDITOR_TABLE = "表（一括編集）"
+PAGE_SIZES = [10, 25, 50, 100, 250]
+BULK_COLUMNS = ("title", "hotkey", "action_type", "value")
+
+
+def filter_shortcuts(
+    shortcuts: List[Shortcut], query: str, action_types: List[str], only_ids: Optional[set] = None,
+) -> List[Shortcut]:
+    """タイトル / ホットキー / 値の部分一致（大文字小文字は区別しない）と動作タイプで絞り込む"""
+    q = query.strip().lower()
+    types = set(action_types)
+    out = []
+    for sc in shortcuts:
+        if types and sc.action_type not in types:
+            continue
+        if only_ids is not None and sc.id not in only_ids:
+            continue
+        if q and q not in sc.title.lower() and q not in sc.hotkey and q not in sc.value.lower():
+            continue
+        out.append(sc)
+    return out
+
+
+def page_count(n: int, size: int) -> int:
+    return max(1, -(-n // size))
+
+
+def reset_editor_page() -> None:
+    st.session_state.editor_page = 1
+
+
+def editor_conflicts(shortcuts: List[Shortcut], hotkeys: List[str]) -> Dict[str, str]:
+    """
+    hotkey_conflicts() の結果を、id / タイトル / ホットキーが前回の再実行から変わっていなければ使い回す
+    （何千件もあると検出に数十 ms かかり、入力の度に払うことになるため）。
+    """
+    sig = [(sc.id, sc.title, hk) for sc, hk in zip(shortcuts, hotkeys)]
+    cached = st.session_state.get("conflict_cache")
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    conflicts = hotkey_conflicts(shortcuts, hotkeys)
+    st.session_state.conflict_cache = (sig, conflicts)
+    return conflicts
+
+
+def reset_bulk_view() -> None:
+    """表の編集中の状態を捨てる（フォームへの切り替え / 初期化のとき）"""
+    st.session_state.pop("bulk_view", None)
+
+
+def apply_bulk_edits() -> int:
+    """
+    表（st.data_editor）で変わった行（edited_rows）だけをモデルへ反映する。反映した行数を返す。
+    edited_rows は表示した行の番号で来るので、表示したときの id の並び（bulk_view["ids"]）で引き直す。
+    何度反映しても同じ結果になる（data_editor は表示している間ずっと同じ edited_rows を返す）。
+    """
+    view = st.session_state.get("bulk_view")
+    if view is None:
+        return 0
+    edited = (st.session_state.get(view["key"]) or {}).get("edited_rows") or {}
+    if not edited:
+        return 0
+    by_id = {sc.id: sc for sc in st.session_state.shortcuts}
+    applied = 0
+    for row, changes in edited.items():
+        sc = by_id.get(view["ids"][int(row)])
+        if sc is None:
+            continue
+        for col, v in changes.items():
+            if col not in BULK_COLUMNS:
+                continue
+            v = "" if v is None else str(v)
+            if col == "hotkey":
+                v = _normalize_hotkey(v)
+            elif col == "action_type":
+                v = _normalize_action_type(v)
+            setattr(sc, col, v)
+        if sc.action_type == "open_cmd":
+            sc.value = ""
+        applied += 1
+    return applied
+
+
+def render_bulk_table(items: List[Shortcut], view_sig: tuple, conflicts: Dict[str, str]) -> None:
+    """
+    表示中のページを st.data_editor で一括編集する。
+    表に渡すデータは絞り込み / ページが変わるまで作り直さない（作り直すと data_editor の編集状態が消える）。
+    """
+    view = st.session_state.get("bulk_view")
+    if view is None or view["sig"] != view_sig:
+        st.session_state.bulk_seq += 1
+        view = {
+            "sig": view_sig,
+            "key": f"bulk_editor_{st.session_state.bulk_seq}",
+            "ids": [sc.id for sc in items],
+            "rows": [{col: getattr(sc, col) for col in BULK_COLUMNS} for sc in items],
+        }
+        st.session_state.bulk_view = view
+
+    st.data_editor(
+        view["rows"],
+        key=view["key"],
+        num_rows="fixed",
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "title": st.column_config.TextColumn("タイトル", required=True),
+            "hotkey": st.column_config.TextColumn("ホットキー"),
+            "action_type": st.column_config.SelectboxColumn("動作タイプ", options=ACTION_TYPES, required=True),
+            "value": st.column_config.TextColumn("値"),
+        },
+    )
+    st.caption("python の引数 / シェル経由での実行 / 削除はフォーム表示で編集します。")
+    for sc_id in view["ids"]:
+        if sc_id in conflicts:
+            title = next(sc.title for sc in items if sc.id == sc_id)
+            st.error(f"{title}: {conflicts[sc_id]}")
+
+
+def include_notice() -> None:
+    """include した分割ファイルの件数 / 重複を表示する（ここでは編集しない）"""
+    try:
+        cs = get_config_set_reader().load()
+    except (OSError, ValueError) as e:
+        st.warning(f"include した設定を読めません: {e}")
+        return
+    if len(cs.shards) < 2 and not cs.missing:
+        return
+    counts = " / ".join(f"`{shard.path.name}` {len(shard.shortcuts)} 件" for shard in cs.shards[1:])
+    st.caption(f"include: {counts or 'なし'}（監視にはこの一覧の後に加わります。編集は各ファイルで）")
+    for p in cs.missing:
+        st.warning(f"include に書かれたファイルがありません: {p}")
+    for d in cs.duplicates:
+        st.warning(f"id `{d.id}` が `{d.kept.name}` と `{d.dropped.name}` の両方にあります（`{d.kept.name}` を使います）")
+
+
 def badge_state(state: str) -> str:
     if state == "running":
         return '<span class="badge badge-green">RUNNING</span>'
@@ -361,7 +839,7 @@ ensure_state()
 inject_css()
 
 state = st.session_state.listener_status.get("state", "stopped")
-msg = st.session_state.listener_status.get("msg", "停止中")
+st.session_state.status_shown = state
 
 st.markdown(
     f"""
@@ -385,60 +863,162 @@ with left:
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.subheader("ショートカット（編集）")
     st.caption("ホットキーは `ctrl+f1` や `ctrl+shift+f2` のように指定できます。")
+    include_notice()
+
+    f1, f2, f3 = st.columns([1.4, 1.2, 1])
+    with f1:
+        st.text_input("検索（タイトル / ホットキー / 値）", key="editor_query", on_change=reset_editor_page)
+    with f2:
+        st.multiselect("動作タイプ", ACTION_TYPES, key="editor_types", on_change=reset_editor_page)
+    with f3:
+        st.radio("表示", [EDITOR_FORM, EDITOR_TABLE], key="editor_mode", horizontal=True)
+    table_mode = st.session_state.editor_mode == EDITOR_TABLE
+    if table_mode:
+        apply_bulk_edits()
+    else:
+        reset_bulk_view()
 
-    for sc in list(st.session_state.shortcuts):
-        label = f"{sc.title}  •  {sc.hotkey}  •  {sc.action_type}"
-        with st.expander(label, expanded=False):
-            st.markdown(
-                f"""
+    # 入力欄の最新の値で衝突を調べる（この後のループで sc.hotkey が更新される前に表示するため）
+    editing = list(st.session_state.shortcuts)
+    conflicts = editor_conflicts(
+        editing, [_normalize_hotkey(st.session_state.get(f"hotkey_{sc.id}", sc.hotkey)) for sc in editing]
+    )
+
+    # 表示するのは絞り込んだ結果の1ページ分だけ（全件のウィジェットは作らない）
+    filtered = filter_shortcuts(
+        editing,
+        st.session_state.editor_query,
+        st.session_state.editor_types,
+        set(conflicts) if st.session_state.editor_conflicts_only else None,
+    )
+    pages = page_count(len(filtered), st.session_state.editor_page_size)
+    if st.session_state.editor_page > pages:
+        st.session_state.editor_page = pages
+    p1, p2, p3 = st.columns([1.4, 1.2, 1])
+    with p1:
+        st.checkbox(f"衝突のみ（{len(conflicts)} 件）", key="editor_conflicts_only", on_change=reset_editor_page)
+    with p2:
+        st.selectbox("1ページの件数", PAGE_SIZES, key="editor_page_size", on_change=reset_editor_page)
+    with p3:
+        st.number_input(f"ページ（全 {pages}）", min_value=1, max_value=pages, step=1, key="editor_page")
+    size = st.session_state.editor_page_size
+    page = st.session_state.editor_page
+    page_items = filtered[(page - 1) * size:page * size]
+    st.caption(f"{len(filtered)} / {len(editing)} 件（{page} / {pages} ページ）")
+    if conflicts and not st.session_state.editor_conflicts_only:
+        st.warning(f"ホットキーの衝突が {len(conflicts)} 件あります（「衝突のみ」で絞り込めます）")
+
+    if table_mode:
+        view_sig = (
+            st.session_state.editor_query, tuple(st.session_state.editor_types),
+            st.session_state.editor_conflicts_only, size, page, len(editing),
+        )
+        render_bulk_table(page_items, view_sig, conflicts)
+    else:
+        for sc in page_items:
+            label = f"{sc.title}  •  {sc.hotkey}  •  {sc.action_type}"
+            if sc.id in conflicts:
+                label = "⚠ " + label
+            with st.expander(label, expanded=sc.id in conflicts):
+                st.markdown(
+                    f"""
 <div class="kv">
   <span class="badge badge-gray">{sc.hotkey or 'no-hotkey'}</span>
   {badge_action(sc.action_type)}
 </div>
 """,
-                unsafe_allow_html=True,
-            )
-
-            sc.title = st.text_input("タイトル", sc.title, key=f"title_{sc.id}")
-
-            sc.hotkey = st.text_input(
-                "ホットキー（例: ctrl+f1 / ctrl+shift+f2）",
-                sc.hotkey,
-                key=f"hotkey_{sc.id}",
-            )
-            sc.hotkey = _normalize_hotkey(sc.hotkey)
-
-            sc.action_type = st.selectbox(
-                "動作タイプ",
-                ACTION_TYPES,
-                index=ACTION_TYPES.index(sc.action_type) if sc.action_type in ACTION_TYPES else 1,
-                key=f"type_{sc.id}",
-                help="open_url: ChromeでURL / run_cmd: コマンド実行 / open_cmd: cmd.exe を開く",
-            )
-
-            if sc.action_type == "open_url":
-                sc.value = st.text_input(
-                    "URL",
-                    sc.value,
-                    key=f"value_url_{sc.id}",
-                    help="例: https://chat.openai.com",
+                    unsafe_allow_html=True,
                 )
-            elif sc.action_type == "run_cmd":
-                sc.value = st.text_input(
-                    "コマンド",
-                    sc.value,
-                    key=f"value_cmd_{sc.id}",
-                    help='例: notepad / "C:\\\\path\\\\app.exe" --arg',
+
+                sc.title = st.text_input("タイトル", sc.title, key=f"title_{sc.id}")
+
+                sc.hotkey = st.text_input(
+                    "ホットキー（例: ctrl+f1 / ctrl+shift+f2）",
+                    sc.hotkey,
+                    key=f"hotkey_{sc.id}",
+                )
+                sc.hotkey = _normalize_hotkey(sc.hotkey)
+                if sc.id in conflicts:
+                    st.error(conflicts[sc.id])
+
+                sc.action_type = st.selectbox(
+                    "動作タイプ",
+                    ACTION_TYPES,
+                    index=ACTION_TYPES.index(sc.action_type) if sc.action_type in ACTION_TYPES else 1,
+                    key=f"type_{sc.id}",
+                    help="open_url: ChromeでURL / run_cmd: コマンド実行 / open_cmd: cmd.exe を開く"
+                    " / python: Python の関数を呼ぶ（プロセスを起動しない）"
+                    " / type_text: 文字列を入力 / macro: キー操作の列を入力",
                 )
-            else:
-                sc.value = ""
-                st.caption("cmd.exe を開きます（入力不要）")
 
-            del_col, _ = st.columns([1, 3])
-            with del_col:
-                if st.button("削除", key=f"del_{sc.id}", type="secondary"):
-                    st.session_state.shortcuts = [x for x in st.session_state.shortcuts if x.id != sc.id]
-                    st.rerun()
+                if sc.action_type == "open_url":
+                    sc.value = st.text_input(
+                        "URL",
+                        sc.value,
+                        key=f"value_url_{sc.id}",
+                        help="例: https://chat.openai.com",
+                    )
+                elif sc.action_type == "run_cmd":
+                    sc.value = st.text_input(
+                        "コマンド",
+                        sc.value,
+                        key=f"value_cmd_{sc.id}",
+                        help='例: notepad / "C:\\\\path\\\\app.exe" --arg',
+                    )
+                    shell = st.checkbox(
+                        "シェル経由で実行",
+                        value=bool(sc.extra.get("shell")),
+                        key=f"shell_{sc.id}",
+                        help="パイプ / リダイレクト / start などシェルの機能を使うコマンドだけチェック（通常は直接起動）",
+                    )
+                    if shell:
+                        sc.extra["shell"] = True
+                    else:
+                        sc.extra.pop("shell", None)
+                elif sc.action_type == py_action.ACTION_TYPE:
+                    sc.value = st.text_input(
+                        "関数",
+                        sc.value,
+                        key=f"value_py_{sc.id}",
+                        help="例: my_actions.clock:write_timestamp（actions/ 配下か import できる場所に置く）",
+                    )
+                    args_text = st.text_input(
+                        "引数（JSON、省略可）",
+                        _args_text(sc.extra.get("args")),
+                        key=f"args_py_{sc.id}",
+                        help='配列なら位置引数、オブジェクトならキーワード引数。例: {"path": "stamp.txt"}',
+                    )
+                    try:
+                        set_python_args(sc, args_text)
+                    except ValueError as e:
+                        st.error(f"引数の JSON を解析できません: {e}")
+                elif sc.action_type == injector.TYPE_TEXT:
+                    sc.value = st.text_area(
+                        "入力する文字列",
+                        sc.value,
+                        key=f"value_text_{sc.id}",
+                        help="改行は Enter、タブは Tab として入力します。速すぎて取りこぼすアプリは設定ファイルの pace_ms で間隔を空けてください",
+                    )
+                elif sc.action_type == injector.MACRO:
+                    sc.value = st.text_input(
+                        "キー操作",
+                        sc.value,
+                        key=f"value_macro_{sc.id}",
+                        help="ホットキーと同じ書式を , で区切って並べる。例: ctrl+a, ctrl+c, tab, ctrl+v",
+                    )
+                    try:
+                        injector.compile_macro(sc.value)
+                    except ValueError as e:
+                        st.error(f"キー操作を解析できません: {e}")
+                else:
+                    sc.value = ""
+                    st.caption("cmd.exe を開きます（入力不要）")
+
+                del_col, _ = st.columns([1, 3])
+                with del_col:
+                    if st.button("削除", key=f"del_{sc.id}", type="secondary"):
+                        st.session_state.shortcuts = [x for x in st.session_state.shortcuts if x.id != sc.id]
+                        st.rerun()
 
     st.divider()
 
@@ -448,6 +1028,10 @@ with left:
     with c1:
         st.session_state.add_title = st.text_input("タイトル", st.session_state.add_title)
         st.session_state.add_hotkey = st.text_input("ホットキー", st.session_state.add_hotkey)
+        try:
+            st.caption(f"→ `{canonical_hotkey(st.session_state.add_hotkey)}`")
+        except ValueError as e:
+            st.error(f"ホットキーを解析できません: {e}")
     with c2:
         st.session_state.add_action_type = st.selectbox(
             "動作タイプ",
@@ -465,6 +1049,22 @@ with left:
             st.session_state.add_value_cmd,
             help='例: notepad / "C:\\\\path\\\\app.exe" --arg',
         )
+        st.session_state.add_shell = st.checkbox("シェル経由で実行", st.session_state.add_shell)
+    elif st.session_state.add_action_type == py_action.ACTION_TYPE:
+        st.session_state.add_value_py = st.text_input(
+            "関数",
+            st.session_state.add_value_py,
+            help="例: my_actions.clock:write_timestamp",
+        )
+        st.session_state.add_args_py = st.text_input("引数（JSON、省略可）", st.session_state.add_args_py)
+    elif st.session_state.add_action_type == injector.TYPE_TEXT:
+        st.session_state.add_value_text = st.text_area("入力する文字列", st.session_state.add_value_text)
+    elif st.session_state.add_action_type == injector.MACRO:
+        st.session_state.add_value_macro = st.text_input(
+            "キー操作",
+            st.session_state.add_value_macro,
+            help="例: ctrl+a, ctrl+c, tab, ctrl+v",
+        )
     else:
         st.caption("cmd.exe を開きます（入力不要）")
 
@@ -475,38 +1075,101 @@ with left:
             value = st.session_state.add_value_url.strip()
         elif action_type == "run_cmd":
             value = st.session_state.add_value_cmd.strip()
+        elif action_type == py_action.ACTION_TYPE:
+            value = st.session_state.add_value_py.strip()
+        elif action_type == injector.TYPE_TEXT:
+            value = st.session_state.add_value_text
+        elif action_type == injector.MACRO:
+            value = st.session_state.add_value_macro.strip()
         else:
             value = ""
 
-        st.session_state.shortcuts.append(
-            Shortcut(
-                id=new_id(),
-                title=(st.session_state.add_title.strip() or "Untitled"),
-                hotkey=_normalize_hotkey(st.session_state.add_hotkey),
-                action_type=action_type,
-                value=value,
-            )
+        new_sc = Shortcut(
+            id=new_id(),
+            title=(st.session_state.add_title.strip() or "Untitled"),
+            hotkey=_normalize_hotkey(st.session_state.add_hotkey),
+            action_type=action_type,
+            value=value,
+            extra={"shell": True} if action_type == "run_cmd" and st.session_state.add_shell else {},
         )
+        if action_type == py_action.ACTION_TYPE:
+            try:
+                set_python_args(new_sc, st.session_state.add_args_py)
+            except ValueError as e:
+                st.error(f"追加できません: 引数の JSON を解析できません: {e}")
+                st.stop()
+        if action_type in injector.ACTION_TYPES:
+            try:
+                injector.compile_action(action_type, value)
+            except ValueError as e:
+                st.error(f"追加できません: {e}")
+                st.stop()
+        add_conflict = hotkey_conflicts(st.session_state.shortcuts + [new_sc]).get(new_sc.id)
+        if add_conflict:
+            st.error(f"追加できません: {add_conflict}")
+            st.stop()
+        st.session_state.shortcuts.append(new_sc)
 
         st.session_state.add_title = "New Shortcut"
         st.session_state.add_hotkey = "ctrl+f2"
         st.session_state.add_action_type = "open_url"
         st.session_state.add_value_url = "https://chat.openai.com"
         st.session_state.add_value_cmd = ""
+        st.session_state.add_shell = False
+        st.session_state.add_value_py = ""
+        st.session_state.add_args_py = ""
+        st.session_state.add_value_text = ""
+        st.session_state.add_value_macro = ""
 
         st.rerun()
 
     st.divider()
 
+    if st.session_state.save_conflict is not None:
+        conflict = st.session_state.save_conflict
+        theirs = {d["id"]: d for d in conflict.current[1]}
+        mine = {sc.id: sc for sc in st.session_state.shortcuts}
+        st.error(
+            f"他の画面で保存された内容（version {conflict.current[0]}）と {len(conflict.edit_conflicts)} 件の項目が"
+            "両方で変更されているため保存しませんでした"
+        )
+        for sc_id in conflict.edit_conflicts:
+            m, t = mine.get(sc_id), theirs.get(sc_id)
+            title = m.title if m is not None else t["title"]
+            mine_text = f"`{m.hotkey}` {m.action_type} {m.value}" if m is not None else "（削除）"
+            their_text = f"`{t['hotkey']}` {t['action_type']} {t['value']}" if t is not None else "（削除）"
+            st.markdown(f"- **{title}**: 自分 {mine_text} / 保存済み {their_text}")
+        r1, r2 = st.columns(2)
+        with r1:
+            if st.button("保存済みの内容を採る", help="衝突した項目だけ保存済みの内容にします（他の自分の変更は残ります）"):
+                resolve_save_conflict(keep_mine=False)
+                st.rerun()
+        with r2:
+            if st.button("自分の内容で上書き保存", help="衝突した項目を自分の内容にして保存します"):
+                resolve_save_conflict(keep_mine=True)
+                st.rerun()
+
     a1, a2, a3 = st.columns(3)
     with a1:
         if st.button("保存", type="primary"):
-            save_config(st.session_state.shortcuts)
-            st.success(f"保存しました: {CONFIG_PATH}")
+            result = save_session()
+            if result.hotkey_conflicts:
+                st.error(f"ホットキーが {len(result.hotkey_conflicts)} 件衝突しているため保存しませんでした（⚠ の項目を確認）")
+            elif result.edit_conflicts:
+                st.rerun()   # 上の衝突の表示を出す
+            elif result.merged_from is not None:
+                st.toast(f"他の画面で保存された変更を取り込んで保存しました（version {result.version}）", icon="🔀")
+                st.rerun()
+            elif result.ok:
+                st.success(f"保存しました: {CONFIG_PATH}（version {result.version}）")
     with a2:
         if st.button("初期化", type="secondary"):
+            forget_widgets([sc.id for sc in st.session_state.shortcuts])
             st.session_state.shortcuts = [Shortcut(**asdict(s)) for s in DEFAULT_SHORTCUTS]
-            save_config(st.session_state.shortcuts)
+            reset_bulk_view()
+            result = save_config(st.session_state.shortcuts)   # 他の画面の変更も含めて上書きする
+            st.session_state.config_base = (result.version, result.items)
+            st.session_state.save_conflict = None
             st.info("初期状態に戻しました")
             st.rerun()
     with a3:
@@ -523,20 +1186,19 @@ with right:
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.subheader("常駐監視")
 
-    if state == "running":
-        st.success(msg)
-    elif state == "warning":
-        st.warning(msg)
-    else:
-        st.info(msg)
+    # 監視していない間は何も更新しない（開いているだけのタブはサーバーの CPU を使わない）
+    st.fragment(run_every=STATUS_REFRESH_SEC if listener_running() else None)(status_panel)()
 
     st.caption("おすすめは `ctrl+f1`, `ctrl+f2`, `ctrl+shift+f1` などです。")
 
     b1, b2 = st.columns(2)
     with b1:
         if st.button("監視を開始（保存済み）", type="primary"):
-            start_listener_from_saved_config()
-            st.toast("監視を開始しました", icon="🟢")
+            started = start_listener_from_saved_config()
+            if started is not None and not started.ok:
+                st.toast("保存できなかったため、保存済みの設定で開始しました", icon="⚠️")
+            else:
+                st.toast("監視を開始しました", icon="🟢")
             st.rerun()
 
     with b2:
@@ -557,7 +1219,7 @@ with right:
 - **より安定させたい**: 監視は `keyboard` 版より、あなたの `RegisterHotKey` 版 listener.py の方が向いています
 """.strip()
     )
+    with st.expander("使えるキー名"):
+        st.caption("別名で書いても同じキーとして扱います。テンキーは RegisterHotKey 版リスナーでのみ監視できます。")
+        st.dataframe(key_name_rows(), hide_index=True, width="stretch")
     st.markdown("</div>", unsafe_allow_html=True)
-
-if listener_running():
-    soft_autorefresh(interval_sec=0.5)
\ No newline at end of file
@@ -0,0 +1,60 @@
+# _check.py
+# -*- coding: utf-8 -*-
+"""
+bench/check_*.py（と一部の bench_*.py）で共通に使う確認用の部品。
+スクリプトと同じディレクトリにあるので、`python bench/check_xxx.py` で実行すれば import できる。
+
+  check = Checks()
+  check("version increments", v == 2, f"version={v}")   # "OK  ラベル  詳細" / "NG  ..." を表示
+  ...
+  return check.result()                                  # 全体の OK / NG を表示して終了コード（0 / 1）
+"""
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+
+def wait_until(cond: Callable[[], object], timeout: float, interval: float = 0.005) -> bool:
+    """cond() が真になるまで最大 timeout 秒待つ。最後にもう一度だけ見た結果を返す"""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(interval)
+    return bool(cond())
+
+
+def compile_config(shortcuts: list) -> list:
+    """設定ファイルに書き、リスナーと同じ経路（ConfigSetReader → compile_config）で事前コンパイルする。
+    app/key_listener を sys.path に入れたスクリプトから使う"""
+    import shortcut_key_listener as skl
+    from config_store import ConfigSetReader, write_config
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "shortcut_config.json"
+        write_config(path, shortcuts)
+        return skl.compile_config(ConfigSetReader(path).load())
+
+
+class Checks:
+    """確認項目を1行ずつ表示し、1つでも NG があれば result() が 1 を返す"""
+    def __init__(self) -> None:
+        self.ok = True
+
+    def __call__(self, label: str, cond: object, detail: str = "") -> bool:
+        passed = bool(cond)
+        print(f"{'OK' if passed else 'NG'}  {label}  {detail}")
+        self.ok = self.ok and passed
+        return passed
+
+    def fail(self, message: str) -> None:
+        """結果を自分で表示するスクリプト用: 理由を表示して全体を NG にする"""
+        print(f"    NG: {message}")
+        self.ok = False
+
+    def result(self) -> int:
+        print("OK" if self.ok else "NG")
+        return 0 if self.ok else 1
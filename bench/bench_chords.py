@@ -0,0 +1,106 @@
+# bench_chords.py
+# -*- coding: utf-8 -*-
+"""
+複数ストロークのホットキーを大量（既定 10k 件）に登録したときのコストを測る（Linux でも動く）。
+
+  - load:    設定 -> CompiledShortcut -> トライ木 + 1打目の登録（初回 / 変更なし）
+  - matcher: ChordMatcher.feed() だけの1打あたりの時間
+  - dispatch: FakeBackend のキー入力から実行キュー投入まで（続きのキーの一時登録 / 解除を含む）
+  - memory:  1列あたりのメモリ
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_chords.py [列の数]
+"""
+from __future__ import annotations
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from chord import ChordMatcher  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+from _check import compile_config  # noqa: E402
+
+LEADER_MODS = ("ctrl", "alt", "ctrl+alt", "ctrl+shift", "alt+shift", "ctrl+alt+shift")
+KEYS = [chr(c) for c in range(ord("a"), ord("z") + 1)] + [str(i) for i in range(10)]
+SECONDS = KEYS + [f"shift+{k}" for k in KEYS]   # 2打目の候補（72 通り）
+PER_LEADER = 64
+
+
+def make_config(n: int) -> list[dict]:
+    out = []
+    for i in range(n):
+        li, si = divmod(i, PER_LEADER)
+        leader = f"{LEADER_MODS[li % len(LEADER_MODS)]}+{KEYS[li // len(LEADER_MODS)]}"
+        out.append({"id": f"seq{i}", "hotkey": f"{leader}, {SECONDS[si]}", "value": "true"})
+    return out
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rounds = 20_000
+    skl.DEBOUNCE_SEC = 0.0
+    skl.EXECUTOR_MAX_QUEUE = rounds
+    config = make_config(n)
+
+    # load
+    backend = FakeBackend()
+    listener = skl.HotkeyListener(execute_fn=lambda sc, trace=None: None, backend=backend)
+    t0 = time.perf_counter()
+    shortcuts = compile_config(config)
+    t1 = time.perf_counter()
+    first = listener.register_shortcuts(shortcuts)
+    again = listener.register_shortcuts(shortcuts)
+    print(f"sequences={n} leaders registered={len(backend.registered)} conflicts={first.conflicts}")
+    print(f"[load]     compile={(t1 - t0) * 1000:8.2f} ms  register: first={first.elapsed_ms:7.2f} ms"
+          f"  unchanged={again.elapsed_ms:7.2f} ms")
+
+    # matcher だけ
+    rnd = random.Random(0)
+    picks = [rnd.choice(shortcuts).strokes for _ in range(rounds)]
+    matcher = ChordMatcher(listener._chords.trie, 1.0)
+    feed = matcher.feed
+    strokes = [s for seq in picks for s in seq]
+    t0 = time.perf_counter()
+    now = time.monotonic()
+    for s in strokes:
+        feed(s, now)
+    dt = time.perf_counter() - t0
+    print(f"[matcher]  {dt / len(strokes) * 1e9:8.1f} ns/stroke  (matched={matcher.matched}/{rounds})")
+
+    # FakeBackend のキー入力 -> 実行キュー（run_message_loop と同じ処理を同期で回す）
+    submitted0 = listener.executor.stats()["submitted"]
+    t0 = time.perf_counter()
+    for seq in picks:
+        for s in seq:
+            backend.press(*s)
+            _, hid = backend.wait()
+            listener.dispatch_hotkey(hid, time.perf_counter())
+    dt = time.perf_counter() - t0
+    submitted = listener.executor.stats()["submitted"] - submitted0
+    print(f"[dispatch] {dt / rounds * 1e6:8.1f} us/sequence  {rounds / dt:10,.0f} sequences/s"
+          f"  (submitted={submitted}/{rounds}, grabs released={not listener._chord_grabs})")
+    listener.stop()
+
+    # memory
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    backend = FakeBackend()
+    listener = skl.HotkeyListener(execute_fn=lambda sc, trace=None: None, backend=backend)
+    listener.register_shortcuts(compile_config(config))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    print(f"[memory]   {used / n:8.1f} B/sequence (レコード + トライ木 + 登録テーブル)")
+    listener.stop()
+
+
+if __name__ == "__main__":
+    main()
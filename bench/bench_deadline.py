@@ -0,0 +1,105 @@
+# bench_deadline.py
+# -*- coding: utf-8 -*-
+"""
+過負荷時の priority / max_age_ms の効き具合を測る（Linux でも動く）。
+
+処理能力（workers / 実行時間）を超える頻度でトリガーを投げ続け、
+priority 毎の実行件数・破棄件数と、実行開始時点の待ち時間（p50 / p99 / max）を表示する。
+max_age_ms を設定したショートカットは、待ち時間が max_age_ms を超えないはず。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_deadline.py [秒数] [過負荷倍率]
+"""
+from __future__ import annotations
+
+import collections
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+
+WORK_MS = 5.0
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def main() -> None:
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    overload = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+
+    skl.DEBOUNCE_SEC = 0.0
+    skl.EXECUTOR_WORKERS = 2
+    skl.EXECUTOR_MAX_QUEUE = 100_000  # キュー溢れではなく期限切れで捨てられる様子を見る
+
+    shortcuts = [
+        skl.compile_shortcut(sc) for sc in (
+            {"id": "hi", "hotkey": "ctrl+f1", "priority": 10, "max_age_ms": 200, "max_concurrency": 2, "value": "true"},
+            {"id": "mid", "hotkey": "ctrl+f2", "priority": 5, "max_age_ms": 200, "max_concurrency": 2, "value": "true"},
+            {"id": "lo", "hotkey": "ctrl+f3", "priority": 0, "max_age_ms": 200, "max_concurrency": 2, "value": "true"},
+            {"id": "lo-nolimit", "hotkey": "ctrl+f4", "priority": 0, "max_concurrency": 2, "value": "true"},
+        )
+    ]
+
+    lock = threading.Lock()
+    ages: dict[str, list[float]] = collections.defaultdict(list)
+    ran: collections.Counter[str] = collections.Counter()
+    submitted: collections.Counter[str] = collections.Counter()
+    t_sent: dict[int, float] = {}
+
+    def fake_execute(sc: skl.CompiledShortcut, trace=None) -> None:
+        age_ms = (time.monotonic() - t_sent[id(sc)]) * 1000.0
+        with lock:
+            ages[sc.id].append(age_ms)
+            ran[sc.id] += 1
+        time.sleep(WORK_MS / 1000.0)
+
+    listener = skl.HotkeyListener(execute_fn=fake_execute)
+
+    capacity_per_sec = skl.EXECUTOR_WORKERS * 1000.0 / WORK_MS
+    interval = 1.0 / (capacity_per_sec * overload)
+    t_end = time.monotonic() + duration
+    i = 0
+    next_at = time.monotonic()
+    while time.monotonic() < t_end:
+        base = shortcuts[i % len(shortcuts)]
+        sc = base._replace()  # 1件毎に別オブジェクト（投入時刻の紐づけ用）
+        t_sent[id(sc)] = time.monotonic()
+        listener._enqueue(sc)
+        submitted[base.id] += 1
+        i += 1
+        next_at += interval
+        delay = next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    # 残りを捌かせる（期限付きのものは期限切れで捨てられる）
+    ex = listener.executor
+    while ex.stats()["queue_depth"] or ex.stats()["running"]:
+        time.sleep(0.01)
+        if time.monotonic() > t_end + 30:
+            break
+    listener.stop()
+
+    st = ex.stats()
+    print(f"capacity={capacity_per_sec:.0f}/s offered={capacity_per_sec * overload:.0f}/s duration={duration}s")
+    for sc in shortcuts:
+        a = sorted(ages[sc.id])
+        print(
+            f"{sc.id:>11} prio={sc.priority:>2} max_age={sc.max_age_ms or '-'!s:>4}"
+            f"  submitted={submitted[sc.id]:>5} ran={ran[sc.id]:>5}"
+            f"  age p50={percentile(a, 0.5):7.1f}ms p99={percentile(a, 0.99):7.1f}ms"
+            f" max={(a[-1] if a else 0.0):7.1f}ms"
+        )
+    print(f"rejected={st['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
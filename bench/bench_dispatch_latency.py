@@ -0,0 +1,67 @@
+# bench_dispatch_latency.py
+# -*- coding: utf-8 -*-
+"""
+キーイベント発生 → HotkeyListener._enqueue までの遅延を測る（Linux でも動く）。
+
+FakeBackend にイベントを積み、ディスパッチループが _enqueue に
+到達するまでの時間の p50 / p99 を表示する。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_dispatch_latency.py [回数]
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    idx = min(len(sorted_values) - 1, int(len(sorted_values) * p))
+    return sorted_values[idx]
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    skl.DEBOUNCE_SEC = 0.0  # 連打抑止は測定対象外
+
+    source = FakeBackend()
+    listener = skl.HotkeyListener(backend=source)
+    listener._table = (None, skl.compile_shortcut({"title": "bench", "hotkey": "ctrl+f1", "value": "true"}))
+
+    samples: list[float] = []
+    reached = threading.Event()
+
+    def _enqueue(sc: skl.CompiledShortcut, received_at=None) -> None:
+        samples.append(time.perf_counter() - source.last_event_at)
+        reached.set()
+
+    listener._enqueue = _enqueue  # 実行はせず到達時刻だけ記録
+
+    th = threading.Thread(target=listener.run_message_loop, args=(lambda: None,), daemon=True)
+    th.start()
+
+    for _ in range(n):
+        reached.clear()
+        source.inject_hotkey(1)
+        reached.wait(1.0)
+        time.sleep(0.0005)  # 待機中のループを毎回起こす（連続投入で詰めない）
+
+    source.post_stop()
+    th.join(timeout=1.0)
+    listener.stop()
+
+    samples.sort()
+    print(f"events={len(samples)}")
+    print(f"p50={percentile(samples, 0.50) * 1e6:.1f}us  p99={percentile(samples, 0.99) * 1e6:.1f}us  "
+          f"max={samples[-1] * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
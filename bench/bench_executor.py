@@ -0,0 +1,84 @@
+# bench_executor.py
+# -*- coding: utf-8 -*-
+"""
+実行プールのストレステスト（Linux でも動く）。
+
+HotkeyListener._enqueue に大量の合成トリガーを投げ、
+  - スループット（件/秒）
+  - ショートカット間の公平性（完了件数の Jain 指数 / 最小・最大）
+  - キュー深さ・待ち時間・破棄件数
+を表示する。アクションは実行せず、指定時間 sleep するだけのダミー。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_executor.py [トリガー数] [ショートカット数] [1件の実行時間ms]
+"""
+from __future__ import annotations
+
+import collections
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+
+
+def jain_index(values: list[int]) -> float:
+    if not values or not any(values):
+        return 0.0
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values))
+
+
+def main() -> None:
+    triggers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_shortcuts = max(2, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
+    work_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+    skl.DEBOUNCE_SEC = 0.0  # 連打抑止は測定対象外
+    skl.EXECUTOR_MAX_QUEUE = triggers  # 破棄せず全件流して公平性を見る
+
+    done: collections.Counter[str] = collections.Counter()
+    lock = threading.Lock()
+
+    def fake_execute(sc: skl.CompiledShortcut, trace=None) -> None:
+        time.sleep(work_ms / 1000.0)
+        with lock:
+            done[sc.id] += 1
+
+    listener = skl.HotkeyListener(execute_fn=fake_execute)
+    shortcuts = [
+        skl.compile_shortcut({"id": str(i), "title": f"sc{i}", "hotkey": f"ctrl+f{i % 24 + 1}", "max_concurrency": 2, "value": "true"})
+        for i in range(n_shortcuts)
+    ]
+
+    # 1つのショートカットだけ極端に連打される状況（半分がホットスポット）
+    t0 = time.perf_counter()
+    for i in range(triggers):
+        sc = shortcuts[0] if i % 2 == 0 else shortcuts[1 + (i // 2) % (n_shortcuts - 1)]
+        listener._enqueue(sc)
+    submit_sec = time.perf_counter() - t0
+
+    ex = listener.executor
+    # 途中経過: ホットスポット以外が先に捌けているか（公平性）
+    while ex.stats()["completed"] < triggers // 4:
+        time.sleep(0.001)
+    with lock:
+        early = [done[sc.id] for sc in shortcuts[1:]]
+    while ex.stats()["queue_depth"] or ex.stats()["running"]:
+        time.sleep(0.001)
+    total_sec = time.perf_counter() - t0
+    listener.stop()
+
+    st = ex.stats()
+    print(f"triggers={triggers} shortcuts={n_shortcuts} workers={skl.EXECUTOR_WORKERS} work={work_ms}ms")
+    print(f"submit: {triggers / submit_sec:,.0f} triggers/s")
+    print(f"throughput: {st['completed'] / total_sec:,.0f} jobs/s  (completed={st['completed']})")
+    print(f"fairness(non-hotspot, first 25%): jain={jain_index(early):.3f} min={min(early)} max={max(early)}")
+    print(f"hotspot done={done[shortcuts[0].id]}  wait avg={st['wait_ms_avg']:.1f}ms max={st['wait_ms_max']:.1f}ms")
+    print(f"rejected={st['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
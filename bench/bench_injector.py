@@ -0,0 +1,74 @@
+# bench_injector.py
+# -*- coding: utf-8 -*-
+"""
+長い文字列を打つときの文字/秒を測る（FakeInjector なので Linux でも動く。OS 側の処理時間は含まず、
+イベント列を受け取って貯めるまでのこちら側の手間だけを比べる）。
+
+  - compile:   compile_text() で文字列 -> キーイベント列にする速さ（設定の読み込み時に1回だけ）
+  - batched:   send() 1回でまとめて送る（action_type "type_text" の既定）
+  - per-char:  1文字ずつ send() する（以前の GUI の keybd_event ループと同じ呼び方）
+  - paced:     pace_ms / chunk を付けたとき（待ち時間が支配的になる。理論値と並べて表示）
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_injector.py [文字数]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "common"))
+
+import injector  # noqa: E402
+from injector import FakeInjector  # noqa: E402
+
+SAMPLE = "The quick brown fox jumps over the lazy dog. ありがとう 👍\n"
+
+
+def make_text(n: int) -> str:
+    return (SAMPLE * (n // len(SAMPLE) + 1))[:n]
+
+
+def rate(label: str, chars: int, sec: float, calls: int) -> None:
+    print(f"  {label:10s} {chars / sec:14,.0f} chars/s  {sec * 1000:9.2f} ms  calls={calls:,}")
+
+
+def main() -> None:
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [10_000, 100_000]
+
+    for n in sizes:
+        text = make_text(n)
+        print(f"{n:,} chars")
+
+        t0 = time.perf_counter()
+        events = injector.compile_text(text)
+        rate("compile", n, time.perf_counter() - t0, 0)
+
+        inj = FakeInjector()
+        t0 = time.perf_counter()
+        inj.send(events)
+        rate("batched", n, time.perf_counter() - t0, inj.calls)
+
+        per_char = [injector.compile_text(ch) for ch in text]
+        inj = FakeInjector()
+        t0 = time.perf_counter()
+        for evs in per_char:
+            inj.send(evs)
+        rate("per-char", n, time.perf_counter() - t0, inj.calls)
+
+    # 待ち時間の分だけ遅くなる: 約 2000打鍵 / chunk 50打鍵 = 約40回、間の待ち ほぼ 40 * 1 ms
+    n, pace_ms, chunk = 2_000, 1.0, 50
+    events = injector.compile_text(make_text(n))
+    inj = FakeInjector(keep=False)
+    t0 = time.perf_counter()
+    inj.send(events, pace_sec=pace_ms / 1000.0, chunk=chunk)
+    sec = time.perf_counter() - t0
+    ideal = (inj.calls - 1) * pace_ms / 1000.0
+    print(f"{n:,} chars, pace_ms={pace_ms:g} chunk={chunk}")
+    rate("paced", n, sec, inj.calls)
+    print(f"  {'ideal':10s} {n / ideal:14,.0f} chars/s  {ideal * 1000:9.2f} ms  (sleep only)")
+
+
+if __name__ == "__main__":
+    main()
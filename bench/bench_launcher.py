@@ -0,0 +1,65 @@
+# bench_launcher.py
+# -*- coding: utf-8 -*-
+"""
+launcher の直接起動（exec）とシェル経由（shell）の起動遅延を比べる。
+
+何もしない実行ファイル（Linux では /bin/true、Windows では where.exe /?）を起動し、
+  - spawn: Popen が戻るまで（実行ファイルの exec 完了まで）
+  - exit:  子プロセスが終了するまで（シェル経由ならシェル自体の起動・終了も含む）
+の p50 / p99 を表示する。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_launcher.py [回数]
+"""
+from __future__ import annotations
+
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "common"))
+
+import launcher  # noqa: E402
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def measure(spec: launcher.LaunchSpec, n: int) -> tuple[list[float], list[float]]:
+    spawn_ms: list[float] = []
+    exit_ms: list[float] = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        proc = launcher.spawn(spec)
+        t1 = time.perf_counter()
+        proc.wait()
+        t2 = time.perf_counter()
+        spawn_ms.append((t1 - t0) * 1000)
+        exit_ms.append((t2 - t0) * 1000)
+    return sorted(spawn_ms), sorted(exit_ms)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    if launcher.IS_WINDOWS:
+        noop = '"{}" /?'.format(shutil.which("where.exe") or "where.exe")
+    else:
+        noop = shutil.which("true") or "/bin/true"
+
+    specs = {
+        "exec": launcher.parse_command(noop),
+        "shell": launcher.parse_command(noop, shell=True),
+    }
+    print(f"command={noop!r} n={n}")
+    for name, spec in specs.items():
+        spawn_ms, exit_ms = measure(spec, n)
+        print(
+            f"{name:>5}: spawn p50={percentile(spawn_ms, 0.5):6.2f}ms p99={percentile(spawn_ms, 0.99):6.2f}ms"
+            f" | exit p50={percentile(exit_ms, 0.5):6.2f}ms p99={percentile(exit_ms, 0.99):6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
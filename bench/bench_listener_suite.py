@@ -0,0 +1,129 @@
+# bench_listener_suite.py
+# -*- coding: utf-8 -*-
+"""
+HotkeyListener を FakeBackend で動かすベンチマーク一式（Linux でも動く / OS のホットキーには触らない）。
+
+  dispatch: 登録済みのキー押下を大量に再生し、メッセージループ → 実行キュー投入までのスループット
+  reload:   10 / 1k / 10k 件の登録（初回・変更なし・1%変更）にかかる時間
+  memory:   設定の読み込み〜登録後にリスナーが保持するメモリ（1ショートカットあたり）
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_listener_suite.py [dispatch|reload|memory ...]
+"""
+from __future__ import annotations
+
+import itertools
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+
+MODS = ["ctrl+", "alt+", "shift+", "ctrl+alt+", "ctrl+shift+", "alt+shift+", "win+", "ctrl+win+"]
+KEYS = [f"f{i}" for i in range(1, 25)] + [chr(c) for c in range(ord("a"), ord("z") + 1)]
+RELOAD_SIZES = (10, 1_000, 10_000)
+
+
+def make_raw(n: int) -> list[dict]:
+    combos = itertools.cycle(m + k for m in MODS for k in KEYS)
+    exe = "notepad.exe" if sys.platform == "win32" else "true"
+    return [
+        {"id": f"{i:08x}", "title": f"Shortcut {i}", "hotkey": next(combos),
+         "action_type": "run_cmd", "value": f"{exe} work/file{i}.txt"}
+        for i in range(n)
+    ]
+
+
+def make_compiled(raw: list[dict]) -> list[skl.CompiledShortcut]:
+    # 実在するキーの組み合わせは数百通りしかないので、vk をずらして全件別の登録にする
+    # （FakeBackend は OS に登録しないので実在しない vk でもよい）。同じキーを読み込み時に外す compile_config は
+    # 通せないので1件ずつコンパイルする（設定ファイルからの読み込みは bench_shortcut_table.py / check_config_shards.py）
+    return [skl.compile_shortcut(sc)._replace(vk=0x100 + i) for i, sc in enumerate(raw)]
+
+
+def bench_dispatch(n_events: int = 200_000, n_shortcuts: int = 100) -> None:
+    skl.DEBOUNCE_SEC = 0.0  # 連打抑止は測定対象外
+    skl.EXECUTOR_MAX_QUEUE = n_events
+
+    done = 0
+
+    def noop_execute(sc: skl.CompiledShortcut, trace=None) -> None:
+        nonlocal done
+        done += 1
+
+    backend = FakeBackend()
+    listener = skl.HotkeyListener(execute_fn=noop_execute, backend=backend)
+    shortcuts = make_compiled(make_raw(n_shortcuts))
+    listener.register_shortcuts(shortcuts)
+
+    bindings = [sc.binding for sc in shortcuts]
+    backend.replay(((0.0, bindings[i % n_shortcuts]) for i in range(n_events)))
+    backend.post_stop()
+
+    t0 = time.perf_counter()
+    listener.run_message_loop()
+    elapsed = time.perf_counter() - t0
+    listener.executor.shutdown(wait=True)
+
+    print(f"[dispatch] events={n_events} shortcuts={n_shortcuts}")
+    print(f"  {n_events / elapsed:,.0f} events/s  ({elapsed / n_events * 1e6:.2f} us/event, "
+          f"submitted={listener.executor.submitted} executed={done})")
+
+
+def bench_reload() -> None:
+    print("[reload] compile = 設定 dict -> CompiledShortcut / register = バックエンドへの差分反映")
+    for n in RELOAD_SIZES:
+        raw = make_raw(n)
+        t0 = time.perf_counter()
+        compiled = make_compiled(raw)
+        compile_ms = (time.perf_counter() - t0) * 1000
+
+        backend = FakeBackend()
+        listener = skl.HotkeyListener(backend=backend)
+        first = listener.register_shortcuts(compiled)
+        same = listener.register_shortcuts(make_compiled(raw))
+
+        changed_raw = make_raw(n)
+        for sc in changed_raw[: max(1, n // 100)]:
+            sc["title"] += " (changed)"
+        changed = listener.register_shortcuts(make_compiled(changed_raw))
+        listener.stop()
+
+        print(f"  n={n:>6}: compile={compile_ms:8.2f} ms  register: first={first.elapsed_ms:8.2f} ms"
+              f"  unchanged={same.elapsed_ms:8.2f} ms  1%changed={changed.elapsed_ms:8.2f} ms"
+              f"  (backend calls={backend.register_calls})")
+
+
+def bench_memory(n: int = 10_000) -> None:
+    raw = make_raw(n)
+    backend = FakeBackend()
+    listener = skl.HotkeyListener(backend=backend)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    listener.register_shortcuts(make_compiled(raw))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    listener.stop()
+
+    print(f"[memory] n={n}: {(after - before) / n:,.1f} B/shortcut (レコード + 登録テーブル + FakeBackend の登録表)")
+
+
+SUITES = {"dispatch": bench_dispatch, "reload": bench_reload, "memory": bench_memory}
+
+
+def main() -> None:
+    names = sys.argv[1:] or list(SUITES)
+    for name in names:
+        if name not in SUITES:
+            raise SystemExit(f"unknown suite: {name!r} (choose from {', '.join(SUITES)})")
+    for name in names:
+        SUITES[name]()
+
+
+if __name__ == "__main__":
+    main()
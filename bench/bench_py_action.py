@@ -0,0 +1,100 @@
+# bench_py_action.py
+# -*- coding: utf-8 -*-
+"""
+トリガーから完了までの時間を action_type "python" と run_cmd で比べる（Linux でも動く）。
+
+どちらもリスナーの _enqueue -> 実行プール -> handler を通す。
+  - python:  関数が戻るまで（タイムスタンプをファイルへ書く関数）
+  - run_cmd: 子プロセスの起動（Popen が戻る）まで / 子プロセスが終了するまで
+            （何もしない実行ファイル。Linux では /bin/true、Windows では where.exe /?）
+の p50 / p99 を表示する。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_py_action.py [回数]
+"""
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+import launcher  # noqa: E402
+import py_action  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+from _check import compile_config  # noqa: E402
+
+MODULE = """
+import time
+
+def write_timestamp(path):
+    with open(path, "w") as f:
+        f.write(str(time.time()))
+"""
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    tmp = tempfile.mkdtemp(prefix="bench_py_action_")
+    (Path(tmp) / "bench_actions.py").write_text(MODULE)
+    py_action.add_search_path(tmp)
+
+    if launcher.IS_WINDOWS:
+        noop = '"{}" /?'.format(shutil.which("where.exe") or "where.exe")
+    else:
+        noop = shutil.which("true") or "/bin/true"
+
+    results: dict[str, list[float]] = {"python": [], "run_cmd spawn": [], "run_cmd exit": []}
+    done = threading.Event()
+    started: list[float] = [0.0]
+
+    def timed_execute(sc, trace=None) -> None:
+        """実行プールのワーカーで handler と同じ処理をして、トリガーからの時間を記録する"""
+        if sc.action_type == py_action.ACTION_TYPE:
+            sc.handler(sc)
+            results["python"].append((time.perf_counter() - started[0]) * 1000)
+        else:
+            proc = launcher.spawn(sc.target)
+            results["run_cmd spawn"].append((time.perf_counter() - started[0]) * 1000)
+            proc.wait()
+            results["run_cmd exit"].append((time.perf_counter() - started[0]) * 1000)
+        done.set()
+
+    skl.DEBOUNCE_SEC = 0.0
+    listener = skl.HotkeyListener(execute_fn=timed_execute, backend=FakeBackend())
+    listener.register_shortcuts(compile_config([
+        {"id": "py", "hotkey": "ctrl+f1", "action_type": "python",
+         "value": "bench_actions:write_timestamp", "args": [str(Path(tmp) / "stamp.txt")]},
+        {"id": "cmd", "hotkey": "ctrl+f2", "action_type": "run_cmd", "value": noop},
+    ]))
+
+    for sid in ("py", "cmd"):
+        for _ in range(n):
+            done.clear()
+            started[0] = time.perf_counter()
+            listener.trigger_by_id(sid)
+            done.wait(10.0)
+
+    print(f"trigger -> completion, n={n}")
+    for name, values in results.items():
+        v = sorted(values)
+        print(f"  {name:14s} p50={percentile(v, 0.50):8.3f} ms  p99={percentile(v, 0.99):8.3f} ms")
+    py50 = percentile(sorted(results["python"]), 0.5)
+    cmd50 = percentile(sorted(results["run_cmd exit"]), 0.5)
+    print(f"  python is {cmd50 / py50:,.0f}x faster than run_cmd (p50, to completion)")
+
+    listener.stop()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# bench_shortcut_table.py
+# -*- coding: utf-8 -*-
+"""
+事前コンパイル済みテーブル（CompiledShortcut）と、従来の dict 経路の比較（Linux でも動く）。
+
+  - メモリ: 設定 JSON を読み込んで保持用の構造を作り、読み込み結果を捨てた後に残る量（tracemalloc）
+    事前コンパイルはリスナーと同じ経路（ConfigSetReader → compile_config。shard 毎のキャッシュと衝突の除外込み）で、
+    キャッシュが持ち続ける分も数に入る
+  - 読み込み: 初回（キャッシュが空）の時間
+  - 発火時: 登録ID → ショートカット取得 → アクション引数の組み立て までの時間
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_shortcut_table.py [件数]
+"""
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from config_store import ConfigSetReader, write_config  # noqa: E402
+
+KEYS = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def make_hotkey(i: int) -> str:
+    """"ctrl+alt+f13, a, b" 形式の3ストローク（衝突として外されないよう全部違うものにする）"""
+    a, b = divmod(i // 12, len(KEYS))
+    return f"ctrl+alt+f{13 + i % 12}, {KEYS[a % len(KEYS)]}, {KEYS[b]}"
+
+
+def make_config(n: int) -> list[dict]:
+    exe = "notepad.exe" if sys.platform == "win32" else "true"  # 実在する実行ファイル（PATH 解決の警告を出さない）
+    out = []
+    for i in range(n):
+        if i % 2:
+            action_type, value = "open_url", f"https://example.com/page/{i}"
+        else:
+            action_type, value = "run_cmd", f"{exe} work/file{i}.txt"
+        out.append({
+            "id": f"{i:08x}",
+            "title": f"Shortcut {i}",
+            "hotkey": make_hotkey(i),
+            "action_type": action_type,
+            "value": value,
+        })
+    return out
+
+
+# ---- 従来の dict 経路（比較用に当時の処理を再現） ----
+def legacy_load(raw: list[dict]) -> list[dict]:
+    out: list[dict] = []
+    for sc in raw:
+        hk = (sc.get("hotkey") or "").strip().lower()
+        if not hk:
+            continue
+        item = dict(sc)
+        item["hotkey"] = hk
+        out.append(item)
+    return out
+
+
+def legacy_fire(lock: threading.RLock, id_to_sc: dict[int, dict], hid: int) -> tuple:
+    with lock:
+        sc = id_to_sc.get(hid)
+    title = sc.get("title", "")
+    hotkey = sc.get("hotkey", "")
+    action_type = sc.get("action_type", "run_cmd")
+    value = sc.get("value", "")
+    if action_type == "open_url":
+        return (f'start "" "{value}"', title, hotkey)
+    return (value, title, hotkey)
+
+
+def compiled_fire(table: tuple, hid: int) -> tuple:
+    sc = table[hid]
+    return (sc.target, sc.title, sc.hotkey)
+
+
+def compiled_load(path: Path) -> list:
+    """リスナーの load_shortcuts() と同じ経路"""
+    return skl.compile_config(ConfigSetReader(path).load())
+
+
+def measure_retained(build):
+    """設定ファイル → 保持用の構造。途中の結果は捨て、残った分だけを数える"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    raw = make_config(n)
+    tmp = Path(tempfile.mkdtemp(prefix="bench_shortcut_table_"))
+    try:
+        path = tmp / "shortcut_config.json"
+        write_config(path, raw)
+
+        legacy, legacy_bytes = measure_retained(
+            lambda: legacy_load(json.loads(path.read_text(encoding="utf-8"))["shortcuts"]))
+        compiled, compiled_bytes = measure_retained(lambda: compiled_load(path))
+
+        t0 = time.perf_counter()
+        legacy_load(json.loads(path.read_text(encoding="utf-8"))["shortcuts"])
+        legacy_load_ms = (time.perf_counter() - t0) * 1000
+        skl._compiled_shards.clear()   # 初回の読み込みを測る
+        t0 = time.perf_counter()
+        compiled_load(path)
+        compile_ms = (time.perf_counter() - t0) * 1000
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    lock = threading.RLock()
+    id_to_sc = {i + 1: sc for i, sc in enumerate(legacy)}
+    table = (None, *compiled)
+
+    rounds = 5
+    hids = list(range(1, n + 1))
+    best_legacy = best_compiled = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for hid in hids:
+            legacy_fire(lock, id_to_sc, hid)
+        best_legacy = min(best_legacy, time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        for hid in hids:
+            compiled_fire(table, hid)
+        best_compiled = min(best_compiled, time.perf_counter() - t0)
+
+    print(f"shortcuts={n}")
+    print(f"memory   dict={legacy_bytes / n:7.1f} B/shortcut  compiled={compiled_bytes / n:7.1f} B/shortcut")
+    print(f"load     dict={legacy_load_ms:7.2f} ms            compiled={compile_ms:7.2f} ms (JSON の解析 / parse_hotkey / 衝突の検出込み)")
+    print(f"fire     dict={best_legacy / n * 1e9:7.1f} ns/trigger   compiled={best_compiled / n * 1e9:7.1f} ns/trigger")
+
+
+if __name__ == "__main__":
+    main()
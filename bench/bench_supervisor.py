@@ -0,0 +1,85 @@
+# bench_supervisor.py
+# -*- coding: utf-8 -*-
+"""
+子プロセス監視（ProcessSupervisor）の確認（Linux / macOS）。
+
+  1. 短命な子プロセスを大量に起動し、全部回収されてゾンビが残らないこと
+  2. timeout_sec を過ぎた子（シェル経由の孫も含む）が kill されること
+  3. 生存数の上限を超えた起動が拒否されること
+を確認し、所要時間と stats() を表示する。問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_supervisor.py [子プロセス数]
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "common"))
+
+import launcher  # noqa: E402
+from supervisor import ProcessSupervisor  # noqa: E402
+from _check import Checks, wait_until  # noqa: E402
+
+
+def leftover_children() -> bool:
+    """このプロセスの子でまだ回収されていないもの（実行中 / ゾンビ）があるか"""
+    try:
+        os.waitpid(-1, os.WNOHANG)
+    except ChildProcessError:
+        return False  # 子が1つも無い
+    return True
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    check = Checks()
+    true_spec = launcher.parse_command(shutil.which("true") or "/bin/true")
+
+    # 1. 大量の短命な子
+    sup = ProcessSupervisor(max_children=64)
+    t0 = time.perf_counter()
+    started = 0
+    while started < n:
+        if sup.spawn(true_spec, key="true") is not None:
+            started += 1
+        else:
+            time.sleep(0.001)  # 上限に当たったら少し待つ
+    reaped_all = wait_until(lambda: sup.live_count() == 0, 10.0)
+    elapsed = time.perf_counter() - t0
+    st = sup.stats()
+    print(f"[1] spawned={started} in {elapsed * 1000:.0f}ms  stats={st}")
+    if not reaped_all or st["reaped"] != n or leftover_children():
+        check.fail("children left over")
+
+    # 2. タイムアウト（シェル経由の sleep を孫ごと止める）
+    sleep_spec = launcher.parse_command("sleep 30 & sleep 30; wait", shell=True)
+    for _ in range(20):
+        sup.spawn(sleep_spec, key="sleep", timeout_sec=0.2)
+    killed = wait_until(lambda: sup.live_count() == 0, 5.0)
+    st = sup.stats()
+    print(f"[2] killed_timeout={st['killed_timeout']} live={st['live']}")
+    if not killed or st["killed_timeout"] != 20:
+        check.fail("timeout not enforced")
+
+    # 3. 生存数の上限
+    cap = ProcessSupervisor(max_children=8)
+    long_spec = launcher.parse_command("sleep 30")
+    results = [cap.spawn(long_spec, key="long", timeout_sec=0.3) for _ in range(20)]
+    st = cap.stats()
+    print(f"[3] started={sum(r is not None for r in results)} rejected_cap={st['rejected_cap']}")
+    if st["rejected_cap"] != 12:
+        check.fail("cap not enforced")
+    wait_until(lambda: cap.live_count() == 0, 5.0)
+
+    if leftover_children():
+        check.fail("children left over at exit")
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
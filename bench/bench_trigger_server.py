@@ -0,0 +1,85 @@
+# bench_trigger_server.py
+# -*- coding: utf-8 -*-
+"""
+IPC トリガーサーバー経由の持続スループットを測る（Linux でも動く）。
+
+FakeBackend + 何もしない実行関数の HotkeyListener に TriggerServer を立て、
+TriggerClient からバッチサイズを変えて id 指定の発火を送り続ける。
+発火はホットキーと同じ HotkeyListener._enqueue を通る。
+  - triggers/s: 全 ack を受け取るまでの持続スループット
+  - dispatch:   ack に入っているサーバー側の受信 → 実行キュー投入までの時間（p50 / p99）
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_trigger_server.py [発火回数]
+"""
+from __future__ import annotations
+
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+from trigger_server import TriggerClient, TriggerServer  # noqa: E402
+
+N_SHORTCUTS = 50
+BATCH_SIZES = (1, 16, 256)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def run(address: str, listener: skl.HotkeyListener, ids: list[str], n: int, batch: int) -> None:
+    server = TriggerServer(address, listener.trigger_by_id)
+    server.start()
+    client = TriggerClient(server.address)
+    try:
+        batches = [[ids[j % len(ids)] for j in range(i, min(n, i + batch))] for i in range(0, n, batch)]
+        t0 = time.perf_counter()
+        acks = client.fire_many(batches)
+        elapsed = time.perf_counter() - t0
+    finally:
+        client.close()
+        server.stop()
+
+    results = [r for ack in acks for r in ack]
+    ok = sum(1 for r in results if r["ok"])
+    dispatch = sorted(r["dispatch_us"] for r in results)
+    kind = server.address.split(":", 1)[0]
+    print(f"{kind:>4} batch={batch:>4}: {len(results) / elapsed:>10,.0f} triggers/s  ok={ok}/{len(results)}"
+          f"  dispatch p50={percentile(dispatch, 0.5):7.1f}us p99={percentile(dispatch, 0.99):7.1f}us")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    skl.DEBOUNCE_SEC = 0.0  # 連打抑止は測定対象外
+    skl.EXECUTOR_MAX_QUEUE = n
+
+    listener = skl.HotkeyListener(execute_fn=lambda sc, trace=None: None, backend=FakeBackend())
+    exe = "notepad.exe" if sys.platform == "win32" else "true"
+    listener.register_shortcuts([
+        skl.compile_shortcut({"id": f"sc{i}", "title": f"sc{i}", "hotkey": f"{('ctrl', 'alt', 'shift')[i // 24]}+f{i % 24 + 1}",
+                              "value": exe})
+        for i in range(N_SHORTCUTS)
+    ])
+    ids = [f"sc{i}" for i in range(N_SHORTCUTS)]
+
+    addresses = ["tcp://127.0.0.1:0"]
+    if hasattr(socket, "AF_UNIX"):
+        addresses.append("unix://" + os.path.join(tempfile.mkdtemp(), "skl.sock"))
+
+    print(f"triggers={n} shortcuts={N_SHORTCUTS}")
+    for address in addresses:
+        for batch in BATCH_SIZES:
+            run(address, listener, ids, n, batch)
+    listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench_webui_editor.py
+# -*- coding: utf-8 -*-
+"""
+ショートカット一覧の描画時間を 10 / 1k / 10k 件で測る（streamlit が必要）。
+
+streamlit.testing の AppTest でページを再実行し（入力1回分の再実行に相当）、
+  - form:  フォーム表示（1ページ 25 件の expander）
+  - table: 表での一括編集（1ページ 100 件の data_editor）
+の1回あたりの時間と、セッションに残るキーの数を表示する。
+--baseline に別の WebUI スクリプト（例: 変更前のもの）を渡すと、同じ設定でその全件描画も測る
+（BASELINE_MAX 件まで。全件の expander を作る描画は 10k 件だと1回に何分もかかる）。
+設定は一時ディレクトリの config/shortcut_config.json に作る（衝突しないホットキー）。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_webui_editor.py [回数] [--baseline 変更前の shortcut_key_setting_webui.py]
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from streamlit.testing.v1 import AppTest
+
+WEBUI = Path(__file__).resolve().parents[1] / "app" / "key_setting" / "shortcut_key_setting_webui.py"
+SIZES = (10, 1_000, 10_000)
+KEYS = "abcdefghijklmnopqrstuvwxyz0123456789"
+TYPES = ("open_url", "run_cmd", "python", "type_text")
+BASELINE_MAX = 1_000
+
+
+def make_config(path: Path, n: int) -> None:
+    """n 件。ホットキーは "ctrl+alt+f13, a, b" 形式の3ストロークで全部違う（先頭一致もしない）"""
+    shortcuts = []
+    for i in range(n):
+        a, b = divmod(i // 12, len(KEYS))
+        shortcuts.append({
+            "id": f"sc{i:05d}",
+            "title": f"Shortcut {i}",
+            "hotkey": f"ctrl+alt+f{13 + i % 12}, {KEYS[a % len(KEYS)]}, {KEYS[b]}",
+            "action_type": TYPES[i % len(TYPES)],
+            "value": f"value {i}",
+        })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"shortcuts": shortcuts}), encoding="utf-8")
+
+
+def time_runs(script: Path, runs: int, state: Optional[dict] = None) -> tuple[float, int]:
+    """1回あたりの ms とセッションのキー数"""
+    at = AppTest.from_file(str(script), default_timeout=600)
+    for k, v in (state or {}).items():
+        at.session_state[k] = v
+    at.run()   # 初回（設定の読み込みを含む）
+    if at.exception:
+        raise SystemExit(f"script failed: {at.exception}")
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        at.run()
+    ms = (time.perf_counter() - t0) * 1000.0 / runs
+    return ms, len(at.session_state.filtered_state)
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    baseline = None
+    if "--baseline" in args:
+        i = args.index("--baseline")
+        baseline = Path(args[i + 1]).resolve()
+        del args[i:i + 2]
+    runs = int(args[0]) if args else 5
+
+    sys.path.insert(0, str(WEBUI.parent))
+    cwd = os.getcwd()
+    tmp = tempfile.mkdtemp(prefix="bench_webui_editor_")
+    os.chdir(tmp)   # WebUI は ./config/shortcut_config.json を読む
+    try:
+        print(f"rerun time per interaction (runs={runs})")
+        for n in SIZES:
+            make_config(Path(tmp) / "config" / "shortcut_config.json", n)
+            rows = [
+                ("form", *time_runs(WEBUI, runs)),
+                ("table", *time_runs(WEBUI, runs, {"editor_mode": "表（一括編集）", "editor_page_size": 100})),
+            ]
+            if baseline is not None and n <= BASELINE_MAX:
+                rows.append(("baseline", *time_runs(baseline, runs)))
+            for name, ms, keys in rows:
+                print(f"  {n:>6,} shortcuts  {name:8s} {ms:10.1f} ms  session keys={keys:,}")
+            sys.stdout.flush()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# bench_webui_idle.py
+# -*- coding: utf-8 -*-
+"""
+WebUI を開いたまま何も操作していないタブ1つあたりのサーバー CPU を見積もる（streamlit が必要）。
+
+監視中の WebUI は一定間隔で画面を更新する。その1回あたりの CPU 時間を streamlit.testing の AppTest で測り、
+  - 以前:  ページ全体を再実行（CSS / 全ショートカットの expander / 全ウィジェット）を 0.5 秒毎
+  - 現在:  「常駐監視」の status_panel() だけを STATUS_REFRESH_SEC 毎（監視していない間は更新なし）
+の CPU ms/秒 と、タブ数を掛けたコア使用率を表示する。
+ショートカットは config/shortcut_config.json のもの（無ければ初期値）。
+
+実行方法（リポジトリルートで実行）:
+  python bench/bench_webui_idle.py [回数] [タブ数]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+WEBUI = Path(__file__).resolve().parents[1] / "app" / "key_setting" / "shortcut_key_setting_webui.py"
+sys.path.insert(0, str(WEBUI.parent))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+OLD_REFRESH_SEC = 0.5   # 以前の soft_autorefresh(0.5)
+RUNNING = {"state": "running", "msg": "監視中: (bench)", "triggers": 3, "last": "12:00:00  ctrl+f1  bench"}
+
+
+def _panel_script() -> None:
+    import shortcut_key_setting_webui as webui  # 初回の実行でだけページ全体が走る（2回目以降は import 済み）
+
+    webui.status_panel()
+
+
+def cpu_per_run(at: AppTest, n: int) -> float:
+    """at.run() 1回あたりの CPU ms（AppTest は同じプロセスのスレッドで実行するので process_time で測れる）"""
+    at.run()   # ウォームアップ（import / 初回の設定読み込み）
+    at.session_state["listener_status"] = dict(RUNNING)
+    at.session_state["status_shown"] = "running"
+    at.run()
+    if at.exception:
+        raise SystemExit(f"script failed: {at.exception}")
+    t0 = time.process_time()
+    for _ in range(n):
+        at.run()
+    return (time.process_time() - t0) * 1000.0 / n
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    tabs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    full_ms = cpu_per_run(AppTest.from_file(str(WEBUI), default_timeout=60), n)
+    panel_ms = cpu_per_run(AppTest.from_function(_panel_script, default_timeout=60), n)
+    from shortcut_key_setting_webui import STATUS_REFRESH_SEC as refresh_sec  # _panel_script が import 済み
+
+    before = full_ms / OLD_REFRESH_SEC
+    after = panel_ms / refresh_sec
+    print(f"CPU per refresh, n={n}")
+    print(f"  full script rerun  {full_ms:8.2f} ms")
+    print(f"  status fragment    {panel_ms:8.2f} ms")
+    print(f"idle tab while listening (CPU ms per second, {tabs} tabs = % of one core)")
+    print(f"  before  {before:8.2f} ms/s  {before * tabs / 10:6.1f} %")
+    print(f"  after   {after:8.2f} ms/s  {after * tabs / 10:6.1f} %")
+    print("idle tab while stopped: 0 ms/s (no refresh)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# check_chords.py
+# -*- coding: utf-8 -*-
+"""
+複数ストロークのホットキー（"ctrl+k, ctrl+c"）を FakeBackend のキー入力で確認する。
+
+  1. 読み込み時の衝突（重複 / 一方が他方の先頭）を見つけて、後に書いた方を登録しないこと
+  2. 1打目だけが常に登録され、続きのキーは途中まで押されている間だけ登録されること
+  3. 2打 / 3打の列、1打のホットキーとの混在、途中で違うキーが来たときの見直し
+  4. 待ち時間切れで最初に戻り、続きのキーの登録が外れること
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_chords.py
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+from _check import Checks, wait_until  # noqa: E402
+
+CONFIG = [
+    {"id": "a", "hotkey": "ctrl+f1"},
+    {"id": "b", "hotkey": "ctrl+k, ctrl+c"},
+    {"id": "c", "hotkey": "ctrl+k, ctrl+d"},
+    {"id": "d", "hotkey": "ctrl+k, ctrl+x, ctrl+y"},
+    {"id": "e", "hotkey": "ctrl+c"},                  # 列の2打目と同じだが衝突ではない
+    {"id": "x1", "hotkey": "ctrl+k"},                 # is_prefix
+    {"id": "x2", "hotkey": "ctrl+f1, ctrl+g"},        # has_prefix
+    {"id": "x3", "hotkey": "ctrl+k, ctrl+c"},         # duplicate
+    {"id": "x4", "hotkey": "ctrl+k, ctrl+x"},         # is_prefix
+]
+
+
+def main() -> int:
+    skl.DEBOUNCE_SEC = 0.0
+    skl.CHORD_TIMEOUT_SEC = 0.2
+    check = Checks()
+
+    ran: list[str] = []
+    backend = FakeBackend()
+    listener = skl.HotkeyListener(execute_fn=lambda sc, trace=None: ran.append(sc.id), backend=backend)
+    # 衝突は登録側（register_shortcuts）で見つけることを確かめるので、読み込み時の除外（compile_config）は通さない
+    shortcuts = [skl.compile_shortcut(dict(sc, value="true")) for sc in CONFIG]
+    stats = listener.register_shortcuts(shortcuts)
+    check("conflicts found at load", stats.conflicts == 4, f"conflicts={stats.conflicts}")
+
+    k = skl.parse_hotkey("ctrl+k")
+    c, d, x, y = (skl.parse_hotkey(f"ctrl+{ch}") for ch in "cdxy")
+    f1 = skl.parse_hotkey("ctrl+f1")
+    registered = lambda: set(backend.registered.values())  # noqa: E731
+    check("only first strokes registered", registered() == {f1, k, c}, f"{len(registered())} bindings")
+
+    th = threading.Thread(target=listener.run_message_loop, daemon=True)
+    th.start()
+
+    def press(*strokes: tuple[int, int]) -> bool:
+        """続きのキーが登録されるのを待ってから押す（人の打鍵と同じ順序）"""
+        for s in strokes:
+            if not wait_until(lambda: s in registered(), 1.0, interval=0.002):
+                return False
+            backend.press(*s)
+        return True
+
+    def run(label: str, strokes: list[tuple[int, int]], want: list[str]) -> None:
+        ran.clear()
+        pressed = press(*strokes)
+        got = (wait_until(lambda: len(ran) >= len(want), 1.0, interval=0.002)
+               and wait_until(lambda: not listener._chord_grabs, 1.0, interval=0.002))
+        check(label, pressed and got and ran == want, f"ran={ran}")
+
+    run("two strokes", [k, c], ["b"])
+    run("single hotkey that is also a second stroke", [c], ["e"])
+    run("three strokes", [k, x, y], ["d"])
+    run("other key mid-sequence is re-read as a first stroke", [k, f1], ["a"])
+
+    # 待ち時間切れ
+    ran.clear()
+    press(k)
+    grabbed = wait_until(lambda: d in registered(), 1.0, interval=0.002)
+    released = wait_until(lambda: d not in registered(), 1.0, interval=0.002)
+    unmatched = backend.unmatched
+    backend.press(*d)
+    time.sleep(0.05)
+    check("timeout releases the grabbed keys", grabbed and released and ran == []
+          and backend.unmatched == unmatched + 1 and listener._chords.timeouts == 1)
+
+    backend.post_stop()
+    th.join(timeout=2.0)
+    listener.stop()
+    m = listener._chords
+    print(f"chords: matched={m.matched} aborted={m.aborted} timeouts={m.timeouts}")
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# check_config_shards.py
+# -*- coding: utf-8 -*-
+"""
+設定の分割（include）の確認（Linux でも動く）。
+
+  1. include の展開: ファイル指定 / ワイルドカード（ファイル名順）/ 無いファイルの報告 / ディレクトリ部分のワイルドカードは不可
+  2. まとめる順序: メイン → include の順。同じ id は先のものを採り、重複として報告する
+  3. 1つの shard だけを変えたとき: その shard だけ読み直して解析し、リスナーはその shard の分だけコンパイルし直す
+     （他の shard の CompiledShortcut は前回と同じもの）。mtime だけの変更では何もしない
+  4. shard の追加 / 削除 / include の書き換えが反映される
+  5. shard をまたぐホットキーの衝突はファイル名付きで報告される
+  6. ディレクトリ + パターンのウォッチャー: 合うファイルの追加 / 変更で通知、合わないファイルや同じ内容では通知しない
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_config_shards.py [shard 数] [shard あたりの件数]
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+import config_store  # noqa: E402
+from config_store import ConfigSetReader, write_config  # noqa: E402
+from config_watcher import PollingWatcher, create_watcher  # noqa: E402
+from _check import Checks, wait_until  # noqa: E402
+
+KEYS = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def make_shortcuts(tag: str, start: int, n: int) -> list:
+    """ホットキーは "ctrl+alt+f13, a, b" 形式の3ストロークで、start からの通し番号で全部違う"""
+    out = []
+    for i in range(start, start + n):
+        a, b = divmod(i // 12, len(KEYS))
+        out.append({
+            "id": f"{tag}-{i}", "title": f"{tag} {i}",
+            "hotkey": f"ctrl+alt+f{13 + i % 12}, {KEYS[a % len(KEYS)]}, {KEYS[b]}",
+            "action_type": "open_url", "value": f"https://example.com/{i}",
+        })
+    return out
+
+
+def main() -> int:
+    n_shards = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    per_shard = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    check = Checks()
+
+    tmp = Path(tempfile.mkdtemp(prefix="check_config_shards_"))
+    try:
+        # ---- 1 / 2. 展開と順序 ----
+        main_path = tmp / "small" / "shortcut_config.json"
+        d = main_path.parent / "shortcuts.d"
+        d.mkdir(parents=True)
+        write_config(d / "b.json", [{"id": "x", "title": "x in b", "hotkey": "ctrl+f3"}, {"id": "b1", "hotkey": "ctrl+f4"}])
+        write_config(d / "a.json", [{"id": "dup", "title": "dup in a", "hotkey": "ctrl+f5"},
+                                    {"id": "x", "title": "x in a", "hotkey": "ctrl+f6"}])
+        (d / "notes.txt").write_text("not a shard", encoding="utf-8")
+        write_config(main_path.parent / "team.json", [{"id": "t1", "hotkey": "ctrl+f7"}])
+        write_config(main_path, [{"id": "dup", "title": "dup in main", "hotkey": "ctrl+f1"}])
+        data = json.loads(main_path.read_text(encoding="utf-8"))
+        data["include"] = ["shortcuts.d/*.json", "team.json", "missing.json", "shortcuts.d/a.json"]
+        main_path.write_text(json.dumps(data), encoding="utf-8")
+
+        cs = ConfigSetReader(main_path).load()
+        names = [s.path.name for s in cs.shards]
+        check("include order: main, glob by name, files as listed (once each)",
+              names == ["shortcut_config.json", "a.json", "b.json", "team.json"], f"{names}")
+        check("missing include is reported", [p.name for p in cs.missing] == ["missing.json"])
+        titles = {sc["id"]: sc.get("title") for sc in cs.shortcuts}
+        check("first definition wins", titles["dup"] == "dup in main" and titles["x"] == "x in a"
+              and [sc["id"] for sc in cs.shortcuts] == ["dup", "x", "b1", "t1"], f"{list(titles)}")
+        dups = [(x.id, x.kept.name, x.dropped.name) for x in cs.duplicates]
+        check("duplicates are reported", dups == [("dup", "shortcut_config.json", "a.json"), ("x", "a.json", "b.json")],
+              f"{dups}")
+        try:
+            config_store.include_targets(main_path, {"include": ["*/x.json"]})
+            bad = False
+        except ValueError:
+            bad = True
+        check("wildcard in a directory is rejected", bad)
+
+        # ---- 3. 1つの shard だけの変更 ----
+        main_path = tmp / "big" / "shortcut_config.json"
+        d = main_path.parent / "shortcuts.d"
+        d.mkdir(parents=True)
+        for k in range(n_shards):
+            write_config(d / f"team{k:03d}.json", make_shortcuts(f"s{k}", k * per_shard, per_shard))
+        write_config(main_path, make_shortcuts("main", n_shards * per_shard, 10))
+        data = json.loads(main_path.read_text(encoding="utf-8"))
+        main_path.write_text(json.dumps({**data, "include": "shortcuts.d/*.json"}), encoding="utf-8")
+
+        skl.CONFIG_PATH = main_path
+        skl.config_reader = reader = ConfigSetReader(main_path)
+        t0 = time.perf_counter()
+        first = skl.load_shortcuts()
+        full_ms = (time.perf_counter() - t0) * 1000
+        total = n_shards * per_shard + 10
+        check("all shards loaded", first is not None and len(first) == total, f"{len(first or [])} / {total}")
+
+        target = d / "team007.json" if n_shards > 7 else d / "team000.json"
+        items = json.loads(target.read_text(encoding="utf-8"))["shortcuts"]
+        items[0] = dict(items[0], title="changed")
+        before = reader.stats()
+        write_config(target, items)
+        t0 = time.perf_counter()
+        second = skl.load_shortcuts()
+        inc_ms = (time.perf_counter() - t0) * 1000
+        after = reader.stats()
+        old = {sc.id: sc for sc in first}
+        changed_ids = {sc["id"] for sc in items}
+        reused = sum(1 for sc in second if old.get(sc.id) is sc)
+        check("only the changed shard is read and parsed",
+              after["parses"] - before["parses"] == 1 and after["file_reads"] - before["file_reads"] == 1
+              and reader.current.reparsed == (target,), f"parses +{after['parses'] - before['parses']}"
+              f" reads +{after['file_reads'] - before['file_reads']}")
+        check("unchanged shards keep their compiled shortcuts",
+              reused == total - len(changed_ids) and next(sc for sc in second if sc.id == items[0]["id"]).title == "changed",
+              f"reused {reused} / {total}")
+        print(f"--  load: all {n_shards + 1} files {full_ms:.1f} ms / one shard changed {inc_ms:.1f} ms")
+
+        os.utime(d / "team000.json")
+        before = reader.stats()
+        check("mtime-only change: nothing to reload",
+              skl.load_shortcuts() is None and reader.stats()["parses"] == before["parses"])
+
+        # ---- 4. 追加 / 削除 / include の書き換え ----
+        extra = d / "zz_new.json"
+        write_config(extra, make_shortcuts("new", total + 100, 3))
+        added = skl.load_shortcuts()
+        extra.unlink()
+        removed = skl.load_shortcuts()
+        data = json.loads(main_path.read_text(encoding="utf-8"))
+        main_path.write_text(json.dumps({**data, "include": ["shortcuts.d/team000.json"]}), encoding="utf-8")
+        narrowed = skl.load_shortcuts()
+        check("shard added / removed / include narrowed",
+              added is not None and len(added) == total + 3 and removed is not None and len(removed) == total
+              and narrowed is not None and len(narrowed) == per_shard + 10 and len(reader.current.shards) == 2,
+              f"{len(added or [])} / {len(removed or [])} / {len(narrowed or [])}")
+
+        # ---- 5. shard をまたぐホットキーの衝突 ----
+        taken = make_shortcuts("main", n_shards * per_shard, 1)[0]["hotkey"].replace("ctrl+alt", "alt+ctrl")
+        write_config(d / "team000.json", [dict(make_shortcuts("clash", 0, 1)[0], id="clash", hotkey=taken)])
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            clashed = skl.load_shortcuts()
+        check("cross-shard hotkey conflict names both files",
+              clashed is not None and "team000.json" in out.getvalue() and "shortcut_config.json" in out.getvalue()
+              and all(sc.id != "clash" for sc in clashed), out.getvalue().strip()[:160])
+        skl.trigger_log.close()
+
+        # ---- 6. ディレクトリ + パターンのウォッチャー ----
+        w_dir = tmp / "watch"
+        w_dir.mkdir()
+        write_config(w_dir / "a.json", make_shortcuts("w", 0, 2))
+        for make in (lambda: create_watcher(w_dir, lambda: None, debounce_sec=0.01, pattern="*.json"),
+                     lambda: PollingWatcher(w_dir, lambda: None, debounce_sec=0.01, poll_sec=0.02, pattern="*.json")):
+            watcher = make()
+            watcher.start()
+            time.sleep(0.05)
+            (w_dir / "notes.txt").write_text(str(time.monotonic_ns()), encoding="utf-8")   # パターンに合わない
+            write_config(w_dir / "a.json", json.loads((w_dir / "a.json").read_text(encoding="utf-8"))["shortcuts"])
+            config_store.atomic_write_bytes(w_dir / "a.json", (w_dir / "a.json").read_bytes())   # 同じバイト列で置き換え
+            wait_until(lambda: watcher.unchanged >= 1, 1.0)
+            time.sleep(0.15)
+            quiet = watcher.fired == 0
+            write_config(w_dir / f"b{time.monotonic_ns()}.json", make_shortcuts("w", 10, 2))   # 新しい shard
+            fired = wait_until(lambda: watcher.fired == 1, 2.0)
+            watcher.stop()
+            check(f"directory watcher ({watcher.kind}) fires only for matching content changes", quiet and fired,
+                  f"fired={watcher.fired} unchanged={watcher.unchanged}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
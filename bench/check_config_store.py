@@ -0,0 +1,208 @@
+# check_config_store.py
+# -*- coding: utf-8 -*-
+"""
+設定ファイルのアトミックな書き込み / version / 内容ハッシュの確認（Linux でも動く）。
+
+  1. 書き込みの往復: version が1ずつ増える / 同じ内容なら書かない（version も mtime もそのまま）/ 他の項目を残す
+  2. ConfigSetReader.read(): 同じ内容・空白だけの書き換えは None、内容が変われば ConfigSet（解析し直すのは変わったときだけ）
+  3. 並行: 書き手（スレッド2本 + 別プロセス1つ）と読み手（スレッド）が同じファイルを叩き続けても
+     書きかけを読まない / version が重複も逆戻りもしない / 書いた回数と最後の version が一致する
+     （参考に、以前の truncate → write で読み手が壊れた JSON を読んだ回数も表示する）
+  4. ウォッチャー: mtime だけの変更 / 同じ内容の保存では通知しない
+  5. リスナーの load_shortcuts(): 内容が変わらなければ None（登録し直さない）
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_config_store.py [書き込み回数]
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+import config_store  # noqa: E402
+from config_store import ConfigSetReader, read_config, write_config  # noqa: E402
+from config_watcher import PollingWatcher, create_watcher  # noqa: E402
+from _check import Checks, wait_until  # noqa: E402
+
+
+def make_shortcuts(tag: str, i: int, n: int = 200) -> list:
+    return [
+        {"id": f"{tag}{i}-{k}", "title": f"{tag} #{i} {k}", "hotkey": f"ctrl+alt+f{13 + k % 12}, {k // 12}",
+         "action_type": "run_cmd", "value": "x" * (k % 50)}
+        for k in range(n)
+    ]
+
+
+def writer_process(path: str, n: int, tag: str) -> None:
+    """別プロセスの書き手（--writer）: 書いた version を JSON で出力する"""
+    versions = [write_config(path, make_shortcuts(tag, i)).version for i in range(n)]
+    print(json.dumps(versions))
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    check = Checks()
+
+    tmp = Path(tempfile.mkdtemp(prefix="check_config_store_"))
+    try:
+        # ---- 1. 往復 ----
+        path = tmp / "config" / "shortcut_config.json"
+        a = make_shortcuts("a", 0, 3)
+        v1 = write_config(path, a)
+        path.write_text(json.dumps({**json.loads(path.read_text(encoding="utf-8")), "note": "keep me"}), encoding="utf-8")
+        mtime = path.stat().st_mtime_ns
+        v1b = write_config(path, json.loads(json.dumps(a)))
+        check("same content is not rewritten", v1b.version == v1.version == 1 and path.stat().st_mtime_ns == mtime,
+              f"version={v1b.version}")
+        v2 = write_config(path, make_shortcuts("a", 1, 3))
+        cfg = read_config(path)
+        check("version increments / other keys kept", v2.version == 2 and cfg.version == 2 and cfg.data.get("note") == "keep me"
+              and cfg.hash == config_store.content_hash(cfg.shortcuts), f"keys={list(cfg.data)}")
+        check("no temp files left", sorted(p.name for p in path.parent.iterdir()) == ["shortcut_config.json", "shortcut_config.json.lock"],
+              f"{sorted(p.name for p in path.parent.iterdir())}")
+        legacy = tmp / "legacy.json"
+        legacy.write_text(json.dumps({"shortcuts": a}), encoding="utf-8")
+        check("legacy file reads as version 0", read_config(legacy).version == 0 and write_config(legacy, a).version == 0)
+
+        # ---- 2. ConfigSetReader.read() ----
+        reader = ConfigSetReader(path)
+        first = reader.read()
+        again = reader.read()
+        config_store.atomic_write_bytes(path, json.dumps(cfg.data, indent=4, ensure_ascii=False).encode("utf-8"))
+        reformatted = reader.read()
+        parses = reader.stats()["parses"]
+        write_config(path, make_shortcuts("a", 2, 3))
+        changed = reader.read()
+        check("reader skips unchanged / reformatted content",
+              first is not None and again is None and reformatted is None and changed is not None and changed.version == 3
+              and reader.stats()["parses"] == parses + 1, f"{reader.stats()}")
+
+        # ---- 3. 並行 ----
+        path = tmp / "hammer" / "shortcut_config.json"
+        write_config(path, make_shortcuts("init", 0))
+        stop = threading.Event()
+        reads = {"n": 0, "torn": 0, "bad_hash": 0, "backwards": 0}
+
+        def reader_loop(target: Path, atomic: bool) -> None:
+            last = -1
+            while not stop.is_set():
+                try:
+                    c = read_config(target)
+                except ValueError:
+                    reads["torn"] += 1
+                    continue
+                except OSError:
+                    continue
+                reads["n"] += 1
+                if not atomic:
+                    continue
+                if c.data.get(config_store.HASH_KEY) != c.hash:
+                    reads["bad_hash"] += 1
+                if c.version < last:
+                    reads["backwards"] += 1
+                last = c.version
+
+        versions: list[int] = []
+        vlock = threading.Lock()
+
+        def writer_loop(tag: str) -> None:
+            for i in range(n):
+                v = write_config(path, make_shortcuts(tag, i)).version
+                with vlock:
+                    versions.append(v)
+
+        rth = threading.Thread(target=reader_loop, args=(path, True))
+        rth.start()
+        proc = subprocess.Popen(
+            [sys.executable, __file__, "--writer", str(path), str(n), "p"], stdout=subprocess.PIPE, text=True,
+        )
+        wths = [threading.Thread(target=writer_loop, args=(tag,)) for tag in ("t1", "t2")]
+        t0 = time.perf_counter()
+        for th in wths:
+            th.start()
+        for th in wths:
+            th.join()
+        out, _ = proc.communicate(timeout=120)
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        rth.join()
+        versions += json.loads(out)
+        final = read_config(path).version
+        total = 3 * n
+        check("concurrent writers: unique, gapless versions",
+              sorted(versions) == list(range(2, total + 2)) and final == total + 1,
+              f"writes={len(versions)} final={final} ({elapsed * 1000 / total:.2f} ms/write)")
+        check("concurrent reader never sees a partial file",
+              reads["torn"] == 0 and reads["bad_hash"] == 0 and reads["backwards"] == 0 and reads["n"] > 0,
+              f"reads={reads['n']} torn={reads['torn']} bad_hash={reads['bad_hash']} backwards={reads['backwards']}")
+
+        # 参考: 以前の書き方（その場で truncate → write）
+        legacy = tmp / "legacy_hammer.json"
+        legacy.write_text(json.dumps({"shortcuts": make_shortcuts("init", 0)}), encoding="utf-8")
+        stop.clear()
+        reads.update(n=0, torn=0)
+        rth = threading.Thread(target=reader_loop, args=(legacy, False))
+        rth.start()
+        for i in range(n):
+            with open(legacy, "w", encoding="utf-8") as f:
+                json.dump({"shortcuts": make_shortcuts("l", i)}, f, indent=2, ensure_ascii=False)
+        stop.set()
+        rth.join()
+        print(f"--  (reference) in-place truncate+write: torn reads {reads['torn']} / {reads['n'] + reads['torn']}")
+
+        # ---- 4. ウォッチャー ----
+        path = tmp / "watch" / "shortcut_config.json"
+        write_config(path, make_shortcuts("w", 0, 3))
+        for make in (lambda: create_watcher(path, lambda: None, debounce_sec=0.01),
+                     lambda: PollingWatcher(path, lambda: None, debounce_sec=0.01, poll_sec=0.02)):
+            watcher = make()
+            watcher.start()
+            time.sleep(0.05)
+            os.utime(path)                                  # mtime だけ
+            write_config(path, read_config(path).shortcuts)   # 同じ内容（書かない）
+            config_store.atomic_write_bytes(path, path.read_bytes())   # 同じバイト列で置き換え
+            wait_until(lambda: watcher.unchanged >= 1, 1.0)
+            time.sleep(0.1)
+            quiet = watcher.fired == 0
+            write_config(path, make_shortcuts("w", time.monotonic_ns(), 3))
+            fired = wait_until(lambda: watcher.fired == 1, 2.0)
+            watcher.stop()
+            check(f"watcher ({watcher.kind}) skips unchanged content", quiet and fired,
+                  f"fired={watcher.fired} unchanged={watcher.unchanged}")
+
+        # ---- 5. リスナー ----
+        path = tmp / "listener" / "shortcut_config.json"
+        write_config(path, [{"id": "a", "hotkey": "ctrl+f1", "action_type": "run_cmd", "value": "notepad"}])
+        skl.CONFIG_PATH = path
+        skl.config_reader = ConfigSetReader(path)
+        loaded = skl.load_shortcuts()
+        os.utime(path)
+        unchanged = skl.load_shortcuts()
+        write_config(path, [{"id": "a", "hotkey": "ctrl+f2", "action_type": "run_cmd", "value": "notepad"}])
+        reloaded = skl.load_shortcuts()
+        check("listener load_shortcuts skips unchanged config",
+              loaded is not None and unchanged is None and reloaded is not None and reloaded[0].hotkey == "ctrl+f2",
+              f"{skl.config_reader.stats()}")
+        skl.trigger_log.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return check.result()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--writer":
+        writer_process(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        sys.exit(0)
+    sys.exit(main())
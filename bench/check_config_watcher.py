@@ -0,0 +1,131 @@
+# check_config_watcher.py
+# -*- coding: utf-8 -*-
+"""
+設定ファイルのウォッチャー（config_watcher.py）の確認（Linux でも動く）。
+
+ネイティブ通知（create_watcher。Linux は inotify、Windows はディレクトリ変更通知）と
+stat ポーリング（PollingWatcher）のそれぞれで:
+  1. 書き込みからコールバックまでの時間（p50 / 最大）。ネイティブは数 ms 以内
+  2. 連続書き込み（truncate → write → close の繰り返し）はデバウンスで1回の通知にまとまる
+  3. アイドル中の起床回数（wakeups）: ネイティブは 0、ポーリングは poll_sec 毎
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_config_watcher.py [書き込み回数]
+"""
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+from config_watcher import FileWatcher, PollingWatcher, create_watcher  # noqa: E402
+from _check import Checks  # noqa: E402
+
+NATIVE_LATENCY_MS = 50.0   # ネイティブ通知の書き込み → コールバックの上限（遅い CI でも収まる値）
+BURST_WRITES = 20
+IDLE_SEC = 1.0
+POLL_SEC = 0.05
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+class Recorder:
+    """コールバックが呼ばれた時刻を記録する"""
+    def __init__(self) -> None:
+        self.times: list[float] = []
+        self._cond = threading.Condition()
+
+    def __call__(self) -> None:
+        with self._cond:
+            self.times.append(time.perf_counter())
+            self._cond.notify_all()
+
+    def wait(self, count: int, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self.times) >= count, timeout)
+
+
+def run(label: str, make, path: Path, n: int, latency_limit_ms: float, check) -> None:
+    rec = Recorder()
+    watcher: FileWatcher = make(rec)
+    watcher.start()
+    time.sleep(0.05)
+    try:
+        # ---- 1. 書き込み → コールバック ----
+        latencies = []
+        for i in range(n):
+            expected = len(rec.times) + 1
+            path.write_text(f'{{"shortcuts": [], "n": {i}}}', encoding="utf-8")
+            t0 = time.perf_counter()
+            if not rec.wait(expected, 2.0):
+                break
+            latencies.append((rec.times[-1] - t0) * 1000)
+        latencies.sort()
+        got = len(latencies) == n
+        p50 = percentile(latencies, 0.5) if latencies else float("nan")
+        worst = latencies[-1] if latencies else float("nan")
+        check(f"{label}: write -> callback", got and worst <= latency_limit_ms,
+              f"{len(latencies)}/{n} p50={p50:.2f}ms max={worst:.2f}ms (limit {latency_limit_ms:.0f}ms)")
+
+        # ---- 2. 連続書き込みは1回の通知 ----
+        time.sleep(0.1)
+        before = len(rec.times)
+        for i in range(BURST_WRITES):
+            with open(path, "w", encoding="utf-8") as f:   # truncate → write → close
+                f.write(f'{{"shortcuts": [], "burst": {i}}}')
+        rec.wait(before + 1, 2.0)
+        time.sleep(0.3)
+        check(f"{label}: burst of {BURST_WRITES} writes -> one callback", len(rec.times) - before == 1,
+              f"callbacks={len(rec.times) - before}")
+
+        # ---- 3. アイドル中の起床回数 ----
+        time.sleep(0.1)
+        before = watcher.wakeups
+        time.sleep(IDLE_SEC)
+        idle = watcher.wakeups - before
+        if isinstance(watcher, PollingWatcher):
+            expected = IDLE_SEC / POLL_SEC
+            check(f"{label}: idle wakeups follow poll_sec", expected * 0.5 <= idle <= expected * 1.5,
+                  f"{idle} in {IDLE_SEC:.1f}s (poll_sec={POLL_SEC})")
+        else:
+            check(f"{label}: no wakeups while idle", idle == 0, f"{idle} in {IDLE_SEC:.1f}s")
+    finally:
+        watcher.stop()
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    check = Checks()
+
+    tmp = Path(tempfile.mkdtemp(prefix="check_config_watcher_"))
+    try:
+        path = tmp / "shortcut_config.json"
+        path.write_text('{"shortcuts": []}', encoding="utf-8")
+
+        native = create_watcher(path, lambda: None)
+        native_kind = native.kind
+        native.stop()
+        if native_kind == PollingWatcher.kind:
+            print(f"--  no native watcher on {sys.platform}, skipping the native checks")
+        else:
+            run(native_kind, lambda cb: create_watcher(path, cb), path, n, NATIVE_LATENCY_MS, check)
+
+        # ポーリングの遅延は poll_sec + デバウンス分まで
+        run("poll", lambda cb: PollingWatcher(path, cb, poll_sec=POLL_SEC), path, max(1, n // 5),
+            POLL_SEC * 2 * 1000 + 50, check)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# check_device_config.py
+# -*- coding: utf-8 -*-
+"""
+ESP32 のメニューへの設定送信（device_config.ConfigPusher）を、デバイス側と同じ処理の
+ConfigReceiver へフレームのバイト列で往復させて確認する（実機不要）。
+
+  1. 全体同期 / タイトル1件の変更 / 追加と削除 で、デバイス側の内容がホストと一致すること
+     （同じ id は同じスロットのまま）
+  2. デバイスが別のバージョンを持っていた（基準バージョン不一致）とき、全体同期でやり直すこと
+  3. 途中のバイトが壊れた（blob の CRC 不一致）とき、全体同期でやり直すこと
+  4. COMMIT が届かず ack が来ないまま次の送信になったとき、全体同期にすること
+  5. 送るバイト数を、同じ内容の JSON と比べる
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_device_config.py [ショートカット数]
+"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "common"))
+
+import device_config as dc  # noqa: E402
+from serial_frame import FT_CFG_CHUNK, FT_CFG_COMMIT, FrameParser, encode_frame  # noqa: E402
+from _check import Checks  # noqa: E402
+
+
+class Link:
+    """ホスト -> デバイス はフレームのバイト列のまま渡し、ack は pump() で返す"""
+    def __init__(self) -> None:
+        self.device = dc.ConfigReceiver()
+        self.pusher = dc.ConfigPusher(self.write)
+        self._dev_parser = FrameParser()
+        self._host_parser = FrameParser()
+        self._acks = bytearray()
+        self.corrupt_next_chunk = False
+        self.drop_next_commit = False
+
+    def write(self, data: bytes) -> bool:
+        for frame in self._dev_parser.feed(data):
+            if frame.type == FT_CFG_CHUNK and self.corrupt_next_chunk:
+                # フレームの CRC は合っているが中身が違う（blob の CRC で見つかるはず）
+                self.corrupt_next_chunk = False
+                payload = bytearray(frame.payload)
+                payload[-1] ^= 0x55
+                frame = self._dev_parser.feed(encode_frame(frame.type, bytes(payload), frame.seq))[0]
+            if frame.type == FT_CFG_COMMIT and self.drop_next_commit:
+                self.drop_next_commit = False
+                continue
+            ack = self.device.handle_frame(frame)
+            if ack:
+                self._acks += ack
+        return True
+
+    def pump(self) -> None:
+        # handle_ack の中で再送すると、その ack がまた溜まる
+        while self._acks:
+            data = bytes(self._acks)
+            self._acks.clear()
+            for frame in self._host_parser.feed(data):
+                self.pusher.handle_ack(frame)
+
+    def push(self, items: list[tuple[str, str]]) -> int:
+        n = self.pusher.push(items)
+        self.pump()
+        return n
+
+    def in_sync(self, items: list[tuple[str, str]]) -> bool:
+        want = {slot: (dc.clip_utf8(sid, dc.ID_MAX).decode(), dc.clip_utf8(title, dc.TITLE_MAX).decode())
+                for slot, (sid, title) in self.pusher._desired.items()}
+        ids = {sid for sid, _ in items[:dc.MAX_SLOTS]}
+        return self.device.slots == want and {sid for sid, _ in self.pusher._desired.values()} == ids
+
+
+def json_size(items: list[tuple[str, str]]) -> int:
+    return len(json.dumps([{"id": s, "title": t} for s, t in items], ensure_ascii=False).encode("utf-8"))
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    check = Checks()
+
+    items = [(f"sc{i}", f"ショートカット {i}" if i % 2 else f"Shortcut number {i}") for i in range(n)]
+    link = Link()
+    p = link.pusher
+
+    # 1. 全体同期 -> 差分
+    full = link.push(items)
+    check("full sync", link.in_sync(items) and p.full_syncs == 1, f"{full} bytes (JSON {json_size(items)} bytes)")
+
+    items[3] = (items[3][0], "renamed")
+    delta = link.push(items)
+    check("one title changed", link.in_sync(items) and p.deltas == 1, f"{delta} bytes")
+
+    before = {sid: slot for slot, (sid, _) in p._desired.items()}
+    items = [("new", "new one")] + items[:1] + items[2:]
+    link.push(items)
+    after = {sid: slot for slot, (sid, _) in p._desired.items()}
+    stable = all(after[sid] == before[sid] for sid in after if sid in before)
+    check("added / removed", link.in_sync(items) and stable and after["new"] == before["sc1"],
+          f"deltas={p.deltas}")
+
+    check("no change -> nothing sent", link.push(items) == 0)
+
+    # 2. デバイスが別のバージョンを持っている（HELLO を取りこぼした再起動など）
+    link.device.version = 0
+    link.device.slots = {}
+    items[0] = (items[0][0], "after reboot")
+    link.push(items)
+    check("base mismatch -> full resync", link.in_sync(items) and p.full_syncs == 2, f"acks_failed={p.acks_failed}")
+
+    # 3. blob の中身が壊れた
+    link.corrupt_next_chunk = True
+    items[1] = (items[1][0], "corrupted on the wire")
+    link.push(items)
+    check("blob crc -> full resync", link.in_sync(items) and p.full_syncs == 3, f"acks_failed={p.acks_failed}")
+
+    # 4. COMMIT が届かない（ack も来ない）
+    link.drop_next_commit = True
+    items[2] = (items[2][0], "commit lost")
+    link.push(items)
+    saved, dc.ACK_TIMEOUT_SEC = dc.ACK_TIMEOUT_SEC, 0.0
+    items[4] = (items[4][0], "next change")
+    link.push(items)
+    dc.ACK_TIMEOUT_SEC = saved
+    check("missing ack -> full resync", link.in_sync(items) and p.full_syncs == 4)
+
+    # fire_slot:N -> id
+    slot = next(iter(p._desired))
+    check("id_for_slot", p.id_for_slot(slot) == p._desired[slot][0] and p.id_for_slot(dc.MAX_SLOTS) is None)
+
+    # 5. バイト数（1件のタイトル変更あたり）
+    changed = list(items)
+    changed[5] = (changed[5][0], "x")
+    d = link.push(changed)
+    print(f"\nwire bytes for {len(items)} shortcuts: full={full} json={json_size(items)}"
+          f"  one-title delta={d} (json resend={json_size(changed)})")
+    print(f"stats={p.stats()}")
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
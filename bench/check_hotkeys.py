@@ -0,0 +1,76 @@
+# check_hotkeys.py
+# -*- coding: utf-8 -*-
+"""
+app/common/hotkeys.py の正規化と衝突検出を確認する。
+
+  1. canonical_hotkey() が書き順 / 大文字小文字 / 別名 / 空白の違いを揃えること
+  2. find_conflicts() が重複 / 先頭一致 / 解析エラーを見つけ、先に書いた方を残すこと
+  3. 10k 件の検出時間（総当たりしていないこと）
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_hotkeys.py
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "common"))
+
+from hotkeys import (  # noqa: E402
+    DUPLICATE, HAS_PREFIX, INVALID, IS_PREFIX, canonical_hotkey, find_conflicts,
+)
+from _check import Checks  # noqa: E402
+
+CANONICAL = [
+    ("ctrl+alt+f1", "ctrl+alt+f1"),
+    ("Alt+Ctrl+F1", "ctrl+alt+f1"),
+    ("control + shift + A", "ctrl+shift+a"),
+    ("meta+shift+ctrl+pageup", "ctrl+shift+win+pgup"),
+    ("win+return", "win+enter"),
+    ("ctrl+k,ctrl+c", "ctrl+k, ctrl+c"),
+    (" ctrl+K ,  control+C ", "ctrl+k, ctrl+c"),
+]
+
+HOTKEYS = [
+    "ctrl+alt+f1",          # 0
+    "alt+ctrl+f1",          # 1 duplicate of 0
+    "ctrl+k, ctrl+c",       # 2
+    "ctrl+k",               # 3 is_prefix of 2
+    "ctrl+alt+f1, ctrl+g",  # 4 has_prefix (0)
+    "Control+K, Ctrl+C",    # 5 duplicate of 2
+    "ctrl+nosuchkey",       # 6 invalid
+    "",                     # 7 empty: ignored
+    "ctrl+c",               # 8 ok（列の2打目と同じだが衝突ではない）
+]
+WANT = {(1, 0, DUPLICATE), (3, 2, IS_PREFIX), (4, 0, HAS_PREFIX), (5, 2, DUPLICATE), (6, None, INVALID)}
+
+
+def main() -> int:
+    check = Checks()
+
+    for src, want in CANONICAL:
+        got = canonical_hotkey(src)
+        check(f"canonical {src!r}", got == want, f"-> {got!r}")
+
+    got = {(c.index, c.other, c.reason) for c in find_conflicts(HOTKEYS)}
+    check("conflicts", got == WANT, f"missing={WANT - got} extra={got - WANT}")
+
+    # 10k 件（2打 8.8k 件の後に、その1打目になる 200 件（is_prefix）と書き順違いの重複 1k 件）
+    keys = [chr(c) for c in range(ord("a"), ord("z") + 1)] + [f"f{i}" for i in range(1, 25)]
+    mods = ("ctrl", "alt", "shift", "ctrl+alt", "ctrl+shift", "alt+shift", "ctrl+alt+shift", "win")
+    singles = [f"{m}+{k}" for m in mods for k in keys][:200]
+    big = [f"{singles[i % 200]}, {singles[i // 200]}" for i in range(200, 9_000)] + singles
+    big += [canonical_hotkey(h).replace("ctrl+alt", "alt+ctrl") for h in big[:1_000]]
+    t0 = time.perf_counter()
+    found = find_conflicts(big)
+    dt = time.perf_counter() - t0
+    check(f"{len(big)} hotkeys", len(found) == 1_000 + 200, f"conflicts={len(found)}  {dt * 1000:.1f} ms")
+
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# check_injector.py
+# -*- coding: utf-8 -*-
+"""
+action_type "type_text" / "macro" を FakeInjector で確認する（Linux でも動く）。
+
+  1. compile_text(): ASCII / 日本語 / BMP 外（サロゲートペア）/ 改行（CRLF も1回）/ タブが元の文字列に戻ること
+  2. compile_macro(): 修飾キー down -> キー -> 修飾キー up（逆順）の順になること
+  3. pace_ms / chunk: 修飾キーを押したまま区切らず、サロゲートペアも割らないこと。区切りの間だけ待つこと
+  4. リスナー経由: 1回の発火でインジェクタの呼び出しが1回だけであること / 解析できない macro は読み込み時にスキップ
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_injector.py
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+import injector  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+from injector import VK_CONTROL, VK_SHIFT, FakeInjector, KeyEvent, chunks  # noqa: E402
+from _check import Checks, compile_config, wait_until  # noqa: E402
+
+TEXTS = ["thank you!", "ありがとう、OK です", "emoji 👍 and 𠮷", "line1\r\nline2\n\tindent", ""]
+
+
+def main() -> int:
+    check = Checks()
+
+    for text in TEXTS:
+        fake = FakeInjector()
+        fake.send(injector.compile_text(text))
+        want = text.replace("\r\n", "\n")
+        check(f"text round trip {text!r}", fake.typed_text() == want and len(fake.batches) <= 1, f"-> {fake.typed_text()!r}")
+
+    events = injector.compile_macro("ctrl+shift+a, tab")
+    want = [
+        KeyEvent(VK_CONTROL, 0, False), KeyEvent(VK_SHIFT, 0, False), KeyEvent(0x41, 0, False), KeyEvent(0x41, 0, True),
+        KeyEvent(VK_SHIFT, 0, True), KeyEvent(VK_CONTROL, 0, True), KeyEvent(0x09, 0, False), KeyEvent(0x09, 0, True),
+    ]
+    check("macro event order", list(events) == want, f"{len(events)} events")
+
+    # 区切り
+    events = injector.compile_macro("ctrl+a, ctrl+c") + injector.compile_text("x👍y")
+    parts = chunks(events, 1)
+    held_ok = all(sum(-1 if e.up else 1 for e in p) == 0 for p in parts)
+    pair_ok = all(not (0xD800 <= p[-1].char < 0xDC00) for p in parts)
+    check("chunks keep modifiers and surrogate pairs together", held_ok and pair_ok and len(parts) == 5,
+          f"parts={[len(p) for p in parts]}")
+    fake = FakeInjector()
+    t0 = time.perf_counter()
+    fake.send(injector.compile_text("abcdef"), pace_sec=0.02, chunk=2)
+    dt = time.perf_counter() - t0
+    check("pace between chunks", fake.batches == [4, 4, 4] and 0.035 <= dt < 0.2, f"batches={fake.batches} {dt * 1000:.0f} ms")
+
+    # リスナー経由
+    skl.DEBOUNCE_SEC = 0.0
+    skl.INJECT_BACKEND = "fake"
+    listener = skl.HotkeyListener(execute_fn=skl.execute, backend=FakeBackend())
+    shortcuts = compile_config([
+        {"id": "t", "hotkey": "ctrl+f1", "action_type": "type_text", "value": "thank you!\n"},
+        {"id": "m", "hotkey": "ctrl+f2", "action_type": "macro", "value": "ctrl+a, ctrl+c"},
+        {"id": "bad", "hotkey": "ctrl+f3", "action_type": "macro", "value": "ctrl+nosuchkey"},
+        {"id": "empty", "hotkey": "ctrl+f4", "action_type": "type_text", "value": ""},
+    ])
+    check("invalid macro / empty text skipped at load", [sc.id for sc in shortcuts] == ["t", "m"], f"{[sc.id for sc in shortcuts]}")
+    listener.register_shortcuts(shortcuts)
+    listener.trigger_by_id("t")
+    fake = skl.get_injector()
+    wait_until(lambda: fake.sends >= 1, 2.0, interval=0.002)
+    listener.trigger_by_id("m")
+    wait_until(lambda: fake.sends >= 2, 2.0, interval=0.002)
+    check("one injector call per trigger", fake.sends == 2 and fake.calls == 2 and fake.batches == [22, 8],
+          f"{fake.stats()} batches={fake.batches}")
+    check("typed through the listener", fake.typed_text() == "thank you!\n<ctrl><a><ctrl><c>", repr(fake.typed_text()))
+    listener.stop()
+    skl.trigger_log.close()
+
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
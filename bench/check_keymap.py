@@ -0,0 +1,107 @@
+# check_keymap.py
+# -*- coding: utf-8 -*-
+"""
+app/common/keymap.py の表を全件往復させて確認する。
+
+  1. 表の全 vk: 正規名 -> vk -> 正規名 が元に戻ること
+  2. 全ての別名（大文字 / 前後の空白付きも）が同じ vk になること
+  3. 全 vk x 修飾キー 16 通りで format_stroke -> parse_hotkey -> canonical_hotkey が元に戻ること
+  4. keyboard ライブラリの名前が重ならず、keyboard_hotkey_name() が全て作れること
+  5. 表に無い名前 / vk は ValueError になること
+  6. 名前 -> vk の引き当て時間（表の大きさに依らないこと）
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_keymap.py
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "common"))
+
+import keymap  # noqa: E402
+from hotkeys import (  # noqa: E402
+    MOD_ALT, MOD_CONTROL, MOD_NOREPEAT, MOD_SHIFT, MOD_WIN,
+    canonical_hotkey, format_stroke, keyboard_hotkey_name, parse_hotkey, parse_sequence,
+)
+from _check import Checks  # noqa: E402
+
+MODS = (MOD_CONTROL, MOD_ALT, MOD_SHIFT, MOD_WIN)
+
+
+def main() -> int:
+    checks = Checks()
+
+    def check(label: str, bad: list, total: int) -> None:
+        checks(label, not bad, f"({total} cases){'  e.g. ' + repr(bad[:3]) if bad else ''}")
+
+    vks = list(keymap.VK_TO_NAME)
+    print(f"keys={len(vks)} names={len(keymap.NAME_TO_VK)} keyboard names={len(keymap.VK_TO_KEYBOARD)}"
+          f" groups={len(keymap.GROUPS)}")
+
+    bad = [vk for vk in vks if keymap.vk_from_name(keymap.name_from_vk(vk)) != vk]
+    check("name <-> vk", bad, len(vks))
+
+    cases = [(n, vk) for n, vk in keymap.NAME_TO_VK.items() for n in (n, n.upper(), f"  {n} ")]
+    bad = [(n, vk) for n, vk in cases if keymap.vk_from_name(n) != vk]
+    check("aliases / case / whitespace", bad, len(cases))
+
+    bad = []
+    total = 0
+    for vk in vks:
+        for combo in range(16):
+            mods = sum(bit for i, bit in enumerate(MODS) if combo >> i & 1)
+            text = format_stroke(mods, vk)
+            total += 1
+            if parse_hotkey(text) != (mods | MOD_NOREPEAT, vk) or canonical_hotkey(text) != text:
+                bad.append(text)
+    check("stroke round trip (all keys x 16 modifier sets)", bad, total)
+
+    seq = ", ".join(format_stroke(MOD_CONTROL, vk) for vk in vks)
+    check("one long sequence over the whole table", [] if [v for _, v in parse_sequence(seq)] == vks else [seq[:40]], 1)
+
+    kb = list(keymap.VK_TO_KEYBOARD.values())
+    dup = sorted({n for n in kb if kb.count(n) > 1})
+    check("keyboard names are unique", dup, len(kb))
+    bad = []
+    for vk in keymap.VK_TO_KEYBOARD:
+        try:
+            keyboard_hotkey_name(MOD_CONTROL | MOD_SHIFT, vk)
+        except ValueError as e:
+            bad.append(str(e))
+    check("keyboard_hotkey_name for every key that has one", bad, len(kb))
+
+    unknown = ["", "f25", "num10", "ctrl", "nosuchkey", "a+b"]
+    bad = []
+    for name in unknown:
+        try:
+            keymap.vk_from_name(name)
+            bad.append(name)
+        except ValueError:
+            pass
+    for vk in (0x00, 0x07, 0xFF):
+        try:
+            keymap.name_from_vk(vk)
+            bad.append(hex(vk))
+        except ValueError:
+            pass
+    check("unknown names / vks raise ValueError", bad, len(unknown) + 3)
+
+    names = list(keymap.NAME_TO_VK)
+    rounds = 200
+    lookup = keymap.vk_from_name
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for n in names:
+            lookup(n)
+    dt = time.perf_counter() - t0
+    print(f"lookup: {dt / (rounds * len(names)) * 1e9:.0f} ns/name")
+
+    return checks.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# check_py_action.py
+# -*- coding: utf-8 -*-
+"""
+action_type "python" を確認する（Linux でも動く。モジュールは一時ディレクトリに作る）。
+
+  1. 読み込み時に import して関数まで引くこと（import できない / 関数が無い設定はスキップ）
+  2. args（配列 / オブジェクト / 単一値）がそのまま渡ること
+  3. 再読込ではモジュールを import し直さず、ファイルが変わったものだけ読み直すこと
+  4. timeout_sec を過ぎた関数が止まり、実行プールのワーカーが空くこと
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_py_action.py
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+import py_action  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+from _check import Checks, compile_config, wait_until  # noqa: E402
+
+MODULE_V1 = """
+calls = []
+
+def record(*args, **kwargs):
+    calls.append(("v1", args, kwargs))
+
+def spin(n):
+    while True:
+        n += 1
+
+class Tools:
+    @staticmethod
+    def hello(name):
+        calls.append(("hello", name))
+"""
+
+
+def main() -> int:
+    check = Checks()
+
+    tmp = tempfile.mkdtemp(prefix="py_action_")
+    pkg = Path(tmp) / "chk_actions"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    mod_path = pkg / "basic.py"
+    mod_path.write_text(MODULE_V1)
+    py_action.add_search_path(tmp)
+
+    config = [
+        {"id": "pos", "hotkey": "ctrl+f1", "action_type": "python", "value": "chk_actions.basic:record", "args": [1, "a"]},
+        {"id": "kw", "hotkey": "ctrl+f2", "action_type": "python", "value": "chk_actions.basic:record", "args": {"x": 2}},
+        {"id": "one", "hotkey": "ctrl+f3", "action_type": "python", "value": "chk_actions.basic:Tools.hello", "args": "bob"},
+        {"id": "spin", "hotkey": "ctrl+f4", "action_type": "python", "value": "chk_actions.basic:spin",
+         "args": [0], "timeout_sec": 0.2},
+        {"id": "bad1", "hotkey": "ctrl+f5", "action_type": "python", "value": "chk_actions.nosuch:f"},
+        {"id": "bad2", "hotkey": "ctrl+f6", "action_type": "python", "value": "chk_actions.basic:nosuch"},
+        {"id": "bad3", "hotkey": "ctrl+f7", "action_type": "python", "value": "no_colon"},
+    ]
+
+    skl.DEBOUNCE_SEC = 0.0
+    skl.EXECUTOR_WORKERS = 1   # タイムアウトでワーカーが空くことを確かめるため1本
+    listener = skl.HotkeyListener(execute_fn=skl.execute, backend=FakeBackend())
+    shortcuts = compile_config(config)
+    check("invalid python actions are skipped at load", sorted(sc.id for sc in shortcuts) == ["kw", "one", "pos", "spin"],
+          f"{[sc.id for sc in shortcuts]}")
+    listener.register_shortcuts(shortcuts)
+
+    import chk_actions.basic as basic  # noqa: E402  (リスナーが import したもの)
+    for sid in ("pos", "kw", "one"):
+        listener.trigger_by_id(sid)
+    wait_until(lambda: len(basic.calls) >= 3, 2.0, interval=0.002)
+    check("args are passed", basic.calls == [("v1", (1, "a"), {}), ("v1", (), {"x": 2}), ("hello", "bob")],
+          f"{basic.calls}")
+
+    # 再読込: 変わっていなければ import し直さない
+    before = skl.py_actions.stats()
+    again = compile_config(config)
+    stats = listener.register_shortcuts(again)
+    after = skl.py_actions.stats()
+    check("reload without change reuses the module", after == before and stats.unchanged == 4,
+          f"{before} -> {after}, unchanged={stats.unchanged}")
+
+    # ファイルが変わったら読み直す
+    mod_path.write_text(MODULE_V1.replace('"v1"', '"v2"'))
+    st = mod_path.stat()
+    os.utime(mod_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    stats = listener.register_shortcuts(compile_config(config))
+    import chk_actions.basic as basic2  # noqa: E402
+    basic2.calls.clear()
+    listener.trigger_by_id("pos")
+    wait_until(lambda: basic2.calls, 2.0, interval=0.002)
+    check("changed module is reloaded", skl.py_actions.stats()["reloads"] == 1 and basic2.calls[:1] == [("v2", (1, "a"), {})]
+          and stats.updated == 4, f"{skl.py_actions.stats()} updated={stats.updated} calls={basic2.calls}")
+
+    # タイムアウト（無限ループを止めて、次のジョブが動くこと）
+    basic2.calls.clear()
+    failed0 = listener.executor.stats()["failed"]
+    t0 = time.perf_counter()
+    listener.trigger_by_id("spin")
+    listener.trigger_by_id("one")
+    done = wait_until(lambda: basic2.calls, 3.0, interval=0.002)
+    dt = time.perf_counter() - t0
+    check("timeout stops a busy function and frees the worker",
+          done and listener.executor.stats()["failed"] == failed0 + 1 and dt < 1.0, f"{dt * 1000:.0f} ms")
+
+    listener.stop()
+    skl.trigger_log.close()
+    shutil.rmtree(tmp, ignore_errors=True)
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# check_rate_limit.py
+# -*- coding: utf-8 -*-
+"""
+ショートカット毎の連打抑止 / トークンバケット / coalesce を確認する（Linux でも動く）。
+
+  1. debounce_ms: 窓の中は捨て、窓を過ぎたら通す（ショートカット毎に独立）
+  2. rate_per_sec + burst: burst 件まで続けて通し、その後は補充された分だけ通す
+  3. 状態は max_keys で頭打ち（LRU）になり、retain() で消えたショートカットの分を捨てる
+  4. 複数スレッドから同時に叩いても、通した数がトークンの数を超えない
+  5. coalesce: 実行中に何度押しても、終わった後にもう1回だけ実行される
+  6. 壁時計（time.time）を巻き戻しても連打抑止が狂わない
+  7. allow() 1回あたりの時間
+問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_rate_limit.py
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+from rate_limit import DEBOUNCED, RATE_LIMITED, RateLimiter, make_policy  # noqa: E402
+from _check import Checks, wait_until  # noqa: E402
+
+
+def main() -> int:
+    check = Checks()
+
+    # 1. debounce
+    lim = RateLimiter(0.3)
+    p100 = make_policy(debounce_ms=100)
+    got = [lim.allow("a", p100, t) for t in (0.0, 0.05, 0.099, 0.101, 0.15)]
+    check("debounce_ms window", got == [None, DEBOUNCED, DEBOUNCED, None, DEBOUNCED], f"{got}")
+    got = [lim.allow("b", None, t) for t in (0.0, 0.2, 0.31)]
+    check("default debounce / independent keys", got == [None, DEBOUNCED, None], f"{got}")
+    check("policies are shared", make_policy(debounce_ms=100) is p100 and make_policy() is None)
+
+    # 2. token bucket（debounce 0、毎秒 2 個、容量 3）
+    lim = RateLimiter(0.0)
+    bucket = make_policy(debounce_ms=0, rate_per_sec=2, burst=3)
+    got = [lim.allow("k", bucket, 10.0) is None for _ in range(5)]
+    check("burst then limited", got == [True, True, True, False, False], f"{got}")
+    got = [lim.allow("k", bucket, t) is None for t in (10.4, 10.5, 10.6, 11.0, 11.01)]
+    check("refill at rate_per_sec", got == [False, True, False, True, False], f"{got}")
+    passed = sum(lim.allow("s", bucket, i * 0.01) is None for i in range(1000))   # 10 秒間 100 回/秒
+    check("sustained rate", passed == 3 + 19 or passed == 3 + 20, f"passed={passed} in 10 s (want 2/s + burst 3)")
+    check("per-policy counters", lim.suppressed[RATE_LIMITED] > 0 and lim.suppressed[DEBOUNCED] == 0,
+          f"{lim.suppressed}")
+
+    # 3. bounded state
+    lim = RateLimiter(0.3, max_keys=100)
+    for i in range(10_000):
+        lim.allow(f"id{i}", None, float(i))
+    check("state bounded by max_keys", len(lim) == 100 and lim.evicted == 9_900, f"keys={len(lim)} evicted={lim.evicted}")
+    dropped = lim.retain(f"id{i}" for i in range(9_950, 10_000))
+    check("retain drops removed shortcuts", len(lim) == 50 and dropped == 50, f"keys={len(lim)}")
+
+    # 4. threads
+    lim = RateLimiter(0.0)
+    tight = make_policy(debounce_ms=0, rate_per_sec=0.001, burst=50)
+    passes = []
+
+    def hammer() -> None:
+        n = 0
+        for _ in range(5_000):
+            if lim.allow("hot", tight, time.monotonic()) is None:
+                n += 1
+        passes.append(n)
+
+    ths = [threading.Thread(target=hammer) for _ in range(8)]
+    for th in ths:
+        th.start()
+    for th in ths:
+        th.join()
+    check("thread-safe token bucket", sum(passes) == 50, f"passed={sum(passes)} of 40000 (burst 50)")
+
+    # 5. coalesce（リスナー経由。実行は gate が開くまで止める）
+    gate = threading.Event()
+    ran: list[str] = []
+
+    def slow_execute(sc, trace=None) -> None:
+        gate.wait(5.0)
+        ran.append(sc.id)
+
+    skl.DEBOUNCE_SEC = 0.0
+    backend = FakeBackend()
+    listener = skl.HotkeyListener(execute_fn=slow_execute, backend=backend)
+    listener.register_shortcuts([skl.compile_shortcut(sc) for sc in [
+        {"id": "co", "hotkey": "ctrl+f1", "value": "true", "coalesce": True},
+        {"id": "plain", "hotkey": "ctrl+f2", "value": "true", "max_concurrency": 1},
+    ]])
+    reasons = [listener.trigger_by_id("co") for _ in range(20)]
+    wait_until(lambda: listener.executor.stats()["running"] == 1, 1.0, interval=0.002)
+    reasons += [listener.trigger_by_id("co") for _ in range(20)]
+    plain = [listener.trigger_by_id("plain") for _ in range(5)]
+    gate.set()
+    wait_until(lambda: len(ran) >= 7, 2.0, interval=0.002)
+    time.sleep(0.05)
+    n_co = ran.count("co")
+    check("coalesce: one run + one queued", n_co == 2 and reasons.count(None) == 2, f"runs={n_co} reasons={set(reasons)}")
+    check("without coalesce every trigger runs", ran.count("plain") == 5 and plain == [None] * 5)
+    ex = listener.executor.stats()
+    metrics = "\n".join(listener.metrics_lines())
+    check("coalesce counter in /metrics", ex["rejected"]["coalesced"] == 38 and 'policy="coalesce"} 38' in metrics,
+          f"coalesced={ex['rejected']['coalesced']}")
+    listener.stop()
+
+    # 6. 壁時計を巻き戻す
+    real_time = time.time
+    listener = skl.HotkeyListener(execute_fn=lambda sc, trace=None: None, backend=FakeBackend())
+    listener.register_shortcuts([skl.compile_shortcut({"id": "d", "hotkey": "ctrl+f3", "value": "true", "debounce_ms": 200})])
+    try:
+        first = listener.trigger_by_id("d")
+        time.time = lambda: real_time() - 3600.0   # 1時間戻った
+        second = listener.trigger_by_id("d")
+        time.sleep(0.25)
+        time.time = lambda: real_time() + 86400.0  # 1日進んだ
+        third = listener.trigger_by_id("d")
+        fourth = listener.trigger_by_id("d")
+    finally:
+        time.time = real_time
+    check("wall clock jumps do not matter", [first, second, third, fourth] == [None, DEBOUNCED, None, DEBOUNCED],
+          f"{[first, second, third, fourth]}")
+    listener.stop()
+
+    # 7. 速さ
+    lim = RateLimiter(0.0)
+    pol = make_policy(debounce_ms=0, rate_per_sec=1e9, burst=1e9)
+    n = 200_000
+    t0 = time.perf_counter()
+    for i in range(n):
+        lim.allow("x", pol, float(i))
+    dt = time.perf_counter() - t0
+    print(f"allow(): {dt / n * 1e9:.0f} ns/call (token bucket)")
+
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
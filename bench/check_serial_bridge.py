@@ -0,0 +1,168 @@
+# check_serial_bridge.py
+# -*- coding: utf-8 -*-
+"""
+シリアルブリッジ（serial_bridge.SerialBridge）を pty でデバイスの代わりをさせて確認する（Linux / macOS）。
+
+  1. テキストログ・壊れたフレームが混ざっても、イベントのフレームだけが
+     "device_event" の一致するショートカットとして実行キューへ入ること
+  2. 大量のイベントフレームを流したときのフレーム毎の遅延（受信 → 実行キュー投入）
+  3. デバイスが抜けて別のポートとして戻ってきても、自動で繋ぎ直すこと
+  4. イベントの処理が例外を投げても受信が続くこと / call_soon() がブリッジのスレッドで動くこと /
+     デバイスが読まない（送信バッファが詰まった）ときの書き込みが write_timeout で諦めること
+を確認し、stats() を表示する。問題があれば終了コード 1。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_serial_bridge.py [フレーム数]
+"""
+from __future__ import annotations
+
+import os
+import pty
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "app" / "key_listener"))
+
+import shortcut_key_listener as skl  # noqa: E402
+from hotkey_backend import FakeBackend  # noqa: E402
+import serial_bridge  # noqa: E402
+from serial_bridge import SerialBridge  # noqa: E402
+from serial_frame import FT_EVENT, FT_HELLO, encode_frame  # noqa: E402
+from _check import Checks, wait_until  # noqa: E402
+
+
+class FakeDevice:
+    """pty の master 側。main.ino と同じ形式でフレームを書く"""
+    def __init__(self, link: str) -> None:
+        self.master, slave = pty.openpty()
+        self._slave = slave  # 開いたままにしておく（閉じると master 側の書き込みが失敗する環境がある）
+        if os.path.lexists(link):
+            os.unlink(link)
+        os.symlink(os.ttyname(slave), link)
+        self.seq = 0
+        self.t0 = time.monotonic()
+
+    def millis(self) -> int:
+        return int((time.monotonic() - self.t0) * 1000)
+
+    def frame(self, ftype: int, payload: bytes) -> bytes:
+        data = encode_frame(ftype, payload, seq=self.seq, t_ms=self.millis())
+        self.seq += 1
+        return data
+
+    def write(self, data: bytes) -> None:
+        os.write(self.master, data)
+
+    def unplug(self) -> None:
+        os.close(self.master)
+        os.close(self._slave)
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    check = Checks()
+    skl.DEBOUNCE_SEC = 0.0
+
+    ran: list[str] = []
+    listener = skl.HotkeyListener(execute_fn=lambda sc, trace=None: ran.append(sc.id), backend=FakeBackend())
+    listener.register_shortcuts([skl.compile_shortcut(sc) for sc in [
+        {"id": "sc", "hotkey": "ctrl+f13", "value": "true", "device_event": "shortcut"},
+        {"id": "ok", "hotkey": "ctrl+f14", "value": "true", "device_event": "pass_ok"},
+        {"id": "menu1", "hotkey": "ctrl+f15", "value": "true", "device_event": "menu_select:1"},
+    ]])
+
+    link = os.path.join(tempfile.mkdtemp(), "ttyESP32")
+    dev = FakeDevice(link)
+    bridge = SerialBridge(link, listener.trigger_by_device_event, read_timeout=0.05,
+                          reconnect_min_sec=0.05, reconnect_max_sec=0.2)
+    bridge.start()
+    wait_until(lambda: bridge.connected, 2.0)
+
+    # 1. テキストログ / 壊れたフレーム / 割り当ての無いイベントが混ざった入力
+    bad = bytearray(dev.frame(FT_EVENT, bytes([1])))
+    bad[-1] ^= 0xFF
+    dev.write(
+        dev.frame(FT_HELLO, bytes([1]))
+        + b"[MENU] select=1\r\n"
+        + dev.frame(FT_EVENT, bytes([4, 1]))       # menu_select:1
+        + bytes(bad)                                # CRC 不一致（捨てられる）
+        + b"[PASS] RESULT = OK\r\n"
+        + dev.frame(FT_EVENT, bytes([2]))           # pass_ok
+        + dev.frame(FT_EVENT, bytes([3]))           # pass_ng（割り当て無し）
+        + dev.frame(FT_EVENT, bytes([1]))           # shortcut
+    )
+    got = wait_until(lambda: len(ran) >= 3, 2.0)
+    st = bridge.stats()
+    print(f"[1] ran={ran} crc_errors={st['crc_errors']} dispatch_failed={st['dispatch_failed']}"
+          f" version={bridge.device_version}")
+    if not got or sorted(ran) != ["menu1", "ok", "sc"] or st["crc_errors"] != 1 or st["dispatch_failed"] != 1:
+        check.fail("unexpected dispatch")
+
+    # 2. 遅延
+    ran.clear()
+    for _ in range(n):
+        dev.write(dev.frame(FT_EVENT, bytes([1])))
+        time.sleep(0.0005)
+    got = wait_until(lambda: len(ran) >= n, 5.0)
+    st = bridge.stats()
+    print(f"[2] events={len(ran)}/{n} dispatch p50={st['dispatch_us_p50']:.1f}us p99={st['dispatch_us_p99']:.1f}us"
+          f"  transit p50={st['transit_ms_p50']:.2f}ms p99={st['transit_ms_p99']:.2f}ms lost={st['lost_frames']}")
+    if not got or st["lost_frames"]:
+        check.fail("events lost")
+
+    # 3. 抜き差し（別の pty として戻ってくる）
+    dev.unplug()
+    wait_until(lambda: not bridge.connected, 2.0)
+    dev = FakeDevice(link)
+    reconnected = wait_until(lambda: bridge.connected, 3.0)
+    ran.clear()
+    dev.write(dev.frame(FT_HELLO, bytes([1])) + dev.frame(FT_EVENT, bytes([1])))
+    got = wait_until(lambda: ran == ["sc"], 2.0)
+    st = bridge.stats()
+    print(f"[3] connects={st['connects']} ran={ran}")
+    if not reconnected or not got or st["connects"] != 2:
+        check.fail("did not reconnect")
+
+    bridge.stop()
+    dev.unplug()
+
+    # 4. 例外を投げるイベント処理 / call_soon / 書き込みのタイムアウト
+    def on_event(name: str, received_at: float) -> str | None:
+        if name == "pass_ng":
+            raise ValueError("broken handler")
+        return listener.trigger_by_device_event(name, received_at)
+
+    dev = FakeDevice(link)
+    bridge = SerialBridge(link, on_event, read_timeout=0.05, reconnect_min_sec=0.05, reconnect_max_sec=0.2,
+                          opener=lambda path, baud, timeout: serial_bridge.open_serial(path, baud, timeout, 0.2))
+    bridge.start()
+    wait_until(lambda: bridge.connected, 2.0)
+    ran.clear()
+    dev.write(dev.frame(FT_EVENT, bytes([3])) + dev.frame(FT_EVENT, bytes([1])))   # pass_ng（例外）→ shortcut
+    survived = wait_until(lambda: ran == ["sc"], 2.0) and bridge.connected
+    threads: list[str] = []
+    bridge.call_soon(lambda: threads.append(threading.current_thread().name))
+    on_thread = wait_until(lambda: threads == ["serial-bridge"], 1.0)
+    result: list[bool] = []
+    t0 = time.perf_counter()
+    bridge.call_soon(lambda: result.append(bridge.write(b"\0" * (1 << 20))))   # FakeDevice は読まない
+    timed_out = wait_until(lambda: bool(result), 3.0) and result == [False]
+    write_ms = (time.perf_counter() - t0) * 1000
+    st = bridge.stats()
+    print(f"[4] ran={ran} dispatch_errors={st['dispatch_errors']} call_soon thread={threads}"
+          f" stalled write: {result} after {write_ms:.0f}ms")
+    if not survived or st["dispatch_errors"] != 1 or not on_thread or not timed_out:
+        check.fail("bridge thread died, call_soon misrouted or write did not time out")
+    bridge.stop()
+    dev.unplug()
+    listener.stop()
+    print(f"stats={bridge.stats()}")
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# check_webui_merge.py
+# -*- coding: utf-8 -*-
+"""
+複数の WebUI セッション（ブラウザのタブ / 利用者）が同じ設定を編集したときの確認（streamlit が必要）。
+
+  1. merge_shortcuts(): 片方だけの追加 / 変更 / 削除を取り込む、両方が変えた項目は衝突
+  2. セッション A / B を streamlit.testing の AppTest で開き、
+     - 別の項目を変えて順に保存 → 両方の変更がファイルに残る（後から保存した方が前の変更を消さない）
+     - 同じ項目を変えて順に保存 → 後の保存は衝突として止まる / 「自分の内容で上書き保存」で解消できる
+     - 「保存済みの内容を採る」で衝突した項目だけ戻り、衝突していない自分の変更（追加）は残る
+  3. 設定の解析結果はプロセスで1つ（セッションを開く度に読み直さない。version が変わったときだけ解析する）
+問題があれば終了コード 1。設定ファイルは一時ディレクトリに作る（リポジトリの config/ は触らない）。
+
+実行方法（リポジトリルートで実行）:
+  python bench/check_webui_merge.py [セッション数]
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+WEBUI = Path(__file__).resolve().parents[1] / "app" / "key_setting" / "shortcut_key_setting_webui.py"
+sys.path.insert(0, str(WEBUI.parents[1] / "common"))
+
+import config_store  # noqa: E402
+from config_store import merge_shortcuts  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from _check import Checks  # noqa: E402
+
+# 解析結果の共有を確かめるため、作られた ConfigCache を覚えておく
+caches: list = []
+_init = config_store.ConfigCache.__init__
+
+
+def _record_init(self, *args, **kwargs) -> None:
+    _init(self, *args, **kwargs)
+    caches.append(self)
+
+
+config_store.ConfigCache.__init__ = _record_init
+
+
+def item(i: str, **kw) -> dict:
+    return {"id": i, "title": i, "hotkey": f"ctrl+{i}", "action_type": "run_cmd", "value": "", **kw}
+
+
+def open_session() -> AppTest:
+    at = AppTest.from_file(str(WEBUI), default_timeout=60).run()
+    if at.exception:
+        raise SystemExit(f"script failed: {at.exception}")
+    return at
+
+
+def click(at: AppTest, label: str) -> AppTest:
+    next(b for b in at.button if b.label == label).click().run()
+    if at.exception:
+        raise SystemExit(f"script failed: {at.exception}")
+    return at
+
+
+def saved() -> dict:
+    return json.loads(Path("config/shortcut_config.json").read_text(encoding="utf-8"))
+
+
+def main() -> int:
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    check = Checks()
+
+    # ---- 1. merge_shortcuts ----
+    base = [item("a"), item("b"), item("c")]
+    mine = [item("a", title="A-mine"), item("b"), item("d")]                   # a を変更 / c を削除 / d を追加
+    theirs = [item("a"), item("b", value="x"), item("c"), item("e")]           # b を変更 / e を追加
+    merged, conflicts = merge_shortcuts(base, mine, theirs)
+    check("merge: non-overlapping edits", conflicts == [] and merged == [
+        item("a", title="A-mine"), item("b", value="x"), item("e"), item("d"),
+    ], f"{[d['id'] for d in merged]}")
+    mine = [item("a", title="A-mine"), item("c")]
+    theirs = [item("a", title="A-theirs"), item("b", value="x"), item("c")]    # b は自分が削除 / 他が変更
+    merged, conflicts = merge_shortcuts(base, mine, theirs)
+    check("merge: overlapping edits conflict", conflicts == ["a", "b"] and merged == theirs, f"{conflicts}")
+    merged, _ = merge_shortcuts(base, mine, theirs, ours_wins=True)
+    check("merge: ours_wins", merged == mine, f"{[d['id'] for d in merged]}")
+    same, conflicts = merge_shortcuts(base, [item("a", title="Z")] + base[1:], [item("a", title="Z")] + base[1:])
+    check("merge: same edit on both sides is not a conflict", conflicts == [] and same[0]["title"] == "Z")
+
+    cwd = os.getcwd()
+    tmp = tempfile.mkdtemp(prefix="check_webui_merge_")
+    os.chdir(tmp)
+    try:
+        # ---- 2. セッション A / B ----
+        a = open_session()
+        b = open_session()
+        first, second = [sc.id for sc in a.session_state["shortcuts"]][:2]
+        v0 = saved()["version"]
+
+        a.text_input(key=f"title_{first}").set_value("A edited").run()
+        click(a, "保存")
+        b.text_input(key=f"hotkey_{second}").set_value("ctrl+alt+f9").run()
+        click(b, "保存")
+        data = saved()
+        by_id = {d["id"]: d for d in data["shortcuts"]}
+        check("different shortcuts: both edits kept",
+              by_id[first]["title"] == "A edited" and by_id[second]["hotkey"] == "ctrl+alt+f9"
+              and data["version"] == v0 + 2, f"version={data['version']}")
+        b_titles = {sc.id: sc.title for sc in b.session_state["shortcuts"]}
+        check("later session sees the merged edit", b_titles[first] == "A edited"
+              and b.text_input(key=f"title_{first}").value == "A edited")
+
+        a.text_input(key=f"hotkey_{first}").set_value("ctrl+alt+f10").run()
+        click(a, "保存")
+        a_hotkey = {sc.id: sc.hotkey for sc in a.session_state["shortcuts"]}
+        check("earlier session picks up the other edit on its next save",
+              a_hotkey[second] == "ctrl+alt+f9" and saved()["version"] == v0 + 3)
+
+        a.text_input(key=f"title_{first}").set_value("from A").run()
+        click(a, "保存")
+        b.text_input(key=f"title_{first}").set_value("from B").run()
+        b.text_input(key=f"title_{second}").set_value("B only").run()
+        version = saved()["version"]
+        click(b, "保存")
+        conflict = b.session_state["save_conflict"]
+        check("same shortcut: later save stops with a conflict",
+              conflict is not None and conflict.edit_conflicts == [first] and saved()["version"] == version
+              and any("両方で変更されている" in e.value for e in b.error), f"{conflict and conflict.edit_conflicts}")
+        click(b, "自分の内容で上書き保存")
+        by_id = {d["id"]: d for d in saved()["shortcuts"]}
+        check("resolve with mine: saved", b.session_state["save_conflict"] is None
+              and by_id[first]["title"] == "from B" and by_id[second]["title"] == "B only")
+
+        a.text_input(key=f"title_{first}").set_value("A again").run()
+        a.session_state["add_title"] = "added by A"
+        a.session_state["add_hotkey"] = "ctrl+alt+f11"
+        click(a, "追加する")
+        b.text_input(key=f"title_{first}").set_value("B again").run()
+        click(b, "保存")
+        click(a, "保存")
+        click(a, "保存済みの内容を採る")
+        titles = [sc.title for sc in a.session_state["shortcuts"]]
+        check("resolve with theirs: conflicting shortcut reverts, others kept",
+              a.session_state["save_conflict"] is None and titles[0] == "B again" and "added by A" in titles
+              and a.text_input(key=f"title_{first}").value == "B again", f"{titles}")
+        click(a, "保存")
+        by_id = {d["id"]: d for d in saved()["shortcuts"]}
+        check("resolve with theirs: remaining edits save cleanly",
+              by_id[first]["title"] == "B again" and by_id[second]["title"] == "B only"
+              and [d["title"] for d in saved()["shortcuts"]][-1] == "added by A")
+
+        # ---- 3. 共有の解析結果（最後の保存の後に1つ開いて解析させてから数える） ----
+        open_session()
+        before = caches[0].stats() if caches else {}
+        for _ in range(sessions):
+            open_session()
+        after = caches[0].stats() if caches else {}
+        check("one shared parse per version across sessions",
+              len(caches) == 1 and after["parses"] == before["parses"] and after["hits"] >= before["hits"] + sessions,
+              f"caches={len(caches)} before={before} after={after}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return check.result()
+
+
+if __name__ == "__main__":
+    sys.exit(main())